@@ -1,47 +1,123 @@
-import feedparser
-from transformers import pipeline
-from TTS.api import TTS
+from startup import startup, lazy_import, warm_up, start_warmup, WARMUP_ENABLED
 import os
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
+with startup.measure("flask", "import"):
+    from flask import Flask, Response, request, jsonify, g
+    from werkzeug.exceptions import RequestedRangeNotSatisfiable
+    from flask_cors import CORS
 import uuid
-from pydub import AudioSegment
 import tempfile
 import random
-import glob
-import requests
 import time
-from datetime import datetime
+import threading
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from summarizer import summarizers, transformers, SUMMARIZER_MODEL, SUMMARIZER_PRELOAD, SUMMARY_BATCH_SIZE
+from summary_cache import summary_cache, summary_key
+from audio_cache import AudioCache, audio_key
+from audio_store import AudioStore
+from audio_probe import probe_duration, strip_mp3_headers
+from audio_serving import AudioServer
+from voice_catalog import VoiceCatalog
+from voice_metadata import VOICE_PREVIEW_DIR, metadata_path
+from text_segments import split_text
+from categories import classifier as category_classifier
+from tts_backends import tts_backends
+from chunked_synthesis import chunked_synthesizer
+from bulletins import bulletin_key, stitch_bulletin, BULLETIN_GAP_MS, BULLETIN_MAX_GAP_MS
+from synthesis_jobs import JobQueue, QueueFull, PRIORITIES
+from prefetch import Prefetcher, PREFETCH_ENABLED
+from metrics import metrics, timed, SamplingProfiler, profiles, PROFILING_ENABLED
+from news_index import NewsIndex, InvalidCursor
+from feed_store import FeedStore, FeedPoller, DEFAULT_FEEDS, FEED_POLLER_ENABLED, FEED_FETCH_DEADLINE, FEED_MAX_ENTRIES, stable_entry_id
+from feed_stream import parse_feed
+from shared_state import shared_state, SHARED_STATE_ENABLED
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Heavy parsers and audio libraries are imported on first use or by the warm-up thread; feedparser handles malformed feeds
+feedparser = lazy_import("feedparser")
+pydub = lazy_import("pydub")
+
+# Set up logging; per-request details are logged at DEBUG
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Request latency by route, method and status
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Time to build each API response", ["endpoint", "method", "status"]
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    # Sample this request's stack when asked to, if profiling is allowed
+    g.profiler = None
+    if PROFILING_ENABLED and (request.args.get("profile") == "1" or request.headers.get("X-Profile") == "1"):
+        g.profiler = SamplingProfiler(threading.get_ident()).start()
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.get("request_started", time.perf_counter())
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    http_request_duration.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    
+    profiler = g.get("profiler")
+    if profiler is not None:
+        profiler.stop()
+        response.headers["X-Profile-Id"] = profiles.add(f"{request.method} {request.full_path}", profiler, elapsed)
+    return response
+
 # Configure directories
-AUDIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated_audio")
+AUDIO_DIR = os.environ.get("AUDIO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated_audio"))
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
+# State published for the other worker processes when running under a multi-process server
+shared = shared_state if SHARED_STATE_ENABLED else None
+
+# Content-addressed cache of synthesized speech
+audio_cache = AudioCache(AUDIO_DIR, shared=shared)
+
+# Keeps generated audio within its size budget
+audio_store = AudioStore(AUDIO_DIR, shared=shared)
+
+# Serves generated audio with Range support, ETags and an in-memory hot set
+audio_server = AudioServer(AUDIO_DIR)
+
+# Streaming synthesis: segment size, segments synthesized ahead, bytes per write, and text limit
+STREAM_SEGMENT_CHARS = int(os.environ.get("STREAM_SEGMENT_CHARS", "200"))
+STREAM_LOOKAHEAD = int(os.environ.get("STREAM_LOOKAHEAD", "2"))
+STREAM_CHUNK_BYTES = 16 * 1024
+STREAM_MAX_CHARS = int(os.environ.get("STREAM_MAX_CHARS", "5000"))
+
+# Longest text read out by /api/voice/synthesize; longer text is synthesized in parallel chunks
+SPEECH_MAX_CHARS = int(os.environ.get("SPEECH_MAX_CHARS", "10000"))
+
+# Longest a client may long-poll a synthesis job
+MAX_JOB_WAIT_SECONDS = 30
+
+# Bulk synthesis: items allowed per request, and seconds the request waits for them
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", "30"))
+BULK_TIMEOUT = float(os.environ.get("BULK_TIMEOUT", "120"))
+
 # Set up voice samples directory
 VOICE_SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "voice_samples")
 os.makedirs(VOICE_SAMPLES_DIR, exist_ok=True)
 
-# Initialize TTS model with logging
-tts = None  # Initialize as None first
+# Cached catalog of the voice samples, with the metadata extracted by voice_metadata.py
+voice_catalog = VoiceCatalog(VOICE_SAMPLES_DIR, metadata_path=metadata_path(VOICE_PREVIEW_DIR))
 
-# Import gTTS for text-to-speech synthesis
-from gtts import gTTS
-import io
+# Serves the normalized preview clips; they are already low bitrate
+preview_server = AudioServer(VOICE_PREVIEW_DIR, variants_enabled=False)
 
 # Initialize TTS
 tts = None
 
-# Create a wrapper class for gTTS that follows the same interface as TTS
-class GTTSWrapper:
-    def __init__(self):
-        logging.info("Initializing gTTS wrapper for text-to-speech synthesis")
+# Speaks text with the backend configured for each voice, following the same interface as TTS
+class TTSWrapper:
+    def __init__(self, backends=tts_backends):
+        logging.info("Initializing TTS wrapper for text-to-speech synthesis")
+        self.backends = backends
         # Map voice IDs to different language/accent combinations
         # This will create variety in the voices
         self.voice_profiles = {
@@ -74,58 +150,86 @@ class GTTSWrapper:
         # Fallback voice settings
         self.default_voice = {"lang": "en", "tld": "com", "slow": False}
     
-    def tts_to_file(self, text, speaker_wav, language="en", file_path=None):
-        """Generate speech from text and save to file"""
-        logging.info(f"Generating speech for text: '{text[:50]}...' using gTTS")
+    def cache_profile(self, voice_id):
+        """Voice profile used in audio cache keys; includes the backend and its settings when it isn't gTTS"""
+        profile = self.voice_profiles.get(voice_id, self.default_voice)
+        backend = self.backends.for_voice(voice_id)
+        # gTTS keys are left as they were so existing cached audio stays valid
+        if backend.name == "gtts":
+            return profile
+        # A different model or bitrate produces different audio, so it must not hit the old entries
+        return dict(profile, backend=backend.name, **backend.cache_settings())
+    
+    def tts_to_bytes(self, text, speaker_wav, add_greeting=True):
+        """Generate speech from text and return the MP3 bytes (no fallbacks, errors are raised)"""
+        # Extract the voice ID from the speaker_wav path
+        voice_id = os.path.splitext(os.path.basename(speaker_wav))[0]
+        logging.debug(f"Using voice ID: {voice_id}")
         
-        try:
-            # Extract the voice ID from the speaker_wav path
-            voice_id = os.path.splitext(os.path.basename(speaker_wav))[0]
-            logging.info(f"Using voice ID: {voice_id}")
-            
-            # Get voice settings for this voice ID
-            voice_settings = self.voice_profiles.get(voice_id, self.default_voice)
-            logging.info(f"Voice settings: {voice_settings}")
-            
-            # For non-English languages, translate common phrases to make it sound more authentic
-            # This is a simple approach - in a real app you'd use a translation service
-            if voice_settings["lang"] != "en":
-                # Add a simple greeting in the target language
-                greetings = {
-                    "fr": "Bonjour! Voici les nouvelles: ",
-                    "de": "Guten Tag! Hier sind die Nachrichten: ",
-                    "es": "¡Hola! Aquí están las noticias: ",
-                    "it": "Buongiorno! Ecco le notizie: ",
-                    "pt": "Olá! Aqui estão as notícias: ",
-                    "nl": "Hallo! Hier is het nieuws: ",
-                    "ja": "こんにちは！ニュースをお届けします: "
-                }
-                
-                # Add greeting in the target language
-                if voice_settings["lang"] in greetings:
-                    text = greetings[voice_settings["lang"]] + text
+        # Get voice settings for this voice ID
+        voice_settings = self.voice_profiles.get(voice_id, self.default_voice)
+        logging.debug(f"Voice settings: {voice_settings}")
+        
+        # For non-English languages, translate common phrases to make it sound more authentic
+        # This is a simple approach - in a real app you'd use a translation service
+        if add_greeting and voice_settings["lang"] != "en":
+            # Add a simple greeting in the target language
+            greetings = {
+                "fr": "Bonjour! Voici les nouvelles: ",
+                "de": "Guten Tag! Hier sind die Nachrichten: ",
+                "es": "¡Hola! Aquí están las noticias: ",
+                "it": "Buongiorno! Ecco le notizie: ",
+                "pt": "Olá! Aqui estão as notícias: ",
+                "nl": "Hallo! Hier is het nieuws: ",
+                "ja": "こんにちは！ニュースをお届けします: "
+            }
             
-            # Create gTTS object with the appropriate settings
-            tts = gTTS(
-                text=text,
-                lang=voice_settings["lang"],
-                tld=voice_settings["tld"],
-                slow=voice_settings["slow"]
-            )
+            # Add greeting in the target language
+            if voice_settings["lang"] in greetings:
+                text = greetings[voice_settings["lang"]] + text
+        
+        # Synthesize with the backend configured for this voice
+        backend = self.backends.for_voice(voice_id)
+        return backend.synthesize(text, voice_settings, speaker_wav=speaker_wav)
+    
+    def tts_to_bytes_chunked(self, text, speaker_wav):
+        """Like tts_to_bytes, but long text is split within the backend's limit and synthesized in parallel"""
+        voice_id = os.path.splitext(os.path.basename(speaker_wav))[0]
+        backend = self.backends.for_voice(voice_id)
+        return chunked_synthesizer.synthesize(
+            text,
+            lambda chunk, index: self.tts_to_bytes(chunk, speaker_wav, add_greeting=(index == 0)),
+            max_chars=backend.max_chars
+        )
+    
+    @timed("tts_to_file")
+    def tts_to_file(self, text, speaker_wav, language="en", file_path=None, allow_fallback=True):
+        """Generate speech from text and save to file.
+
+        With allow_fallback=False, synthesis errors are raised instead of writing placeholder audio.
+        """
+        logging.debug(f"Generating speech for text: '{text[:50]}...'")
+        
+        try:
+            audio = self.tts_to_bytes_chunked(text, speaker_wav)
             
             # Save to file
-            tts.save(file_path)
-            logging.info(f"Successfully saved speech to {file_path}")
+            with open(file_path, "wb") as f:
+                f.write(audio)
+            logging.debug(f"Successfully saved speech to {file_path}")
             
             return file_path
             
         except Exception as e:
-            logging.error(f"Error generating speech with gTTS: {e}")
+            logging.error(f"Error generating speech: {e}")
+            if not allow_fallback:
+                raise
             # Fallback to creating a simple audio file
             try:
-                # Try to copy the speaker sample as fallback
+                # Try to copy the speaker sample as fallback, preferring its short normalized preview
                 import shutil
-                shutil.copy(speaker_wav, file_path)
+                preview = voice_catalog.preview(os.path.splitext(os.path.basename(speaker_wav))[0])
+                shutil.copy(os.path.join(VOICE_PREVIEW_DIR, preview) if preview else speaker_wav, file_path)
                 logging.info(f"Fallback: Copied speaker sample {speaker_wav} to {file_path}")
                 return file_path
             except Exception as copy_error:
@@ -159,211 +263,163 @@ class GTTSWrapper:
                             f.write(value.to_bytes(2, byteorder='little', signed=True))
                     return file_path
 
-# Initialize our gTTS wrapper
-tts = GTTSWrapper()
+# Initialize our TTS wrapper
+tts = TTSWrapper()
 
 # Function to get all available voice samples
 def get_available_voices():
-    # Get all audio files in the voice_samples directory
-    mp3_files = glob.glob(os.path.join(VOICE_SAMPLES_DIR, "*.mp3"))
-    wav_files = glob.glob(os.path.join(VOICE_SAMPLES_DIR, "*.wav"))
-    
-    # Combine all files
-    all_files = mp3_files + wav_files
-    
-    if not all_files:
-        logging.warning(f"No voice samples found in {VOICE_SAMPLES_DIR}")
-        return []
-    
-    logging.info(f"Found {len(all_files)} voice samples: {len(mp3_files)} MP3, {len(wav_files)} WAV")
-    
-    # Create voice profiles
-    voices = []
-    for i, file_path in enumerate(all_files):
-        voice_id = os.path.splitext(os.path.basename(file_path))[0]
-        # Format the name to be more user-friendly
-        name = "Voice " + str(i+1)
-        if "common_voice" in voice_id:
-            # For common voice samples, use a simpler name
-            name = f"Voice {i+1}"
-        else:
-            # Try to make a readable name from the filename
-            name = voice_id.replace("_", " ").title()
-        
-        voices.append({
-            "id": voice_id,
-            "name": name,
-            "file_path": file_path,  # Store the full path
-            "file": os.path.basename(file_path)  # Store just the filename for API responses
+    return voice_catalog.voices()
+
+# Convert a parsed feed's entries into the news item dicts the frontend expects
+def build_news_items(rss_url, feed, max_items=None):
+    source = feed.title or "News Source"
+    entries = feed.entries if max_items is None else feed.entries[:max_items]
+    # Classify the whole batch with the precompiled keyword matcher
+    with timed("determine_category"):
+        categories = category_classifier.classify_many(entries)
+    items = []
+    for entry, (category, confidence) in zip(entries, categories):
+        text = entry.get("summary", entry.get("description", ""))
+        items.append({
+            "id": stable_entry_id(rss_url, entry),
+            "title": entry.get("title", "Untitled"),
+            "summary": text,
+            "originalText": text,
+            "category": category,
+            "categoryConfidence": confidence,
+            "source": source,
+            # Undated entries are dated by the feed store when first seen
+            "publishedAt": entry.get("published", entry.get("pubDate")),
+            "readTime": f"{len(text) // 200 + 1} min read",
+            "trending": random.choice([True, False, False])  # Randomly mark some as trending
         })
-    
-    logging.info(f"Processed {len(voices)} voice profiles")
-    return voices
+    return items
 
-# 1. Fetch latest news using RSS
-def fetch_headlines(rss_url="http://feeds.bbci.co.uk/news/rss.xml", max_items=3, max_retries=3):
-    # Try to fetch the RSS feed with retries
-    for attempt in range(max_retries):
-        try:
-            # Use requests to fetch the RSS feed first to handle HTTP errors better
-            response = requests.get(rss_url, timeout=10)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            
-            # Parse the RSS feed
-            feed = feedparser.parse(response.text)
-            
-            # Check if we got valid entries
-            if not feed.entries:
-                logging.warning(f"No entries found in feed from {rss_url}, attempt {attempt+1}/{max_retries}")
-                if attempt < max_retries - 1:
-                    time.sleep(1)  # Wait before retrying
-                    continue
-                else:
-                    raise ValueError(f"No entries found in feed from {rss_url} after {max_retries} attempts")
-            
-            # Process the entries
-            return [
-                {
-                    "id": str(uuid.uuid4()),
-                    "title": entry.get("title", "Untitled"),
-                    "summary": entry.get("summary", entry.get("description", "")),
-                    "originalText": entry.get("summary", entry.get("description", "")),
-                    "category": determine_category(entry),
-                    "source": feed.feed.title if hasattr(feed, 'feed') and hasattr(feed.feed, 'title') else "News Source",
-                    "publishedAt": entry.get("published", entry.get("pubDate", datetime.now().isoformat())),
-                    "readTime": f"{len(entry.get('summary', entry.get('description', ''))) // 200 + 1} min read",
-                    "trending": random.choice([True, False, False])  # Randomly mark some as trending
-                }
-                for entry in feed.entries[:max_items]
-            ]
-            
-        except requests.exceptions.RequestException as e:
-            logging.error(f"HTTP error fetching {rss_url}: {e}, attempt {attempt+1}/{max_retries}")
-            if attempt < max_retries - 1:
-                time.sleep(1)  # Wait before retrying
-            else:
-                raise
-        except Exception as e:
-            logging.error(f"Error parsing feed from {rss_url}: {e}, attempt {attempt+1}/{max_retries}")
-            if attempt < max_retries - 1:
-                time.sleep(1)  # Wait before retrying
-            else:
-                raise
-    
-    # If we get here, all retries failed
-    raise Exception(f"Failed to fetch headlines from {rss_url} after {max_retries} attempts")
+# Parser used by the feed poller on the streamed response body; the store keeps FEED_MAX_ENTRIES per feed,
+# so reading stops there
+def parse_feed_items(rss_url, stream):
+    with timed("feed_parse"):
+        feed = parse_feed(stream, max_items=FEED_MAX_ENTRIES)
+    return build_news_items(rss_url, feed)
+
+# Background feed ingestion: /api/news reads from this store
+feed_store = FeedStore(shared=shared)
+for _feed_url in DEFAULT_FEEDS:
+    feed_store.track(_feed_url)
+# Under gunicorn only one worker polls; the others sync the feeds it publishes
+feed_poller = FeedPoller(feed_store, parse_feed_items, shared=shared)
+
+# Merged, deduplicated view of every feed that /api/news pages through
+news_index = NewsIndex()
+feed_store.add_listener(news_index.add)
 
 # 2. Summarize news using Hugging Face summarization pipeline
+@timed("summarize_news")
 def summarize_news(news_items):
-    summarizer = pipeline("summarization", model="Falconsai/text_summarization")
-    
-    for item in news_items:
-        text_to_summarize = item["title"] + ". " + item["originalText"]
-        summary = summarizer(
-            text_to_summarize, 
-            max_length=60, 
-            min_length=15, 
-            do_sample=False
-        )[0]["summary_text"]
-        item["summary"] = summary
-    
+    generation_params = {"max_length": 60, "min_length": 15, "do_sample": False}
+
+    # Look up summaries we've already produced for these exact articles
+    keys = [
+        summary_key(item["title"], item["originalText"], SUMMARIZER_MODEL, generation_params)
+        for item in news_items
+    ]
+    cached = summary_cache.get_many(keys)
+    pending = [(key, item) for key, item in zip(keys, news_items) if key not in cached]
+
+    if pending:
+        # Summarize the remaining articles in batches instead of one model call per article
+        texts = [item["title"] + ". " + item["originalText"] for _, item in pending]
+        summaries = summarizers.summarize_batch(
+            texts,
+            model_name=SUMMARIZER_MODEL,
+            batch_size=SUMMARY_BATCH_SIZE,
+            **generation_params
+        )
+        new_entries = {key: summary for (key, _), summary in zip(pending, summaries)}
+        summary_cache.put_many(new_entries)
+        cached.update(new_entries)
+
+    logging.debug(f"Summarized {len(news_items)} items ({len(news_items) - len(pending)} from cache)")
+    for key, item in zip(keys, news_items):
+        item["summary"] = cached[key]
+
     return news_items
 
 # Helper function to determine the category of a news article
 def determine_category(entry):
-    # First check if the entry has a category field
-    if entry.get("category"):
-        return entry.get("category")
-    
-    # Check if there are tags
-    if entry.get("tags"):
-        for tag in entry.get("tags"):
-            if tag.get("term"):
-                return tag.get("term")
-    
-    # If no category or tags, try to determine from the title and summary
-    title = entry.get("title", "").lower()
-    summary = entry.get("summary", entry.get("description", "")).lower()
-    content = title + " " + summary
-    
-    # Define keywords for each category
-    politics_keywords = ["politics", "government", "president", "election", "vote", "parliament", "senate", "congress", "minister", "policy", "bill", "law"]
-    tech_keywords = ["technology", "tech", "digital", "software", "hardware", "ai", "artificial intelligence", "computer", "internet", "app", "cyber", "robot"]
-    sports_keywords = ["sport", "football", "soccer", "basketball", "tennis", "olympic", "championship", "tournament", "match", "game", "player", "team", "league", "cup"]
-    entertainment_keywords = ["entertainment", "movie", "film", "music", "celebrity", "actor", "actress", "star", "tv", "show", "concert", "festival", "award"]
-    science_keywords = ["science", "research", "study", "discovery", "scientist", "space", "nasa", "physics", "biology", "chemistry", "medicine", "health", "disease", "climate", "environment"]
-    
-    # Check for keyword matches
-    for keyword in politics_keywords:
-        if keyword in content:
-            return "Politics"
-    
-    for keyword in tech_keywords:
-        if keyword in content:
-            return "Technology"
-    
-    for keyword in sports_keywords:
-        if keyword in content:
-            return "Sports"
-    
-    for keyword in entertainment_keywords:
-        if keyword in content:
-            return "Entertainment"
-    
-    for keyword in science_keywords:
-        if keyword in content:
-            return "Science"
-    
-    # Default category
-    return "News"
-
-# 3. Synthesize text to speech using gTTS
+    return category_classifier.classify(entry)[0]
+
+# Pick the voice sample for voice_id, or a random voice if it's missing or unknown
+def resolve_voice(voice_id=None):
+    # Look up the requested voice in the catalog
+    selected_voice = voice_catalog.get(voice_id) if voice_id is not None else None
+    
+    # If no voice_id provided or not found, choose a random voice
+    if selected_voice is None:
+        selected_voice = random.choice(get_available_voices())
+        logging.debug(f"Using random voice: {selected_voice['name']} ({selected_voice['file']})")
+    else:
+        logging.debug(f"Using selected voice: {voice_id} ({selected_voice['file']})")
+    
+    return selected_voice['id'], selected_voice['file_path']
+
+# Prepare the text to be spoken
+def prepare_speech_text(text):
+    if len(text) > SPEECH_MAX_CHARS:
+        # If text is too long, truncate it
+        return text[:SPEECH_MAX_CHARS] + "... That's all for this article."
+    return text
+
+# Audio cache key for prepared text spoken with voice_id
+def speech_cache_key(formatted_text, voice_id):
+    return audio_key(formatted_text, voice_id, tts.cache_profile(voice_id))
+
+# Whether synthesize_voice(text, voice_id) would be served from the audio cache
+def is_speech_cached(text, voice_id):
+    return audio_cache.lookup(speech_cache_key(prepare_speech_text(text), voice_id)) is not None
+
+# 3. Synthesize text to speech with the voice's TTS backend
 def synthesize_voice(text, voice_id=None):
     try:
-        logging.info(f"Synthesizing voice for text: '{text[:30]}...' with voice_id: {voice_id}")
+        logging.debug(f"Synthesizing voice for text: '{text[:30]}...' with voice_id: {voice_id}")
         
-        # Get available voices
-        voices = get_available_voices()
-        logging.info(f"Found {len(voices)} available voices")
+        voice_id, voice_sample = resolve_voice(voice_id)
         
-        # If no voice_id provided or not found, choose a random voice
-        if voice_id is None or not any(v['id'] == voice_id for v in voices):
-            selected_voice = random.choice(voices)
-            voice_sample = selected_voice['file_path']
-            voice_id = selected_voice['id']
-            logging.info(f"Using random voice: {selected_voice['name']} ({os.path.basename(voice_sample)})")
-        else:
-            voice_sample = next(v['file_path'] for v in voices if v['id'] == voice_id)
-            logging.info(f"Using selected voice: {voice_id} ({os.path.basename(voice_sample)})")
+        # Identical text spoken with the same voice profile is synthesized only once
+        formatted_text = prepare_speech_text(text)
+        cache_key = speech_cache_key(formatted_text, voice_id)
         
-        # Generate a unique filename for the output
-        output_file = os.path.join(AUDIO_DIR, f"{uuid.uuid4()}.mp3")
-        logging.info(f"Output file will be: {output_file}")
+        def generate(file_path):
+            tts.tts_to_file(
+                text=formatted_text,
+                speaker_wav=voice_sample,
+                language="en",
+                file_path=file_path,
+                allow_fallback=False
+            )
         
-        # Prepare the text to be spoken
-        # Format it nicely with pauses between title and content
-        if len(text) > 500:
-            # If text is too long, truncate it
-            formatted_text = text[:500] + "... That's all for this article."
-        else:
-            formatted_text = text
-            
-        # Synthesize speech
-        logging.info("Starting TTS synthesis...")
-        tts.tts_to_file(
-            text=formatted_text,
-            speaker_wav=voice_sample,
-            language="en",
-            file_path=output_file
-        )
-        logging.info("TTS synthesis completed successfully")
+        try:
+            output_file = audio_cache.get_or_create(cache_key, generate)
+        except Exception as e:
+            # Don't cache degraded audio: fall back to a one-off file with the wrapper's fallbacks
+            logging.warning(f"Cached synthesis failed ({e}), generating uncached audio")
+            output_file = os.path.join(AUDIO_DIR, f"{uuid.uuid4()}.mp3")
+            tts.tts_to_file(
+                text=formatted_text,
+                speaker_wav=voice_sample,
+                language="en",
+                file_path=output_file
+            )
+        
+        # Protect the file from eviction while the client fetches it
+        audio_store.record_write(output_file)
         
         # Verify the output file exists
         if not os.path.exists(output_file):
             logging.error(f"Output file was not created: {output_file}")
             raise FileNotFoundError(f"TTS failed to create output file: {output_file}")
         
-        logging.info(f"Successfully generated audio file: {output_file}")
+        logging.debug(f"Audio file ready: {output_file}")
         return output_file
     
     except Exception as e:
@@ -373,10 +429,17 @@ def synthesize_voice(text, voice_id=None):
             # Create a simple output file as fallback
             output_file = os.path.join(AUDIO_DIR, f"{uuid.uuid4()}.mp3")
             
-            # Use gTTS directly as a fallback
-            tts_fallback = gTTS(text=text[:200] + "... That's all for now.", lang="en")
-            tts_fallback.save(output_file)
-            logging.info(f"Created fallback audio file using direct gTTS: {output_file}")
+            # Use the default backend with a plain English voice as a fallback
+            fallback_backend = tts_backends.get(tts_backends.default)
+            audio = chunked_synthesizer.synthesize(
+                prepare_speech_text(text),
+                lambda chunk, index: fallback_backend.synthesize(chunk, tts.default_voice),
+                max_chars=fallback_backend.max_chars
+            )
+            with open(output_file, "wb") as f:
+                f.write(audio)
+            audio_store.record_write(output_file)
+            logging.info(f"Created fallback audio file with the {tts_backends.default} backend: {output_file}")
             return output_file
         except Exception as fallback_error:
             logging.error(f"Fallback TTS also failed: {fallback_error}")
@@ -384,90 +447,228 @@ def synthesize_voice(text, voice_id=None):
     
     return output_file
 
+# Stream synthesized speech sentence by sentence so playback can start early
+def stream_voice(text, voice_id, voice_sample):
+    cache_key = audio_key(text, voice_id, tts.cache_profile(voice_id))
+    
+    # Already synthesized: stream the cached file
+    cached_file = audio_cache.lookup(cache_key)
+    if cached_file is not None:
+        audio_store.record_write(cached_file)
+        with open(cached_file, "rb") as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_BYTES)
+                if not chunk:
+                    return
+                yield chunk
+    
+    segments = split_text(text, max_chars=STREAM_SEGMENT_CHARS)
+    logging.info(f"Streaming {len(segments)} segments with voice {voice_id}")
+    
+    # Keep a few segments synthesizing ahead of the one being sent
+    executor = ThreadPoolExecutor(max_workers=STREAM_LOOKAHEAD, thread_name_prefix="tts-stream")
+    pending = deque()
+    next_index = 0
+    
+    def submit_next():
+        nonlocal next_index
+        while next_index < len(segments) and len(pending) < STREAM_LOOKAHEAD:
+            pending.append(executor.submit(
+                tts.tts_to_bytes, segments[next_index], voice_sample, add_greeting=(next_index == 0)
+            ))
+            next_index += 1
+    
+    # Everything we send is also written to the audio cache once the stream completes
+    partial_path = audio_cache.partial_path(cache_key)
+    completed = False
+    try:
+        with open(partial_path, "wb") as partial:
+            submit_next()
+            sent = 0
+            while pending:
+                audio = pending.popleft().result()
+                submit_next()
+                if len(segments) > 1:
+                    # Each segment's own Xing/Info header would make the stream look as long as that segment
+                    audio = strip_mp3_headers(audio, keep_id3=(sent == 0))
+                sent += 1
+                partial.write(audio)
+                yield audio
+        completed = True
+    except Exception as e:
+        logging.error(f"Streaming synthesis failed: {e}")
+    finally:
+        # Runs on errors and when the client disconnects mid-stream, too
+        executor.shutdown(wait=False, cancel_futures=True)
+        if completed:
+            audio_store.record_write(audio_cache.commit(cache_key, partial_path))
+        else:
+            audio_cache.discard(partial_path)
+
 # API Routes
 @app.route("/api/news", methods=["GET"])
 def get_news():
     max_items = request.args.get("max_items", default=10, type=int)
     offset = request.args.get("offset", default=0, type=int)
+    cursor = request.args.get("cursor")
     rss_url = request.args.get("rss_url", default="http://feeds.bbci.co.uk/news/rss.xml")
     
-    # List of fallback RSS feeds to try if the requested one fails
-    fallback_feeds = [
-        "http://feeds.bbci.co.uk/news/rss.xml",
-        "http://rss.cnn.com/rss/cnn_topstories.rss",
-        "http://feeds.bbci.co.uk/news/world/rss.xml",
-        "https://www.theguardian.com/world/rss",
-        "https://www.reddit.com/r/worldnews/.rss"
-    ]
+    # The requested feed plus the fallback feeds
+    feeds_to_try = [rss_url] + [feed_url for feed_url in DEFAULT_FEEDS if feed_url != rss_url]
     
-    # Remove the requested URL from fallbacks if it's in there
-    if rss_url in fallback_feeds:
-        fallback_feeds.remove(rss_url)
+    # Only the configured feeds are tracked and polled; any other rss_url is fetched on
+    # request and served from the index until NEWS_UNTRACKED_FEED_TTL, then fetched again
+    tracked = feed_store.state(rss_url) is not None
+    def has_items(feed_url):
+        if feed_store.state(feed_url) is None:
+            return news_index.count([feed_url]) > 0
+        return feed_store.has_items(feed_url)
     
-    # Try the requested URL first
-    feeds_to_try = [rss_url] + fallback_feeds
+    def enough():
+        return news_index.count(feeds_to_try) >= max_items + offset
+
+    if not tracked and has_items(rss_url) and news_index.is_stale(rss_url):
+        # Serve the items we have and refresh them in the background
+        feed_poller.submit([rss_url])
+
+    if not enough():
+        # Another worker may already have fetched what this one is missing
+        feed_store.sync()
+
+    if not enough():
+        new_feeds = [feed_url for feed_url in feeds_to_try if not has_items(feed_url)]
+        if news_index.count(feeds_to_try):
+            # Feeds that have never returned items are fetched in the background, not waited on
+            feed_poller.submit(new_feeds)
+            # With the poller off, feeds that did return items are refreshed inside the request like before
+            waiting = [] if FEED_POLLER_ENABLED else [feed_url for feed_url in feeds_to_try if feed_url not in new_feeds]
+            until = enough
+        else:
+            # Nothing to serve yet: wait for the first feed to come in, up to the deadline
+            waiting = feeds_to_try
+            until = lambda: news_index.count(feeds_to_try) > 0
+        if waiting:
+            logging.debug(f"Fetching {len(waiting)} feeds inside the request")
+            feed_poller.poll_many(waiting, deadline=FEED_FETCH_DEADLINE, until=until)
     
-    # Store all fetched news items
-    all_news = []
+    total = news_index.count(feeds_to_try)
+    if not total:
+        # All sources failed
+        return jsonify({"error": "Failed to fetch news from all available sources"}), 500
     
-    for feed_url in feeds_to_try:
-        try:
-            logging.info(f"Attempting to fetch news from {feed_url}")
-            # Fetch more items than requested to account for offset
-            fetch_count = max_items + offset + 10  # Fetch extra to ensure we have enough after offset
-            news = fetch_headlines(rss_url=feed_url, max_items=fetch_count)
-            
-            if news and len(news) > 0:
-                logging.info(f"Successfully fetched {len(news)} headlines from {feed_url}")
-                all_news.extend(news)
-                # If we have enough news items, break the loop
-                if len(all_news) >= max_items + offset:
-                    break
-            else:
-                logging.warning(f"No news items returned from {feed_url}, trying next source")
-        except Exception as e:
-            logging.error(f"Error fetching news from {feed_url}: {e}")
+    # Newest first across all feeds, duplicates removed, starting after the cursor
+    try:
+        paginated_news, next_cursor = news_index.page(max_items, cursor=cursor, feeds=feeds_to_try, offset=offset)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     
-    # If we have news items, summarize and return them with pagination
-    if all_news:
-        # Remove duplicates based on title
-        unique_news = []
-        seen_titles = set()
+    if paginated_news:
+        summarize_news(paginated_news)
         
-        for item in all_news:
-            if item['title'] not in seen_titles:
-                seen_titles.add(item['title'])
-                unique_news.append(item)
-        
-        # Apply offset and limit
-        paginated_news = unique_news[offset:offset + max_items] if offset < len(unique_news) else []
-        
-        if paginated_news:
-            summarized_news = summarize_news(paginated_news)
-            # Add pagination metadata
-            response = {
-                "items": summarized_news,
-                "pagination": {
-                    "total": len(unique_news),
-                    "offset": offset,
-                    "limit": max_items,
-                    "hasMore": offset + max_items < len(unique_news)
-                }
-            }
-            return jsonify(response)
+        # Start synthesizing the items the user is most likely to play next
+        if PREFETCH_ENABLED:
+            prefetcher.schedule(
+                client_id(),
+                [f"{item['title']}. {item['summary']}" for item in paginated_news],
+                voice_id=request.args.get("voice_id")
+            )
     
-    # If we get here, all sources failed or not enough items
-    return jsonify({"error": "Failed to fetch news from all available sources"}), 500
+    # Add pagination metadata
+    response = {
+        "items": paginated_news,
+        "pagination": {
+            "total": total,
+            "offset": offset,
+            "limit": max_items,
+            "hasMore": next_cursor is not None,
+            "nextCursor": next_cursor
+        }
+    }
+    return jsonify(response)
+
+# Point-in-time values from the caches and queues, exported alongside the stage metrics
+def collect_service_gauges():
+    queue = synthesis_jobs.stats()
+    yield "synthesis_queue_depth", "Synthesis jobs waiting to run", {}, queue["queueDepth"]
+    yield "synthesis_jobs_running", "Synthesis jobs being run", {}, queue["running"]
+    
+    audio = audio_cache.stats()
+    for result in ("hits", "misses", "coalesced", "failures"):
+        yield "audio_cache_lookups", "Audio cache lookups since start by result", {"result": result}, audio[result]
+    
+    summaries = summary_cache.stats()
+    for result in ("memoryHits", "diskHits", "misses"):
+        yield "summary_cache_lookups", "Summary cache lookups since start by result", {"result": result}, summaries[result]
+    
+    store = audio_store.stats()
+    yield "audio_store_bytes", "Bytes of generated audio on disk", {}, store.get("bytes")
+    yield "audio_store_files", "Generated audio files on disk", {}, store.get("files")
+    yield "news_index_items", "News items in the merged index", {}, news_index.stats()["items"]
+    
+    for url, breaker in feed_poller.breaker_status().items():
+        yield "feed_breaker_open", "1 while a feed is skipped by its circuit breaker", {"feed": url}, int(breaker["state"] == "open")
+
+metrics.add_collector(collect_service_gauges)
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Stage histograms, request latencies and service gauges in Prometheus text format"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4", headers={"Cache-Control": "no-store"})
+
+@app.route("/api/profiles/<profile_id>", methods=["GET"])
+def get_profile(profile_id):
+    """Collapsed stacks sampled from a request made with ?profile=1 (see the X-Profile-Id header)"""
+    profile = profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": f"Unknown profile: {profile_id}"}), 404
+    return Response(
+        profile["folded"],
+        mimetype="text/plain",
+        headers={"X-Profile-Request": profile["request"], "X-Profile-Samples": str(profile["samples"])}
+    )
+
+@app.route("/api/health", methods=["GET"])
+def health():
+    """Report service health, summarizer warm/cold state, summary cache stats and feed freshness"""
+    return jsonify({
+        "status": "ok",
+        "summarizer": summarizers.status(),
+        "tts": tts_backends.status(),
+        "chunkedSynthesis": chunked_synthesizer.stats(),
+        "summaryCache": summary_cache.stats(),
+        "feeds": feed_store.status(),
+        "feedBreakers": feed_poller.breaker_status(),
+        "newsIndex": news_index.stats(),
+        "startup": startup.report(),
+        "worker": {"pid": os.getpid(), "sharedState": shared is not None},
+        "audioCache": audio_cache.stats(),
+        "audioStore": audio_store.stats(),
+        "synthesisQueue": synthesis_jobs.stats(),
+        "prefetch": prefetcher.stats(),
+        "audioServing": audio_server.stats()
+    })
 
 @app.route("/api/voices", methods=["GET"])
 def get_voices():
     """Return a list of all available voice samples"""
     try:
-        voices = get_available_voices()
-        return jsonify(voices)
+        # Serve the pre-serialized catalog; clients with a matching ETag get a 304
+        payload, etag = voice_catalog.payload()
+        response = app.response_class(payload, mimetype="application/json")
+        response.set_etag(etag)
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/voices/<voice_id>/preview", methods=["GET"])
+def get_voice_preview(voice_id):
+    """Serve the short loudness-normalized preview clip of a voice"""
+    preview = voice_catalog.preview(voice_id)
+    response = preview_server.response(preview, request) if preview else None
+    if response is None:
+        return jsonify({"error": f"No preview for voice: {voice_id}"}), 404
+    return response
+
 @app.route("/api/voice/random", methods=["GET"])
 def get_random_voice():
     """Return a random voice from the available samples"""
@@ -481,72 +682,300 @@ def get_random_voice():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Build the text to speak from a synthesis request body
+def format_speech_text(data):
+    text = data.get('text', '')
+    title = data.get('title', '')
+    summary = data.get('summary', '')
+    
+    # Format the text for better speech synthesis
+    # If title and summary are provided, format them nicely
+    if title and summary:
+        return f"{title}. {summary}"
+    return text
+
+# Synthesize text and describe the result in the format the frontend expects
+def build_synthesis_result(text, voice_id=None):
+    # Synthesize voice
+    output_file = synthesize_voice(text, voice_id)
+    
+    # Get the filename from the path
+    filename = os.path.basename(output_file)
+    
+    # Get audio duration from the cached metadata, or from the file headers
+    duration = 10  # Default duration
+    metadata = audio_cache.get_metadata(filename)
+    if metadata and metadata.get("duration") is not None:
+        duration = metadata["duration"]
+    else:
+        with timed("duration_probe"):
+            probed = probe_duration(output_file)
+        if probed is not None:
+            duration = probed
+            audio_cache.set_metadata(filename, duration=duration)
+    
+    # Create response object matching the frontend's expected format
+    return {
+        "audioUrl": f"/api/audio/{filename}",
+        "duration": duration,
+        "fileSize": os.path.getsize(output_file),
+        "voiceId": voice_id or "random"
+    }
+
+# Worker pool that runs queued syntheses off the request threads
+synthesis_jobs = JobQueue(build_synthesis_result, shared=shared)
+
+# Pre-synthesizes the top of each news page in the client's last-used voice
+prefetcher = Prefetcher(synthesis_jobs, is_speech_cached, priority=PRIORITIES["low"])
+
+# Identify the client for per-client prefetch state
+def client_id():
+    return request.headers.get("X-Client-Id") or request.remote_addr or "unknown"
+
+# Priority may be a name (high/normal/low) or a number; lower runs first. None if invalid.
+def parse_priority(priority):
+    if isinstance(priority, str) and priority in PRIORITIES:
+        return PRIORITIES[priority]
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        return None
+    return priority
+
+# Join the finished items of a bulk request into one cached bulletin file
+def build_bulletin(filenames, gap_ms):
+    paths = [os.path.join(AUDIO_DIR, filename) for filename in filenames]
+    duration = None
+    
+    def generate(file_path):
+        nonlocal duration
+        duration = stitch_bulletin(paths, file_path, gap_ms)
+    
+    output_file = audio_cache.get_or_create(bulletin_key(filenames, gap_ms), generate)
+    audio_store.record_write(output_file)
+    filename = os.path.basename(output_file)
+    
+    if duration is not None:
+        audio_cache.set_metadata(filename, duration=duration)
+    else:
+        metadata = audio_cache.get_metadata(filename)
+        duration = metadata.get("duration") if metadata else None
+        if duration is None:
+            with timed("duration_probe"):
+                duration = probe_duration(output_file)
+            audio_cache.set_metadata(filename, duration=duration)
+    
+    return {
+        "audioUrl": f"/api/audio/{filename}",
+        "duration": duration,
+        "fileSize": os.path.getsize(output_file)
+    }
+
 @app.route("/api/voice/synthesize", methods=["POST"])
 def api_synthesize_voice():
     """Synthesize text to speech"""
     try:
         data = request.json
-        text = data.get('text', '')
-        voice_id = data.get('voice_id')
-        title = data.get('title', '')
-        summary = data.get('summary', '')
-        
-        if not text:
+        if not data.get('text', ''):
             return jsonify({"error": "No text provided"}), 400
         
-        # Format the text for better speech synthesis
-        # If title and summary are provided, format them nicely
-        if title and summary:
-            formatted_text = f"{title}. {summary}"
+        prefetcher.record_voice(client_id(), data.get('voice_id'))
+        response = build_synthesis_result(format_speech_text(data), data.get('voice_id'))
+        return jsonify(response)
+    except Exception as e:
+        logging.error(f"Error in voice synthesis API: {str(e)}")
+        import traceback
+        logging.error(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/voice/jobs", methods=["POST"])
+def api_submit_synthesis_job():
+    """Queue a synthesis and return a job id right away"""
+    data = request.get_json(silent=True) or {}
+    if not data.get('text', ''):
+        return jsonify({"error": "No text provided"}), 400
+    
+    priority = parse_priority(data.get('priority', 'normal'))
+    if priority is None:
+        return jsonify({"error": f"Invalid priority: {data.get('priority')}"}), 400
+    
+    prefetcher.record_voice(client_id(), data.get('voice_id'))
+    try:
+        job = synthesis_jobs.submit(
+            {"text": format_speech_text(data), "voice_id": data.get('voice_id')},
+            priority=priority
+        )
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
+    
+    response = job.to_dict()
+    response["statusUrl"] = f"/api/voice/jobs/{job.id}"
+    return jsonify(response), 202
+
+@app.route("/api/voice/bulk", methods=["POST"])
+def api_bulk_synthesize():
+    """Synthesize several items concurrently, optionally joined into one bulletin"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "No items provided"}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"Too many items ({len(items)}), the limit is {BULK_MAX_ITEMS}"}), 400
+    
+    priority = parse_priority(data.get('priority', 'normal'))
+    if priority is None:
+        return jsonify({"error": f"Invalid priority: {data.get('priority')}"}), 400
+    gap_ms = data.get('gap_ms', BULLETIN_GAP_MS)
+    if not isinstance(gap_ms, int) or isinstance(gap_ms, bool) or not 0 <= gap_ms <= BULLETIN_MAX_GAP_MS:
+        return jsonify({"error": f"gap_ms must be between 0 and {BULLETIN_MAX_GAP_MS}"}), 400
+    
+    default_voice = data.get('voice_id')
+    prefetcher.record_voice(client_id(), default_voice)
+    
+    # Queue every item at once so the worker pool synthesizes them in parallel
+    jobs = []
+    try:
+        for item in items:
+            text = format_speech_text(item) if isinstance(item, dict) else ""
+            if not text:
+                jobs.append(None)
+                continue
+            jobs.append(synthesis_jobs.submit(
+                {"text": text, "voice_id": item.get('voice_id') or default_voice},
+                priority=priority
+            ))
+    except QueueFull as e:
+        # Don't leave half a bulletin queued
+        for job in jobs:
+            if job is not None:
+                synthesis_jobs.cancel(job.id)
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
+    
+    deadline = time.monotonic() + BULK_TIMEOUT
+    results = []
+    finished = []
+    for index, job in enumerate(jobs):
+        if job is None:
+            results.append({"index": index, "status": "failed", "error": "No text provided"})
+            continue
+        job.done.wait(max(0, deadline - time.monotonic()))
+        result = {"index": index, "jobId": job.id, "status": job.status}
+        if job.status == "done":
+            result.update(job.result)
+            finished.append((index, os.path.basename(job.result["audioUrl"])))
+        elif job.error is not None:
+            result["error"] = job.error
         else:
-            formatted_text = text
-            
-        logging.info(f"Synthesizing text: '{formatted_text[:50]}...'")
-        
-        # Synthesize voice
-        output_file = synthesize_voice(formatted_text, voice_id)
-        
-        # Get the filename from the path
-        filename = os.path.basename(output_file)
-        
-        # Get audio duration using pydub if possible
-        duration = 10  # Default duration
+            # Still queued or running: the client can collect it from the jobs API
+            result["statusUrl"] = f"/api/voice/jobs/{job.id}"
+        results.append(result)
+    
+    response = {"items": results}
+    if data.get('bulletin') and finished:
+        # Items that failed or didn't finish in time are left out of the bulletin
         try:
-            if output_file.lower().endswith('.mp3'):
-                audio = AudioSegment.from_mp3(output_file)
-                duration = len(audio) / 1000  # Convert ms to seconds
-            elif output_file.lower().endswith('.wav'):
-                audio = AudioSegment.from_wav(output_file)
-                duration = len(audio) / 1000  # Convert ms to seconds
+            response["bulletin"] = build_bulletin([filename for _, filename in finished], gap_ms)
+            response["bulletin"]["includedItems"] = [index for index, _ in finished]
         except Exception as e:
-            logging.warning(f"Could not determine audio duration: {e}")
+            logging.error(f"Error building bulletin: {e}")
+            response["bulletinError"] = str(e)
+    return jsonify(response)
+
+@app.route("/api/voice/jobs/<job_id>", methods=["GET"])
+def api_get_synthesis_job(job_id):
+    """Job status; pass ?wait=<seconds> to long-poll until it finishes"""
+    wait = min(max(request.args.get("wait", default=0, type=float), 0), MAX_JOB_WAIT_SECONDS)
+    job = synthesis_jobs.wait(job_id, wait)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/api/voice/jobs/<job_id>", methods=["DELETE"])
+def api_cancel_synthesis_job(job_id):
+    """Cancel a job that hasn't started yet"""
+    if synthesis_jobs.cancel(job_id):
+        return jsonify(synthesis_jobs.get(job_id).to_dict())
+    job = synthesis_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify({"error": f"Job is already {job.status}"}), 409
+
+@app.route("/api/voice/stream", methods=["GET", "POST"])
+def api_stream_voice():
+    """Stream synthesized speech as MP3 while it is being generated"""
+    try:
+        # Accept JSON for fetch() callers and query parameters so an <audio> element can use the URL directly
+        data = request.get_json(silent=True) or request.args
+        if not data.get('text', ''):
+            return jsonify({"error": "No text provided"}), 400
         
-        # Create response object matching the frontend's expected format
-        response = {
-            "audioUrl": f"/api/audio/{filename}",
-            "duration": duration,
-            "fileSize": os.path.getsize(output_file),
-            "voiceId": voice_id or "random"
-        }
+        # Same formatting as /api/voice/synthesize
+        formatted_text = format_speech_text(data)[:STREAM_MAX_CHARS]
+        # Whitespace has nothing to speak; reject it before the response starts
+        if not formatted_text.strip():
+            return jsonify({"error": "No text provided"}), 400
 
-        logging.info(f"Returning response: {response}")
-        return jsonify(response)
+        prefetcher.record_voice(client_id(), data.get('voice_id'))
+        voice_id, voice_sample = resolve_voice(data.get('voice_id'))
+        return Response(
+            stream_voice(formatted_text, voice_id, voice_sample),
+            mimetype="audio/mpeg",
+            headers={"Cache-Control": "no-store", "X-Voice-Id": voice_id}
+        )
     except Exception as e:
-        logging.error(f"Error in voice synthesis API: {str(e)}")
-        import traceback
-        logging.error(traceback.format_exc())
+        logging.error(f"Error in streaming synthesis API: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/audio/<filename>", methods=["GET"])
 def get_audio(filename):
-    """Serve generated audio files"""
+    """Serve generated audio files with ETag, Range and cache headers"""
     try:
-        # Determine the MIME type based on file extension
-        mime_type = "audio/mpeg" if filename.lower().endswith(".mp3") else "audio/x-wav"
-        return send_from_directory(AUDIO_DIR, filename, mimetype=mime_type)
+        with timed("audio_serve"):
+            response = audio_server.response(filename, request)
+        if response is None:
+            return jsonify({"error": f"Audio file not found: {filename}"}), 404
+        # Feed access times to the eviction policy
+        audio_store.touch(filename)
+        return response
+    except RequestedRangeNotSatisfiable:
+        raise
     except Exception as e:
         logging.error(f"Error serving audio file {filename}: {e}")
         return jsonify({"error": f"Audio file not found: {filename}"}), 404
 
+def warmup_tasks():
+    """Heavy imports and model loads the warm-up thread runs after boot, most needed first"""
+    tasks = [("feedparser", feedparser.load), ("tts", tts_backends.preload), ("pydub", pydub.load)]
+    if SUMMARIZER_PRELOAD:
+        tasks.append(("summarizer", lambda: summarizers.preload(SUMMARIZER_MODEL)))
+    else:
+        tasks.append(("transformers", transformers.load))
+    return tasks
+
+
+def preload_engines():
+    """Load heavy libraries and configured models now, e.g. in a server's master process before it forks"""
+    warm_up(warmup_tasks())
+
+
+def start_background_work():
+    """Start the threads of the process that serves requests; threads don't survive a fork, so call this after it"""
+    if FEED_POLLER_ENABLED:
+        feed_poller.start()
+    audio_store.start()
+
+
+startup.mark_ready()
+logging.info(f"Backend importable in {startup.ready_after:.2f}s ({startup.summary() or 'no heavy imports'})")
+
 if __name__ == "__main__":
+    # Development server; see wsgi.py and gunicorn.conf.py for production serving
+    # Only start background work in the process that actually serves requests, not the reloader parent
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        if WARMUP_ENABLED:
+            start_warmup(warmup_tasks())
+        else:
+            # Without the warm-up thread, configured engines load before serving as before
+            if SUMMARIZER_PRELOAD:
+                summarizers.preload(SUMMARIZER_MODEL)
+            tts_backends.preload()
+        start_background_work()
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,171 @@
+"""
+Content-addressed cache for synthesized speech.
+
+Audio files are named after a hash of the normalized text, the voice id and
+the gTTS profile used to speak it, so replaying the same article with the
+same voice reuses the file that is already on disk. Concurrent requests for
+the same key share a single synthesis.
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import threading
+import unicodedata
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Metadata entries (e.g. probed durations) kept in memory
+AUDIO_METADATA_ITEMS = 10000
+
+
+def normalize_text(text):
+    """Normalize text so trivially different inputs map to the same audio"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def audio_key(text, voice_id, profile):
+    """Cache key for text spoken with voice_id using the given voice profile (lang/tld/slow)"""
+    payload = json.dumps(
+        {"text": normalize_text(text), "voice": voice_id, "profile": profile},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class AudioCache:
+    """Maps cache keys to audio files in a directory and coalesces in-flight syntheses"""
+
+    def __init__(self, directory, extension=".mp3", shared=None):
+        self.directory = directory
+        self.extension = extension
+        self.shared = shared
+        self._inflight = {}
+        self._metadata = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "failures": 0}
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}{self.extension}")
+
+    def partial_path(self, key):
+        """A unique temporary path to write audio for key before commit()"""
+        return os.path.join(self.directory, f"{key}.{uuid.uuid4().hex}.part")
+
+    def commit(self, key, partial_path):
+        """Atomically move a finished partial file into place as the cached audio for key"""
+        if not os.path.exists(partial_path) or os.path.getsize(partial_path) == 0:
+            raise FileNotFoundError(f"Synthesis produced no audio for {key}")
+        final_path = self.path_for(key)
+        os.replace(partial_path, final_path)
+        return final_path
+
+    def discard(self, partial_path):
+        """Remove a partial file that won't be committed"""
+        try:
+            os.remove(partial_path)
+        except FileNotFoundError:
+            pass
+
+    def lookup(self, key):
+        """Path of the cached file for key, or None"""
+        path = self.path_for(key)
+        return path if os.path.exists(path) else None
+
+    def get_or_create(self, key, create):
+        """
+        Return the audio file for key, synthesizing it if needed.
+
+        Args:
+            key: cache key from audio_key()
+            create: callable(path) that writes the audio to path; it must
+                raise if synthesis failed so nothing bad gets cached
+
+        Returns:
+            Path to the cached audio file
+        """
+        path = self.lookup(key)
+        if path is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+            logging.debug(f"Audio cache hit: {os.path.basename(path)}")
+            return path
+
+        with self._lock:
+            # Check again under the lock in case a synthesis just finished
+            path = self.lookup(key)
+            if path is not None:
+                self._stats["hits"] += 1
+                return path
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self._stats["misses"] += 1
+                leader = True
+
+        if not leader:
+            logging.info(f"Waiting for in-flight synthesis of {key}")
+            return future.result()
+
+        # Write to a temporary name so readers never see a partial file
+        partial_path = self.partial_path(key)
+        try:
+            create(partial_path)
+            final_path = self.commit(key, partial_path)
+            future.set_result(final_path)
+            return final_path
+        except Exception as e:
+            with self._lock:
+                self._stats["failures"] += 1
+            self.discard(partial_path)
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_metadata(self, filename):
+        """Metadata recorded for an audio file (e.g. its duration), or None"""
+        with self._lock:
+            meta = self._metadata.get(filename)
+            if meta is not None:
+                self._metadata.move_to_end(filename)
+                return dict(meta)
+
+        if self.shared is not None:
+            # Another worker may have recorded it
+            meta = self.shared.get("audio_meta", filename)
+            if meta is not None:
+                with self._lock:
+                    self._remember_metadata(filename, meta)
+                return dict(meta)
+        return None
+
+    def set_metadata(self, filename, **fields):
+        """Record metadata for an audio file so it doesn't have to be recomputed"""
+        with self._lock:
+            meta = dict(self._metadata.get(filename, {}), **fields)
+            self._remember_metadata(filename, meta)
+        if self.shared is not None:
+            self.shared.put("audio_meta", filename, meta)
+
+    def _remember_metadata(self, filename, meta):
+        """Keep metadata in the in-memory tier (caller holds the lock)"""
+        self._metadata[filename] = meta
+        self._metadata.move_to_end(filename)
+        while len(self._metadata) > AUDIO_METADATA_ITEMS:
+            self._metadata.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["inFlight"] = len(self._inflight)
+        return stats
@@ -0,0 +1,321 @@
+"""
+Audio duration probing from file headers.
+
+WAV durations come from the fmt and data chunks. MP3 durations come from
+a Xing/Info or VBRI header when present, otherwise from walking the frame
+headers. Only headers are read: a bounded prefix of the file, and when an
+MP3 has no summary header, the 4-byte header of each frame, seeking over
+the audio data in between. The whole file is only decoded (with
+pydub/ffmpeg) when the headers can't be understood.
+
+`join_mp3` joins separately encoded MP3s (like synthesized chunks) without
+the per-part headers that would make the result look as long as its first
+part.
+"""
+
+import io
+import os
+import struct
+import logging
+
+# Bytes read from the start of the audio (after any ID3v2 tag) to find the first frame and its summary header
+PROBE_HEADER_BYTES = 16 * 1024
+
+# Bytes searched for the next frame when a frame walk loses sync
+PROBE_RESYNC_BYTES = 64 * 1024
+
+# Bitrates in kbps indexed by [version family][layer][bitrate index]
+_MP3_BITRATES = {
+    1: {
+        1: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    },
+    2: {
+        1: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        3: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    },
+}
+
+# Sample rates indexed by MPEG version bits
+_MP3_SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],  # MPEG 1
+    0b10: [22050, 24000, 16000],  # MPEG 2
+    0b00: [11025, 12000, 8000],   # MPEG 2.5
+}
+
+# Layer bits -> layer number
+_MP3_LAYERS = {0b11: 1, 0b10: 2, 0b01: 3}
+
+
+def _parse_mp3_header(data, offset):
+    """Decode the 4-byte MP3 frame header at offset, or return None if it isn't one"""
+    if offset + 4 > len(data):
+        return None
+    header = struct.unpack_from(">I", data, offset)[0]
+    if header & 0xFFE00000 != 0xFFE00000:
+        return None
+
+    version_bits = (header >> 19) & 0b11
+    layer_bits = (header >> 17) & 0b11
+    bitrate_index = (header >> 12) & 0b1111
+    sample_rate_index = (header >> 10) & 0b11
+    padding = (header >> 9) & 0b1
+    channel_mode = (header >> 6) & 0b11
+
+    if version_bits == 0b01 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    layer = _MP3_LAYERS[layer_bits]
+    family = 1 if version_bits == 0b11 else 2
+    bitrate = _MP3_BITRATES[family][layer][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 1152 if family == 1 else 576
+        length = (144 if family == 1 else 72) * bitrate // sample_rate + padding
+
+    return {
+        "family": family,
+        "mono": channel_mode == 0b11,
+        "sample_rate": sample_rate,
+        "samples": samples,
+        "length": length,
+    }
+
+
+def _skip_id3v2(data):
+    """Offset of the first byte after an ID3v2 tag (0 if there is none)"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _find_frame(data, offset, limit=65536):
+    """Offset of the next valid frame header at or after offset, searching at most limit bytes"""
+    end = min(len(data) - 3, offset + limit)
+    while offset < end:
+        offset = data.find(b"\xff", offset, end)
+        if offset < 0:
+            return None
+        frame = _parse_mp3_header(data, offset)
+        if frame is not None and frame["length"] > 0:
+            return offset
+        offset += 1
+    return None
+
+
+def _summary_tag(data, offset, first):
+    """(position, "xing" or "vbri") of the summary header in the first frame at offset, or None"""
+    # Xing/Info header sits right after the side information of the first frame
+    if first["family"] == 1:
+        side_info = 17 if first["mono"] else 32
+    else:
+        side_info = 9 if first["mono"] else 17
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        return xing, "xing"
+
+    # VBRI header is always 32 bytes after the frame header
+    vbri = offset + 36
+    if data[vbri:vbri + 4] == b"VBRI":
+        return vbri, "vbri"
+    return None
+
+
+def _summary_header(data, offset, first):
+    """(frame count, stream bytes or None) from the summary header of the first frame at offset, or None"""
+    tag = _summary_tag(data, offset, first)
+    if tag is None:
+        return None
+    position, kind = tag
+    if kind == "vbri":
+        if position + 18 > len(data):
+            return None
+        stream_bytes, frames = struct.unpack_from(">II", data, position + 10)
+        return (frames, stream_bytes) if frames else None
+
+    if position + 8 > len(data):
+        return None
+    flags = struct.unpack_from(">I", data, position + 4)[0]
+    field = position + 8
+    frames = stream_bytes = None
+    if flags & 0x1 and field + 4 <= len(data):
+        frames = struct.unpack_from(">I", data, field)[0]
+        field += 4
+    if flags & 0x2 and field + 4 <= len(data):
+        stream_bytes = struct.unpack_from(">I", data, field)[0]
+    return (frames, stream_bytes) if frames else None
+
+
+def _walk_frames(f, position, size):
+    """Add up the samples of every frame from position on, reading only the frame headers"""
+    duration = 0.0
+    while position + 4 <= size:
+        f.seek(position)
+        header = f.read(10)
+        frame = _parse_mp3_header(header, 0)
+        if frame is None or frame["length"] <= 0:
+            # An ID3v2 tag in the middle, from MP3s joined end to end
+            tag = _skip_id3v2(header)
+            if tag:
+                position += tag
+                continue
+            # Lost sync (e.g. concatenated streams or a trailing tag); look for the next frame
+            f.seek(position + 1)
+            found = _find_frame(f.read(PROBE_RESYNC_BYTES), 0)
+            if found is None:
+                break
+            position += 1 + found
+            continue
+        duration += frame["samples"] / frame["sample_rate"]
+        position += frame["length"]
+    return duration
+
+
+def _probe_mp3(f, size):
+    head = f.read(PROBE_HEADER_BYTES)
+    start = _skip_id3v2(head)
+    if start:
+        # The tag may be longer than what we read; start over after it
+        f.seek(start)
+        head = f.read(PROBE_HEADER_BYTES)
+    offset = _find_frame(head, 0)
+    if offset is None:
+        return None
+    first = _parse_mp3_header(head, offset)
+
+    summary = _summary_header(head, offset, first)
+    if summary is not None:
+        frames, stream_bytes = summary
+        # The header only describes the stream it was written for; when clearly more audio
+        # follows (MP3s joined end to end), its count is too low, so walk the frames instead
+        slack = (stream_bytes or 0) // 50 + 2 * first["length"] + 128
+        if stream_bytes is None or size - (start + offset) <= stream_bytes + slack:
+            return frames * first["samples"] / first["sample_rate"]
+
+    # No usable summary header: walk the frame headers, skipping the summary frame, which holds no audio
+    position = start + offset
+    if _summary_tag(head, offset, first) is not None:
+        position += first["length"]
+    return _walk_frames(f, position, size)
+
+
+def _probe_wav(f, size):
+    head = f.read(12)
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None
+
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= size:
+        f.seek(offset)
+        chunk = f.read(8)
+        chunk_id = chunk[:4]
+        chunk_size = struct.unpack_from("<I", chunk, 4)[0]
+        body = offset + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            byte_rate = struct.unpack_from("<I", f.read(16), 8)[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streaming writers leave the size unset; use what's actually in the file
+            available = size - body
+            if chunk_size == 0 or chunk_size == 0xFFFFFFFF or chunk_size > available:
+                chunk_size = available
+            return chunk_size / byte_rate
+        # Chunks are padded to an even size; large chunks (like LIST) are seeked over, not read
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def probe_mp3_duration(data):
+    """Duration in seconds of MP3 bytes, read from headers only. None if no frames were found."""
+    return _probe_mp3(io.BytesIO(data), len(data))
+
+
+def probe_wav_duration(data):
+    """Duration in seconds of RIFF/WAVE bytes from the fmt and data chunks. None if malformed."""
+    return _probe_wav(io.BytesIO(data), len(data))
+
+
+def strip_mp3_headers(data, keep_id3=False):
+    """
+    The audio frames of MP3 bytes, without a Xing/Info or VBRI frame or a
+    trailing ID3v1 tag, and without the leading ID3v2 tag unless keep_id3.
+    Anything that doesn't look like MP3 is returned unchanged.
+    """
+    if data[:4] == b"RIFF":
+        return data
+    start = _skip_id3v2(data)
+    offset = _find_frame(data, start)
+    if offset is None:
+        return data
+    first = _parse_mp3_header(data, offset)
+    audio = offset + first["length"] if _summary_tag(data, offset, first) is not None else offset
+    end = len(data)
+    if end - audio >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return (data[:start] if keep_id3 else b"") + data[audio:end]
+
+
+def join_mp3(parts):
+    """
+    Join separately encoded MP3s into one stream.
+
+    Each part's Xing/Info or VBRI frame only counts that part's frames, and
+    players and probes take the first one for the whole file, so they are
+    all dropped along with every ID3 tag but the first.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    return b"".join(strip_mp3_headers(part, keep_id3=(index == 0)) for index, part in enumerate(parts))
+
+
+def _decode_duration(path):
+    """Duration from a full decode; slow, only used when the headers don't make sense"""
+    from pydub import AudioSegment
+    return len(AudioSegment.from_file(path)) / 1000
+
+
+def probe_duration(path, allow_decode=True):
+    """
+    Duration of an audio file in seconds.
+
+    The format is sniffed from the content rather than the extension, since
+    fallback syntheses can write WAV data to a .mp3 name. Returns None if
+    the duration could not be determined.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            probe = _probe_wav if f.read(4) == b"RIFF" else _probe_mp3
+            f.seek(0)
+            try:
+                duration = probe(f, size)
+            except (struct.error, IndexError) as e:
+                logging.warning(f"Malformed audio headers in {path}: {e}")
+                duration = None
+    except OSError as e:
+        logging.warning(f"Could not read {path} for duration probe: {e}")
+        return None
+
+    if duration is not None:
+        return round(duration, 3)
+
+    if allow_decode:
+        try:
+            logging.info(f"Header probe failed for {path}, decoding the whole file")
+            return _decode_duration(path)
+        except Exception as e:
+            logging.warning(f"Could not determine audio duration of {path}: {e}")
+    return None
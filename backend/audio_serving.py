@@ -0,0 +1,247 @@
+"""
+HTTP serving of generated audio.
+
+Adds what browsers need to avoid re-downloading audio: strong ETags,
+Range/206 responses for seeking, and long-lived immutable caching for
+content-addressed files. Frequently played files are kept in an in-memory
+hot set, and clients can ask for a low-bitrate variant with
+`?quality=low` or the `Save-Data: on` header.
+"""
+
+import os
+import re
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+
+# Bytes of audio kept in memory for the most played files
+AUDIO_HOT_SET_BYTES = int(os.environ.get("AUDIO_HOT_SET_BYTES", str(32 * 1024 * 1024)))
+
+# Plays before a file is admitted to the hot set
+AUDIO_HOT_SET_MIN_PLAYS = int(os.environ.get("AUDIO_HOT_SET_MIN_PLAYS", "2"))
+
+# Serve low-bitrate variants when clients ask for them
+AUDIO_VARIANTS_ENABLED = os.environ.get("AUDIO_VARIANTS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Bitrate of the low-quality variant
+AUDIO_LOW_BITRATE = os.environ.get("AUDIO_LOW_BITRATE", "32k")
+
+# Files named by audio_cache.audio_key() (optionally with a variant suffix) never change
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{32}(\.[a-z]+)?\.(mp3|wav)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=86400"
+# The original stands in for a low-bitrate variant that isn't built yet; clients should
+# come back for the variant soon instead of keeping the original for that URL
+FALLBACK_CACHE_CONTROL = "public, max-age=60"
+
+# Largest file considered for the hot set
+HOT_SET_MAX_FILE_BYTES = 4 * 1024 * 1024
+
+
+def audio_mimetype(filename):
+    return "audio/mpeg" if filename.lower().endswith(".mp3") else "audio/x-wav"
+
+
+def variant_name(filename, variant):
+    """Filename of a variant of filename, e.g. abc.mp3 -> abc.low.mp3"""
+    stem, _ = os.path.splitext(filename)
+    return f"{stem}.{variant}.mp3"
+
+
+class HotSet:
+    """Byte-bounded LRU of file contents, validated against the file's size and mtime"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, filename, stat):
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is None:
+                return None
+            signature, data = entry
+            if signature != (stat.st_size, stat.st_mtime_ns):
+                # The file changed on disk; drop the stale copy
+                self._drop(filename)
+                return None
+            self._entries.move_to_end(filename)
+            return data
+
+    def put(self, filename, stat, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(filename)
+            self._entries[filename] = ((stat.st_size, stat.st_mtime_ns), data)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def _drop(self, filename):
+        entry = self._entries.pop(filename, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def stats(self):
+        with self._lock:
+            return {"files": len(self._entries), "bytes": self._bytes, "maxBytes": self.max_bytes}
+
+
+class AudioServer:
+    """Builds cache-friendly, range-capable responses for files in the audio directory"""
+
+    def __init__(self, directory, hot_set_bytes=AUDIO_HOT_SET_BYTES, min_plays=AUDIO_HOT_SET_MIN_PLAYS,
+                 variants_enabled=AUDIO_VARIANTS_ENABLED, low_bitrate=AUDIO_LOW_BITRATE):
+        self.directory = directory
+        self.min_plays = min_plays
+        self.variants_enabled = variants_enabled
+        self.low_bitrate = low_bitrate
+        self.hot_set = HotSet(hot_set_bytes)
+        self._plays = OrderedDict()
+        self._transcoding = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-variant")
+        self._lock = threading.Lock()
+        self._stats = {"served": 0, "hotHits": 0, "rangeRequests": 0, "notModified": 0,
+                       "variantsServed": 0, "variantFallbacks": 0, "variantsCreated": 0}
+
+    def resolve(self, filename):
+        """Absolute path of filename inside the audio directory, or None if it doesn't exist"""
+        path = safe_join(self.directory, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        return path
+
+    def _count_play(self, filename):
+        with self._lock:
+            plays = self._plays.get(filename, 0) + 1
+            self._plays[filename] = plays
+            self._plays.move_to_end(filename)
+            # Only remember play counts for a bounded number of files
+            while len(self._plays) > 10000:
+                self._plays.popitem(last=False)
+            return plays
+
+    def _transcode(self, source_path, target_path):
+        """Write a low-bitrate mono MP3 of source_path to target_path"""
+        try:
+            from pydub import AudioSegment
+            partial_path = target_path + ".part"
+            AudioSegment.from_file(source_path).set_channels(1).export(
+                partial_path, format="mp3", bitrate=self.low_bitrate
+            )
+            os.replace(partial_path, target_path)
+            with self._lock:
+                self._stats["variantsCreated"] += 1
+            logging.info(f"Created low-bitrate variant {os.path.basename(target_path)}")
+        except Exception as e:
+            logging.warning(f"Could not create low-bitrate variant of {source_path}: {e}")
+        finally:
+            with self._lock:
+                self._transcoding.discard(target_path)
+
+    def _pick_variant(self, filename, request):
+        """
+        Filename to serve and whether it stands in for a variant that isn't ready:
+        the low-bitrate variant if requested and ready, else the original
+        """
+        if not self.variants_enabled or ".low." in filename:
+            return filename, False
+        wants_low = request.args.get("quality") == "low" or request.headers.get("Save-Data", "").lower() == "on"
+        if not wants_low:
+            return filename, False
+
+        low_name = variant_name(filename, "low")
+        if self.resolve(low_name) is not None:
+            with self._lock:
+                self._stats["variantsServed"] += 1
+            return low_name, False
+
+        # Build the variant in the background and serve the original this time
+        low_path = os.path.join(self.directory, low_name)
+        with self._lock:
+            self._stats["variantFallbacks"] += 1
+            if low_path in self._transcoding:
+                return filename, True
+            self._transcoding.add(low_path)
+        self._executor.submit(self._transcode, os.path.join(self.directory, filename), low_path)
+        return filename, True
+
+    def response(self, filename, request):
+        """Response serving filename for request, or None if the file doesn't exist"""
+        if self.resolve(filename) is None:
+            return None
+        served_name, fallback = self._pick_variant(filename, request)
+        path = self.resolve(served_name)
+        if path is None:
+            # The variant disappeared between the check and now
+            served_name, path, fallback = filename, self.resolve(filename), True
+            if path is None:
+                return None
+
+        stat = os.stat(path)
+        data = self.hot_set.get(served_name, stat)
+        if data is None and stat.st_size <= HOT_SET_MAX_FILE_BYTES and self._count_play(served_name) >= self.min_plays:
+            with open(path, "rb") as f:
+                data = f.read()
+            self.hot_set.put(served_name, stat, data)
+        elif data is not None:
+            with self._lock:
+                self._stats["hotHits"] += 1
+
+        if data is not None:
+            body = data
+        else:
+            body = wrap_file(request.environ, open(path, "rb"))
+
+        response = Response(body, mimetype=audio_mimetype(served_name), direct_passthrough=True)
+        response.content_length = stat.st_size
+        response.last_modified = stat.st_mtime
+
+        # Content-addressed names identify their content; others use size and mtime
+        if CONTENT_ADDRESSED_NAME.match(served_name):
+            etag = os.path.splitext(served_name)[0]
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            etag = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+            cache_control = DEFAULT_CACHE_CONTROL
+        if fallback:
+            # Name the original in the ETag so revalidation picks up the variant once it's built
+            etag = f"{etag}.original"
+            cache_control = FALLBACK_CACHE_CONTROL
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = cache_control
+        if self.variants_enabled:
+            response.vary.add("Save-Data")
+
+        if request.range is not None:
+            with self._lock:
+                self._stats["rangeRequests"] += 1
+
+        # Handles If-None-Match/If-Modified-Since (304) and Range/If-Range (206/416)
+        try:
+            response = response.make_conditional(request, accept_ranges=True, complete_length=stat.st_size)
+        except Exception:
+            # Don't leak the open file when the range can't be satisfied
+            response.close()
+            raise
+        with self._lock:
+            self._stats["served"] += 1
+            if response.status_code == 304:
+                self._stats["notModified"] += 1
+        return response
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["hotSet"] = self.hot_set.stats()
+        return stats
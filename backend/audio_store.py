@@ -0,0 +1,223 @@
+"""
+Size-bounded storage for generated audio.
+
+Tracks when each file in generated_audio/ was last served and evicts the
+least recently used (or too old) files once the directory goes over its
+byte or file-count budget. Files handed out by a recent synthesize response
+are pinned for a grace period so clients can still fetch them. With a
+SharedState, access times and pins are pooled across worker processes so
+one worker never evicts a file another has just handed out.
+"""
+
+import os
+import time
+import threading
+import logging
+
+# Total size allowed for generated audio
+AUDIO_STORE_MAX_BYTES = int(os.environ.get("AUDIO_STORE_MAX_BYTES", str(500 * 1024 * 1024)))
+
+# Number of files allowed in generated audio
+AUDIO_STORE_MAX_FILES = int(os.environ.get("AUDIO_STORE_MAX_FILES", "2000"))
+
+# Seconds since last access after which a file is evicted regardless of budget (0 = never)
+AUDIO_STORE_MAX_AGE = int(os.environ.get("AUDIO_STORE_MAX_AGE", str(7 * 24 * 3600)))
+
+# Seconds a freshly returned file is protected from eviction
+AUDIO_STORE_GRACE = int(os.environ.get("AUDIO_STORE_GRACE", "600"))
+
+# Seconds between background compactions
+AUDIO_STORE_COMPACT_INTERVAL = int(os.environ.get("AUDIO_STORE_COMPACT_INTERVAL", "300"))
+
+# Audio files we manage; anything else in the directory is left alone
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+
+# Temporary files left behind by interrupted syntheses are removed after this many seconds
+STALE_PARTIAL_SECONDS = 3600
+
+
+class AudioStore:
+    """Access-tracking, budgeted view over the generated audio directory"""
+
+    def __init__(self, directory, max_bytes=AUDIO_STORE_MAX_BYTES, max_files=AUDIO_STORE_MAX_FILES,
+                 max_age=AUDIO_STORE_MAX_AGE, grace=AUDIO_STORE_GRACE, interval=AUDIO_STORE_COMPACT_INTERVAL,
+                 shared=None):
+        self.directory = directory
+        self.shared = shared
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_age = max_age
+        self.grace = grace
+        self.interval = interval
+
+        self._last_access = {}
+        self._pinned_until = {}
+        # Accesses not yet written to the shared state
+        self._unsynced = set()
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._stats = {
+            "evictedFiles": 0,
+            "evictedBytes": 0,
+            "compactions": 0,
+            "lastCompaction": None,
+            "files": 0,
+            "bytes": 0
+        }
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record_write(self, path):
+        """Note a file that was just handed to a client; it is pinned for the grace period"""
+        filename = os.path.basename(path)
+        now = time.time()
+        with self._lock:
+            self._last_access[filename] = now
+            self._pinned_until[filename] = now + self.grace
+            self._unsynced.add(filename)
+        if self.shared is not None:
+            # Pins are published right away; other workers may be about to compact
+            self.shared.put("audio_pins", filename, {"until": now + self.grace}, expires_at=now + self.grace)
+
+    def touch(self, filename):
+        """Record that a file was served"""
+        with self._lock:
+            self._last_access[filename] = time.time()
+            self._unsynced.add(filename)
+
+    def _sync(self):
+        """Publish buffered access times and merge in those recorded by other workers"""
+        if self.shared is None:
+            return
+        with self._lock:
+            unsynced = {name: {"at": self._last_access[name]} for name in self._unsynced if name in self._last_access}
+            self._unsynced.clear()
+        self.shared.put_many("audio_access", unsynced)
+        self.shared.purge_expired()
+
+        accessed = self.shared.items("audio_access")
+        pins = self.shared.items("audio_pins")
+        with self._lock:
+            for name, access in accessed.items():
+                if access["at"] > self._last_access.get(name, 0):
+                    self._last_access[name] = access["at"]
+            for name, pin in pins.items():
+                if pin["until"] > self._pinned_until.get(name, 0):
+                    self._pinned_until[name] = pin["until"]
+
+    def _scan(self):
+        """List managed files as (filename, size, last_access) and clean up stale partial files"""
+        files = []
+        now = time.time()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(".part"):
+                    if now - stat.st_mtime > STALE_PARTIAL_SECONDS:
+                        self._remove(entry.path)
+                    continue
+                if not entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                files.append((entry.name, stat.st_size, stat.st_mtime))
+
+        with self._lock:
+            return [
+                (name, size, self._last_access.get(name, mtime))
+                for name, size, mtime in files
+            ]
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logging.warning(f"Could not evict {path}: {e}")
+            return False
+
+    def compact(self):
+        """Evict expired files, then least recently used files until the store is within budget"""
+        with self._compact_lock:
+            self._sync()
+            now = time.time()
+            files = self._scan()
+            total_bytes = sum(size for _, size, _ in files)
+            total_files = len(files)
+
+            with self._lock:
+                # Forget pins that have run out
+                self._pinned_until = {
+                    name: until for name, until in self._pinned_until.items() if until > now
+                }
+                pinned = set(self._pinned_until)
+
+            evicted_files = 0
+            evicted_bytes = 0
+            # Oldest access first
+            for name, size, last_access in sorted(files, key=lambda f: f[2]):
+                expired = self.max_age > 0 and now - last_access > self.max_age
+                over_budget = total_bytes > self.max_bytes or total_files > self.max_files
+                if not expired and not over_budget:
+                    break
+                if name in pinned:
+                    continue
+                if self._remove(os.path.join(self.directory, name)):
+                    total_bytes -= size
+                    total_files -= 1
+                    evicted_files += 1
+                    evicted_bytes += size
+                    with self._lock:
+                        self._last_access.pop(name, None)
+                    if self.shared is not None:
+                        self.shared.delete("audio_access", name)
+                        self.shared.delete("audio_meta", name)
+
+            with self._lock:
+                self._stats["evictedFiles"] += evicted_files
+                self._stats["evictedBytes"] += evicted_bytes
+                self._stats["compactions"] += 1
+                self._stats["lastCompaction"] = now
+                self._stats["files"] = total_files
+                self._stats["bytes"] = total_bytes
+
+            if evicted_files:
+                logging.info(f"Evicted {evicted_files} audio files ({evicted_bytes} bytes), "
+                             f"{total_files} files / {total_bytes} bytes remain")
+            return evicted_files
+
+    def stats(self):
+        """Occupancy as of the last compaction plus eviction counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pinned"] = len(self._pinned_until)
+        stats["maxBytes"] = self.max_bytes
+        stats["maxFiles"] = self.max_files
+        if self.max_bytes:
+            stats["occupancy"] = round(stats["bytes"] / self.max_bytes, 3)
+        return stats
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.compact()
+            except Exception as e:
+                logging.error(f"Audio store compaction failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audio-store-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
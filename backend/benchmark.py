@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the backend with local stand-ins for the network.
+
+Serves generated RSS feeds from a local fixture server, swaps in a stub
+summarizer and a stub TTS engine, runs the Flask app on a local port and
+drives /api/news and /api/voice/synthesize with concurrent clients. The
+news-cold scenario clears the feed store, news index and summary cache
+before each request, so feed fetching, parsing and dedupe are measured too.
+Latency percentiles and throughput are reported per endpoint and per
+stage as JSON, so runs can be compared. No network access is needed.
+
+    python benchmark.py --requests 200 --concurrency 8 --output results.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import functools
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz): 417 bytes, 1152 samples
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+MP3_FRAME_SECONDS = 1152 / 44100
+
+# Characters of text the stub TTS "speaks" per second
+STUB_SPEECH_CHARS_PER_SECOND = 15
+
+# Stages each scenario must report; warm news requests are served from the index and
+# summary cache, so feed fetching, parsing and dedupe only show up in cold requests
+EXPECTED_STAGES = {
+    "news": ["paginate", "summarize"],
+    "news-cold": ["fetch", "parse", "dedupe", "paginate", "summarize"],
+    "synthesize": ["synthesize", "duration_probe"],
+}
+
+TOPICS = [
+    "government announces new election policy",
+    "startup unveils software for artificial intelligence",
+    "football team wins championship match",
+    "film festival award goes to new movie",
+    "scientists publish climate research study",
+    "markets react to central bank decision",
+]
+
+# Made-up words added to fixture titles so that no two titles are near duplicates of each other
+TITLE_WORDS = [head + tail for head in ("ka", "lo", "mi", "ra", "tu", "ve", "zo", "ne", "pa", "si", "do", "fe")
+               for tail in ("dan", "rel", "mos", "tik", "bur", "sel", "vin", "gor", "lam", "pex", "nur", "qua")]
+
+
+def percentiles(values):
+    """p50/p95/p99 and mean of a list of seconds, in milliseconds"""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "mean": None}
+    ordered = sorted(values)
+
+    def pick(fraction):
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3)
+    }
+
+
+class StageTimer:
+    """Collects durations of named stages from any thread"""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    def wrap(self, stage, func):
+        """func, timed under stage"""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def report(self):
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+        return {
+            stage: dict(count=len(values), latencyMs=percentiles(values))
+            for stage, values in sorted(samples.items())
+        }
+
+
+def build_feed(feed_index, items, now):
+    """RSS document with `items` deterministic entries, newest first"""
+    # Titles share their topic's words but are otherwise distinct, so deduplication keeps every entry
+    rng = random.Random(feed_index)
+    entries = []
+    for i in range(items):
+        topic = TOPICS[(feed_index + i) % len(TOPICS)]
+        published = formatdate(now - (i * 600 + feed_index * 60))
+        entries.append(
+            "<item>"
+            f"<title>{topic.capitalize()} {' '.join(rng.sample(TITLE_WORDS, 5))}</title>"
+            f"<link>http://fixture.local/{feed_index}/{i}</link>"
+            f"<guid>fixture-{feed_index}-{i}</guid>"
+            f"<pubDate>{published}</pubDate>"
+            f"<description>Officials said the {topic} story developed further on day {i}. "
+            f"Reporters followed the {topic} details throughout the afternoon.</description>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Fixture Feed {feed_index}</title><link>http://fixture.local/{feed_index}</link>"
+        f"<description>Benchmark fixture</description>{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def start_fixture_server(feeds, items, latency, conditional):
+    """Serve /feed/<n>.xml on a free local port; returns (server, feed urls)"""
+    now = time.time()
+    bodies = {f"/feed/{n}.xml": build_feed(n, items, now) for n in range(feeds)}
+    etags = {path: '"' + hashlib.sha1(body).hexdigest() + '"' for path, body in bodies.items()}
+
+    class FeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = bodies.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            if conditional and self.headers.get("If-None-Match") == etags[self.path]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etags[self.path])
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The poller stops reading once it has FEED_MAX_ENTRIES entries
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fixture-feeds", daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    return server, [f"{base}{path}" for path in bodies]
+
+
+class StubPipeline:
+    """Stands in for the Hugging Face summarization pipeline"""
+
+    tokenizer = None
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __call__(self, texts, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(texts, str):
+            texts = [texts]
+        return [{"summary_text": " ".join(text.split()[:30])} for text in texts]
+
+
+def stub_tts_backend(latency):
+    """A TTS backend returning silent MP3 audio as long as the text would take to read"""
+    from tts_backends import TTSBackend
+
+    class StubTTSBackend(TTSBackend):
+        name = "stub"
+        max_chars = 300
+
+        def synthesize(self, text, profile, speaker_wav=None):
+            if latency:
+                time.sleep(latency)
+            seconds = max(1.0, len(text) / STUB_SPEECH_CHARS_PER_SECOND)
+            return MP3_FRAME * int(seconds / MP3_FRAME_SECONDS)
+
+    return StubTTSBackend()
+
+
+def drive(name, send, total, concurrency, first_index=0):
+    """Send `total` requests from `concurrency` threads and summarize the client-side latencies"""
+    latencies = []
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(index):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = send(local.session, index)
+        except requests.RequestException as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if status != 200:
+                errors[str(status)] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{name}") as pool:
+        list(pool.map(one, range(first_index, first_index + total)))
+    wall = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": dict(errors),
+        "wallSeconds": round(wall, 3),
+        "throughputRps": round(total / wall, 2) if wall else None,
+        "latencyMs": percentiles(latencies)
+    }
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="breeze-bench-")
+
+    # Keep the app's caches and generated audio out of the real directories
+    os.environ.update({
+        "AUDIO_DIR": os.path.join(workdir, "audio"),
+        "SUMMARY_CACHE_PATH": os.path.join(workdir, "summaries.db"),
+        "FEED_POLLER_ENABLED": "false",
+        "PREFETCH_ENABLED": "false",
+        "SUMMARIZER_PRELOAD": "false",
+    })
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as backend
+    from summarizer import SummarizerRegistry
+    from werkzeug.serving import make_server
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    if not backend.get_available_voices():
+        raise SystemExit(f"No voice samples in {backend.VOICE_SAMPLES_DIR}; run setup_voices.py first")
+
+    fixture, feed_urls = start_fixture_server(args.feeds, args.items_per_feed, args.feed_latency, args.conditional)
+    timer = StageTimer()
+
+    # Local stand-ins for the feeds, the summarization model and the TTS engine; tracked like
+    # the configured feeds so they get conditional GETs and circuit breakers
+    backend.DEFAULT_FEEDS[:] = feed_urls
+    for feed_url in feed_urls:
+        backend.feed_store.track(feed_url)
+    backend.summarizers = SummarizerRegistry(loader=lambda model_name: StubPipeline(args.summarize_latency))
+    backend.tts_backends.register(stub_tts_backend(args.tts_latency))
+    backend.tts_backends.default = "stub"
+    backend.tts_backends.voice_backends.clear()
+
+    # Time each stage where the app calls it
+    session = backend.feed_poller.session
+    session.get = timer.wrap("fetch", session.get)
+    backend.feed_poller.parse_feed = timer.wrap("parse", backend.feed_poller.parse_feed)
+    backend.feed_store._listeners[:] = [timer.wrap("dedupe", backend.news_index.add)]
+    backend.news_index.page = timer.wrap("paginate", backend.news_index.page)
+    backend.summarize_news = timer.wrap("summarize", backend.summarize_news)
+    stub = backend.tts_backends.get("stub")
+    stub.synthesize = timer.wrap("synthesize", stub.synthesize)
+    backend.probe_duration = timer.wrap("duration_probe", backend.probe_duration)
+
+    server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/api"
+
+    voices = [voice["id"] for voice in backend.get_available_voices()]
+    rng = random.Random(args.seed)
+    article = " ".join(f"Sentence {n} of the article describes the {TOPICS[n % len(TOPICS)]} in detail." for n in range(200))
+
+    def get_news_page(http, page):
+        return http.get(f"{base_url}/news", params={
+            "rss_url": feed_urls[0],
+            "max_items": args.page_size,
+            "offset": page * args.page_size
+        }, timeout=60)
+
+    def send_news(http, index):
+        response = get_news_page(http, index % args.pages)
+        if response.status_code == 200 and not response.json()["items"]:
+            return "emptyPage"
+        return response.status_code
+
+    def send_news_cold(http, index):
+        # Start from nothing, as after a restart: no feeds fetched, nothing indexed or summarized
+        backend.feed_poller.wait()
+        backend.feed_store.reset()
+        backend.news_index.clear()
+        backend.summary_cache.clear()
+        response = get_news_page(http, 0)
+        if response.status_code == 200 and not response.json()["items"]:
+            return "emptyPage"
+        return response.status_code
+
+    def send_synthesize(http, index):
+        # A share of requests repeat earlier text to exercise the audio cache
+        if 0 < index < args.requests and rng.random() < args.repeat_ratio:
+            index = rng.randrange(index)
+        start = (index * 37) % (len(article) - args.text_chars)
+        response = http.post(f"{base_url}/voice/synthesize", json={
+            "text": f"Request {index}. " + article[start:start + args.text_chars],
+            "voice_id": voices[index % len(voices)]
+        }, timeout=120)
+        return response.status_code
+
+    scenarios = {"news": send_news, "news-cold": send_news_cold, "synthesize": send_synthesize}
+    results = {"endpoints": {}, "stages": {}, "missingStages": {}}
+    try:
+        if "news" in args.endpoints:
+            # Timing empty pages would measure nothing, so make sure every page has items
+            with requests.Session() as http:
+                for page in range(args.pages):
+                    response = get_news_page(http, page)
+                    items = response.json().get("items") if response.status_code == 200 else None
+                    if not items:
+                        raise SystemExit(f"/api/news page {page + 1} of {args.pages} has no items "
+                                         f"(status {response.status_code}); use more feeds or items per feed")
+        for name in args.endpoints:
+            send = scenarios[name]
+            # Cold requests clear state shared by every request, so they run one at a time
+            concurrency = 1 if name == "news-cold" else args.concurrency
+            # Warm-up requests fill connection pools and are not reported; they use
+            # request indexes past the measured ones so they don't pre-cache measured audio
+            drive(name, send, args.warmup, concurrency, first_index=args.requests)
+            backend.feed_poller.wait()
+            timer.reset()
+            results["endpoints"][name] = drive(name, send, args.requests, concurrency)
+            # Polls a request started in the background still count towards its stages
+            backend.feed_poller.wait()
+            results["stages"][name] = timer.report()
+            missing = [stage for stage in EXPECTED_STAGES[name] if stage not in results["stages"][name]]
+            if missing:
+                results["missingStages"][name] = missing
+    finally:
+        server.shutdown()
+        fixture.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results["config"] = {
+        key: value for key, value in vars(args).items() if key != "output"
+    }
+    results["startedAt"] = args.started_at
+    results["python"] = sys.version.split()[0]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Breeze backend against local stand-ins for feeds and TTS")
+    parser.add_argument("--endpoints", default="news,news-cold,synthesize",
+                        help="Comma-separated scenarios to drive: news, news-cold (feed store, news index and "
+                             "summary cache cleared before each request), synthesize (default: all three)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint (default: 100)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    parser.add_argument("--warmup", type=int, default=5, help="Unreported warm-up requests per endpoint (default: 5)")
+    parser.add_argument("--feeds", type=int, default=5, help="Fixture feeds (default: 5)")
+    parser.add_argument("--items-per-feed", type=int, default=50, help="Entries per fixture feed (default: 50)")
+    parser.add_argument("--feed-latency", type=float, default=0.02, help="Seconds the fixture server waits per feed (default: 0.02)")
+    parser.add_argument("--conditional", action="store_true",
+                        help="Answer conditional GETs with 304 (default: always send the full feed)")
+    parser.add_argument("--page-size", type=int, default=10, help="Items per /api/news page (default: 10)")
+    parser.add_argument("--pages", type=int, default=3, help="Distinct /api/news pages requested (default: 3)")
+    parser.add_argument("--summarize-latency", type=float, default=0.05,
+                        help="Seconds per stub summarizer call (default: 0.05)")
+    parser.add_argument("--tts-latency", type=float, default=0.1, help="Seconds per stub TTS call (default: 0.1)")
+    parser.add_argument("--text-chars", type=int, default=600, help="Characters per synthesis request (default: 600)")
+    parser.add_argument("--repeat-ratio", type=float, default=0.0,
+                        help="Share of synthesis requests repeating earlier text (default: 0)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--output", help="Write the JSON report to this file as well as stdout")
+    args = parser.parse_args()
+
+    args.endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(args.endpoints) - set(EXPECTED_STAGES)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    args.started_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    results = run(args)
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    if results["missingStages"]:
+        for name, stages in results["missingStages"].items():
+            print(f"{name}: no samples for {', '.join(stages)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
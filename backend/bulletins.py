@@ -0,0 +1,46 @@
+"""
+Stitching synthesized items into a single bulletin.
+
+A bulletin is the audio of several items played back to back with a short
+silence between them. It is content addressed like the item audio: the
+same items in the same order with the same gap map to the same file, so
+a repeated briefing is built only once.
+"""
+
+import os
+import json
+import hashlib
+import logging
+
+# Silence between items, in milliseconds
+BULLETIN_GAP_MS = int(os.environ.get("BULLETIN_GAP_MS", "700"))
+
+# Longest gap a client may ask for
+BULLETIN_MAX_GAP_MS = 5000
+
+
+def bulletin_key(filenames, gap_ms):
+    """Cache key for the bulletin made of the given audio files, in order"""
+    payload = json.dumps({"bulletin": list(filenames), "gapMs": gap_ms})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def stitch_bulletin(paths, output_path, gap_ms=BULLETIN_GAP_MS):
+    """
+    Join audio files into one MP3 with gap_ms of silence between them.
+
+    Returns:
+        Duration of the bulletin in seconds
+    """
+    from pydub import AudioSegment
+
+    silence = AudioSegment.silent(duration=gap_ms)
+    bulletin = AudioSegment.empty()
+    for index, path in enumerate(paths):
+        if index:
+            bulletin += silence
+        bulletin += AudioSegment.from_file(path)
+
+    bulletin.export(output_path, format="mp3")
+    logging.info(f"Stitched {len(paths)} items into a {len(bulletin) / 1000:.1f}s bulletin")
+    return len(bulletin) / 1000.0
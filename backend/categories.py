@@ -0,0 +1,88 @@
+"""
+Keyword-based news category classifier.
+
+All keyword lists are compiled once into a single word-boundary-aware
+regular expression with one named group per category, so each entry is
+classified in one pass over its text. Whole words only: "ai" no longer
+matches inside "said".
+"""
+
+import re
+
+# Keywords for each category, in tie-breaking order
+CATEGORY_KEYWORDS = {
+    "Politics": ["politics", "government", "president", "election", "vote", "parliament", "senate", "congress", "minister", "policy", "bill", "law"],
+    "Technology": ["technology", "tech", "digital", "software", "hardware", "ai", "artificial intelligence", "computer", "internet", "app", "cyber", "robot"],
+    "Sports": ["sport", "football", "soccer", "basketball", "tennis", "olympic", "championship", "tournament", "match", "game", "player", "team", "league", "cup"],
+    "Entertainment": ["entertainment", "movie", "film", "music", "celebrity", "actor", "actress", "star", "tv", "show", "concert", "festival", "award"],
+    "Science": ["science", "research", "study", "discovery", "scientist", "space", "nasa", "physics", "biology", "chemistry", "medicine", "health", "disease", "climate", "environment"],
+}
+
+DEFAULT_CATEGORY = "News"
+
+
+def _compile(keywords_by_category):
+    """One regex with a named group per category; plural forms of each keyword also match"""
+    groups = []
+    names = {}
+    for index, (category, keywords) in enumerate(keywords_by_category.items()):
+        name = f"c{index}"
+        names[name] = category
+        # Longest first so multi-word keywords win over their prefixes
+        alternatives = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+        groups.append(f"(?P<{name}>{alternatives})")
+    pattern = r"\b(?:" + "|".join(groups) + r")(?:s|es)?\b"
+    return re.compile(pattern, re.IGNORECASE), names
+
+
+class CategoryClassifier:
+    """Classifies entries by keyword matches and reports how confident the label is"""
+
+    def __init__(self, keywords_by_category=CATEGORY_KEYWORDS, default=DEFAULT_CATEGORY):
+        self.default = default
+        self.order = list(keywords_by_category)
+        self._pattern, self._group_names = _compile(keywords_by_category)
+
+    def classify_text(self, text):
+        """
+        Label text with the category that has the most keyword matches.
+
+        Returns:
+            (category, confidence) where confidence is the share of keyword
+            matches that belong to the chosen category (0.0 for the default)
+        """
+        counts = {}
+        for match in self._pattern.finditer(text):
+            category = self._group_names[match.lastgroup]
+            counts[category] = counts.get(category, 0) + 1
+
+        if not counts:
+            return self.default, 0.0
+
+        # Most matches wins; ties go to the category listed first
+        best = max(self.order, key=lambda category: (counts.get(category, 0), -self.order.index(category)))
+        return best, round(counts[best] / sum(counts.values()), 3)
+
+    def classify(self, entry):
+        """Category and confidence for a feed entry; explicit feed categories are trusted as-is"""
+        # First check if the entry has a category field
+        if entry.get("category"):
+            return entry.get("category"), 1.0
+
+        # Check if there are tags
+        for tag in entry.get("tags") or []:
+            if tag.get("term"):
+                return tag.get("term"), 1.0
+
+        # If no category or tags, try to determine from the title and summary
+        title = entry.get("title", "")
+        summary = entry.get("summary", entry.get("description", ""))
+        return self.classify_text(title + " " + summary)
+
+    def classify_many(self, entries):
+        """Classify a batch of entries; returns a list of (category, confidence)"""
+        return [self.classify(entry) for entry in entries]
+
+
+# Shared classifier, compiled once at import
+classifier = CategoryClassifier()
@@ -0,0 +1,98 @@
+"""
+Synthesis of long text in parallel chunks.
+
+Long text is split at sentence and clause boundaries into chunks no longer
+than the engine handles well. The chunks are synthesized concurrently,
+each retried on its own, and their MP3 frames are joined in reading order,
+so the wall-clock time follows the slowest chunk instead of the length of
+the whole text.
+"""
+
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from text_segments import split_text
+from audio_probe import join_mp3
+
+# Chunks synthesized at the same time across all requests
+SYNTHESIS_CHUNK_WORKERS = int(os.environ.get("SYNTHESIS_CHUNK_WORKERS", "8"))
+
+# Extra attempts for a chunk that fails
+SYNTHESIS_CHUNK_RETRIES = int(os.environ.get("SYNTHESIS_CHUNK_RETRIES", "2"))
+
+# Seconds before the first retry; doubled for each further attempt
+SYNTHESIS_CHUNK_BACKOFF = 0.5
+
+
+class ChunkedSynthesizer:
+    """Splits text into chunks, synthesizes them on a shared thread pool and joins the audio"""
+
+    def __init__(self, workers=SYNTHESIS_CHUNK_WORKERS, retries=SYNTHESIS_CHUNK_RETRIES,
+                 backoff=SYNTHESIS_CHUNK_BACKOFF):
+        self.retries = retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-chunk")
+        self._lock = threading.Lock()
+        self._stats = {"texts": 0, "chunks": 0, "retries": 0, "failures": 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _synthesize_chunk(self, synthesize, chunk, index):
+        for attempt in range(self.retries + 1):
+            try:
+                return synthesize(chunk, index)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                self._count("retries")
+                logging.warning(f"Chunk {index} failed ({e}), retrying ({attempt + 1}/{self.retries})")
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def synthesize(self, text, synthesize, max_chars):
+        """
+        Synthesize text chunk by chunk and return the joined MP3 bytes.
+
+        Args:
+            text: text to speak
+            synthesize: callable(chunk, index) -> MP3 bytes for one chunk
+            max_chars: longest chunk the engine should be given
+
+        Raises:
+            The error of the first chunk that still fails after its retries
+        """
+        # Short sentences are merged so we don't pay per-call overhead for every one
+        chunks = split_text(text, max_chars=max_chars, min_chars=max_chars // 2)
+        if not chunks:
+            raise ValueError("No text to synthesize")
+        self._count("texts")
+        self._count("chunks", len(chunks))
+
+        if len(chunks) == 1:
+            return self._synthesize_chunk(synthesize, chunks[0], 0)
+
+        logging.info(f"Synthesizing {len(chunks)} chunks in parallel")
+        futures = [
+            self._executor.submit(self._synthesize_chunk, synthesize, chunk, index)
+            for index, chunk in enumerate(chunks)
+        ]
+        try:
+            # MP3 frames are self-contained, so the chunks play back to back once their headers are dropped
+            return join_mp3([future.result() for future in futures])
+        except Exception:
+            self._count("failures")
+            for future in futures:
+                future.cancel()
+            raise
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+# Shared chunked synthesizer; its pool is shared by all requests
+chunked_synthesizer = ChunkedSynthesizer()
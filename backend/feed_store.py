@@ -0,0 +1,523 @@
+"""
+Background RSS ingestion.
+
+A FeedPoller thread refreshes the configured feeds on a schedule using
+conditional GETs (ETag / Last-Modified), and a FeedStore keeps the parsed
+entries so /api/news can answer without waiting on upstream servers.
+
+Feeds are fetched concurrently over one pooled HTTP session, and a
+per-feed circuit breaker stops us from waiting on feeds that keep failing.
+
+Under a multi-process server the store publishes every fetched feed to the
+shared state. Only the worker holding the poller lease polls on schedule;
+the others copy the published feeds into their own store, so each feed is
+fetched once per round and every worker indexes the same items. Entries
+without a publish date are dated when first seen, and that date travels
+with the item, so every poll and every worker sorts them the same way.
+"""
+
+import os
+import time
+import hashlib
+import threading
+import logging
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as futures_wait, TimeoutError as FuturesTimeoutError
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import timed
+
+# Feeds polled in the background, in fallback order
+DEFAULT_FEEDS = [
+    "http://feeds.bbci.co.uk/news/rss.xml",
+    "http://rss.cnn.com/rss/cnn_topstories.rss",
+    "http://feeds.bbci.co.uk/news/world/rss.xml",
+    "https://www.theguardian.com/world/rss",
+    "https://www.reddit.com/r/worldnews/.rss"
+]
+
+# Seconds between polls of each feed
+FEED_POLL_INTERVAL = int(os.environ.get("FEED_POLL_INTERVAL", "300"))
+
+# Set to false to fetch feeds inside the request like before
+FEED_POLLER_ENABLED = os.environ.get("FEED_POLLER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Entries kept per feed
+FEED_MAX_ENTRIES = int(os.environ.get("FEED_MAX_ENTRIES", "100"))
+
+# Timeout for a single feed request
+FEED_REQUEST_TIMEOUT = float(os.environ.get("FEED_REQUEST_TIMEOUT", "10"))
+
+# Feeds fetched at the same time
+FEED_FETCH_WORKERS = int(os.environ.get("FEED_FETCH_WORKERS", "5"))
+
+# Seconds between checks for feeds published by other worker processes (and for the poller lease)
+FEED_SYNC_INTERVAL = float(os.environ.get("FEED_SYNC_INTERVAL", "15"))
+
+# Seconds a request will wait for feeds that aren't in the store yet
+FEED_FETCH_DEADLINE = float(os.environ.get("FEED_FETCH_DEADLINE", "5"))
+
+# Consecutive failures before a feed is skipped, and how long it is skipped for
+FEED_BREAKER_THRESHOLD = int(os.environ.get("FEED_BREAKER_THRESHOLD", "3"))
+FEED_BREAKER_COOLDOWN = float(os.environ.get("FEED_BREAKER_COOLDOWN", "120"))
+
+
+def stable_entry_id(feed_url, entry):
+    """
+    Derive an id that stays the same for an entry across polls.
+
+    Entries with a GUID or link get the same id in every feed that carries
+    them; only entries identified by their title are scoped to their feed.
+    """
+    identity = entry.get("id") or entry.get("guid") or entry.get("link")
+    if not identity:
+        identity = f"{feed_url}\0{entry.get('title', '')}"
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures of one feed.
+
+    After `threshold` failures in a row the breaker opens and the feed is
+    skipped. Once `cooldown` seconds have passed a single trial request is
+    let through (half-open); its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, threshold=FEED_BREAKER_THRESHOLD, cooldown=FEED_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Whether a request to the feed should be attempted now"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class FeedState:
+    """What we know about one feed: validators for conditional GETs and the parsed items"""
+
+    def __init__(self, url):
+        self.url = url
+        self.etag = None
+        self.last_modified = None
+        self.items = []
+        self.fetched_at = None
+        self.checked_at = None
+        self.error = None
+        self.not_modified_count = 0
+        self.parse_count = 0
+
+
+def first_seen(timestamp):
+    """publishedAt of an undated entry first fetched at timestamp"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class FeedStore:
+    """Thread-safe store of the latest parsed items for each feed"""
+
+    def __init__(self, shared=None):
+        """
+        Args:
+            shared: optional SharedState that fetched feeds are published to
+                and that sync() reads other processes' fetches from
+        """
+        self.shared = shared
+        self._feeds = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Call callback(url, items, tracked=...) after every successful update of a feed"""
+        self._listeners.append(callback)
+
+    def track(self, url):
+        """Start tracking a feed (no-op if already tracked)"""
+        with self._lock:
+            if url not in self._feeds:
+                self._feeds[url] = FeedState(url)
+            return self._feeds[url]
+
+    def urls(self):
+        with self._lock:
+            return list(self._feeds)
+
+    def state(self, url):
+        with self._lock:
+            return self._feeds.get(url)
+
+    def has_items(self, url):
+        state = self.state(url)
+        return state is not None and bool(state.items)
+
+    def items(self, url):
+        """Copies of the items from the last successful parse of url (empty if none yet)"""
+        with self._lock:
+            state = self._feeds.get(url)
+            return [dict(item) for item in state.items] if state is not None else []
+
+    def update(self, url, items, etag=None, last_modified=None):
+        """Replace the items of a feed after a successful fetch and parse"""
+        state = self.track(url)
+        fetched_at = time.time()
+        with self._lock:
+            # Keep ingestion-time fields (like trending and undated entries' dates) stable for entries we've seen before
+            previous = {item["id"]: item for item in state.items}
+            merged = []
+            for item in items[:FEED_MAX_ENTRIES]:
+                old = previous.get(item["id"])
+                if old is not None and "trending" in old:
+                    item["trending"] = old["trending"]
+                if not item.get("publishedAt"):
+                    item["publishedAt"] = old["publishedAt"] if old is not None else first_seen(fetched_at)
+                merged.append(item)
+
+        self._apply(url, merged, etag, last_modified, fetched_at)
+        if self.shared is not None:
+            self.shared.put("feeds", url, {
+                "items": merged, "etag": etag, "lastModified": last_modified, "fetchedAt": fetched_at
+            })
+            self.shared.put("feed_versions", url, fetched_at)
+
+    def _apply(self, url, items, etag, last_modified, fetched_at):
+        state = self.track(url)
+        with self._lock:
+            state.items = items
+            state.etag = etag
+            state.last_modified = last_modified
+            state.fetched_at = fetched_at
+            state.checked_at = max(fetched_at, state.checked_at or 0)
+            state.error = None
+            state.parse_count += 1
+        self._notify(url, items, tracked=True)
+
+    def sync(self):
+        """Take the tracked feeds that another process fetched more recently than we did; returns how many"""
+        if self.shared is None:
+            return 0
+        synced = 0
+        for url, fetched_at in self.shared.items("feed_versions").items():
+            state = self.state(url)
+            if state is None or (state.fetched_at is not None and state.fetched_at >= fetched_at):
+                continue
+            feed = self.shared.get("feeds", url)
+            if feed is None or feed["fetchedAt"] != fetched_at:
+                # Replaced since we read its version; the next sync picks it up
+                continue
+            self._apply(url, feed["items"], feed["etag"], feed["lastModified"], fetched_at)
+            synced += 1
+        if synced:
+            logging.debug(f"Synced {synced} feeds fetched by other processes")
+        return synced
+
+    def publish(self, url, items):
+        """Hand the items of a feed we don't track to the listeners without storing or tracking it"""
+        items = items[:FEED_MAX_ENTRIES]
+        for item in items:
+            if not item.get("publishedAt"):
+                item["publishedAt"] = first_seen(time.time())
+        self._notify(url, items, tracked=False)
+
+    def _notify(self, url, items, tracked):
+        for listener in self._listeners:
+            try:
+                listener(url, items, tracked=tracked)
+            except Exception as e:
+                logging.error(f"Feed update listener failed for {url}: {e}")
+
+    def mark_not_modified(self, url):
+        state = self.track(url)
+        with self._lock:
+            state.checked_at = time.time()
+            state.error = None
+            state.not_modified_count += 1
+
+    def mark_error(self, url, error):
+        state = self.track(url)
+        with self._lock:
+            state.checked_at = time.time()
+            state.error = str(error)
+
+    def reset(self):
+        """Forget the items and validators of every feed, keeping the feeds tracked"""
+        with self._lock:
+            self._feeds = {url: FeedState(url) for url in self._feeds}
+
+    def status(self):
+        """Per-feed summary for the health endpoint"""
+        with self._lock:
+            return {
+                url: {
+                    "items": len(state.items),
+                    "fetchedAt": state.fetched_at,
+                    "checkedAt": state.checked_at,
+                    "notModified": state.not_modified_count,
+                    "parsed": state.parse_count,
+                    "error": state.error
+                }
+                for url, state in self._feeds.items()
+            }
+
+
+def pooled_session(pool_size=FEED_FETCH_WORKERS):
+    """A requests session whose connection pool is large enough for concurrent feed fetches"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class FeedPoller:
+    """
+    Polls every tracked feed on a fixed interval in a daemon thread.
+
+    With shared state, the thread of every process syncs the store every
+    sync_interval, but only the process holding the "feed_poller" lease
+    polls the feeds. The lease outlives a few missed renewals, after which
+    another process takes over.
+    """
+
+    def __init__(self, store, parse_feed, interval=FEED_POLL_INTERVAL, session=None,
+                 timeout=FEED_REQUEST_TIMEOUT, workers=FEED_FETCH_WORKERS, shared=None,
+                 sync_interval=FEED_SYNC_INTERVAL):
+        """
+        Args:
+            store: FeedStore to write into
+            parse_feed: callable(url, stream) -> list of news item dicts, where stream is
+                the response body as a binary file-like object
+            interval: seconds between polling rounds
+            session: requests.Session to use (a pooled one is created if omitted)
+            timeout: per-request timeout in seconds
+            workers: number of feeds fetched concurrently
+            shared: optional SharedState holding the lease that elects the one polling process
+            sync_interval: seconds between syncs of the store and lease renewals
+        """
+        self.store = store
+        self.shared = shared
+        self.sync_interval = sync_interval
+        self.parse_feed = parse_feed
+        self.interval = interval
+        self.session = session or pooled_session(workers)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed-fetch")
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        # url -> future of the poll running for it, so a feed is never fetched twice at once
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def breaker(self, url):
+        with self._breakers_lock:
+            if url not in self._breakers:
+                self._breakers[url] = CircuitBreaker()
+            return self._breakers[url]
+
+    def breaker_status(self):
+        with self._breakers_lock:
+            return {
+                url: {"state": breaker.state, "failures": breaker.failures}
+                for url, breaker in self._breakers.items()
+            }
+
+    @timed("feed_poll")
+    def poll(self, url):
+        """
+        Fetch one feed with a conditional GET and store it if it changed. Returns True on success.
+
+        A feed the store doesn't track is fetched once: its items go to the
+        store's listeners, but it isn't added to the feeds polled every round
+        and gets no circuit breaker.
+        """
+        state = self.store.state(url)
+        breaker = self.breaker(url) if state is not None else None
+        if breaker is not None and not breaker.allow():
+            logging.info(f"Skipping feed {url}: circuit breaker is {breaker.state}")
+            return False
+
+        headers = {}
+        if state is not None:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+
+        response = None
+        try:
+            with timed("feed_fetch"):
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            # Only a conditional GET (so a tracked feed) can come back 304
+            if headers and response.status_code == 304:
+                logging.info(f"Feed not modified: {url}")
+                self.store.mark_not_modified(url)
+                breaker.record_success()
+                return True
+            response.raise_for_status()
+
+            # Parsed as it downloads; the parser stops reading once it has enough entries
+            response.raw.decode_content = True
+            items = self.parse_feed(url, response.raw)
+            if not items:
+                raise ValueError(f"No entries found in feed from {url}")
+
+            if state is None:
+                self.store.publish(url, items)
+                logging.info(f"Fetched {len(items)} entries from untracked feed {url}")
+                return True
+
+            self.store.update(
+                url,
+                items,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+            logging.info(f"Stored {len(items)} entries from {url}")
+            breaker.record_success()
+            return True
+        except Exception as e:
+            logging.error(f"Error polling feed {url}: {e}")
+            if state is not None:
+                self.store.mark_error(url, e)
+                breaker.record_failure()
+            return False
+        finally:
+            if response is not None:
+                # Drops the connection if the rest of the feed wasn't read
+                response.close()
+
+    def submit(self, urls):
+        """
+        Start polling urls in the background, reusing the poll of any feed
+        that is still being fetched.
+
+        Returns:
+            Dict of future -> url for every url
+        """
+        futures = {}
+        started = []
+        with self._in_flight_lock:
+            for url in urls:
+                future = self._in_flight.get(url)
+                if future is None:
+                    future = self._in_flight[url] = self._executor.submit(self.poll, url)
+                    started.append((url, future))
+                futures[future] = url
+        for url, future in started:
+            future.add_done_callback(lambda done, url=url: self._finished(url, done))
+        return futures
+
+    def _finished(self, url, future):
+        with self._in_flight_lock:
+            if self._in_flight.get(url) is future:
+                del self._in_flight[url]
+
+    def poll_many(self, urls, deadline=None, until=None):
+        """
+        Poll several feeds concurrently.
+
+        Args:
+            urls: feeds to poll
+            deadline: seconds to wait overall; feeds still in flight keep
+                running in the background and land in the store later
+            until: optional callable checked before anything is fetched and
+                as each feed finishes; once it returns True we stop waiting
+                for the rest
+
+        Returns:
+            Set of urls that were polled successfully before we stopped waiting
+        """
+        if until is not None and until():
+            return set()
+        futures = self.submit(urls)
+        succeeded = set()
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                if future.result():
+                    succeeded.add(futures[future])
+                if until is not None and until():
+                    break
+        except FuturesTimeoutError:
+            pending = [url for future, url in futures.items() if not future.done()]
+            logging.warning(f"Feed fetch deadline of {deadline}s reached, still waiting on: {pending}")
+        return succeeded
+
+    def wait(self, timeout=None):
+        """Wait for the polls in flight to finish"""
+        with self._in_flight_lock:
+            futures = list(self._in_flight.values())
+        futures_wait(futures, timeout=timeout)
+
+    def poll_all(self):
+        """Poll every tracked feed once"""
+        if not self._stop.is_set():
+            self.poll_many(self.store.urls())
+
+    def _lead(self):
+        """Whether this process polls the feeds; renews its lease if it does"""
+        if self.shared is None:
+            return True
+        # Without the shared state, poll like a single process rather than not at all
+        ttl = self.sync_interval * 3 + self.timeout
+        return self.shared.claim("leases", "feed_poller", os.getpid(), ttl) is not False
+
+    def _run(self):
+        next_round = 0
+        while not self._stop.is_set():
+            self.store.sync()
+            if self._lead():
+                if time.monotonic() >= next_round:
+                    self.poll_all()
+                    next_round = time.monotonic() + self.interval
+            else:
+                # Poll right away if we take over the lease later
+                next_round = 0
+            self._stop.wait(self.interval if self.shared is None else self.sync_interval)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="feed-poller", daemon=True)
+        self._thread.start()
+        logging.info(f"Feed poller started, polling {len(self.store.urls())} feeds every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
@@ -0,0 +1,253 @@
+"""
+Incremental RSS/Atom parsing.
+
+`parse_feed` reads a feed with `iterparse`, turns each item into a small
+FeedEntry as soon as its closing tag is seen, and drops the item's XML
+right away. It stops reading after `max_items` entries, so memory and time
+depend on how many entries are wanted rather than on the size of the feed,
+and a streamed HTTP response is never downloaded further than needed.
+
+Feeds that aren't well-formed XML (feedparser tolerates a lot) are handed
+to feedparser instead, with the bytes read so far plus the rest of the
+stream.
+
+Titles and summaries are reduced to plain text: markup is dropped, along
+with the contents of script and style elements, and entities are decoded.
+The summaries go on to the summarizer and TTS, which want words, not HTML.
+"""
+
+import io
+import os
+import re
+import logging
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+
+from startup import lazy_import
+
+feedparser = lazy_import("feedparser")
+
+# "stream" parses incrementally and falls back to feedparser on malformed feeds; "feedparser" always uses it
+FEED_PARSER = os.environ.get("FEED_PARSER", "stream").lower()
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+
+# Elements holding one entry
+ITEM_TAGS = {"item", f"{RSS1}item", f"{ATOM}entry"}
+
+# Elements whose <title> is the feed's title
+FEED_TAGS = {"channel", f"{RSS1}channel", f"{ATOM}feed"}
+
+# HTML elements whose contents are never shown
+HIDDEN_HTML_TAGS = {"script", "style", "iframe", "object", "embed", "noscript", "template"}
+
+# HTML elements that separate words, so "<p>one</p><p>two</p>" becomes "one two"
+BLOCK_HTML_TAGS = {"p", "br", "div", "li", "ul", "ol", "tr", "td", "th", "h1", "h2", "h3", "h4", "h5", "h6",
+                   "blockquote", "pre", "hr", "img", "figure", "figcaption", "table", "section", "article"}
+
+WHITESPACE = re.compile(r"\s+")
+
+# Entry child element -> FeedEntry field, in order of preference (earlier wins)
+FIELD_TAGS = {
+    "title": ("title", f"{RSS1}title", f"{ATOM}title"),
+    "link": ("link", f"{RSS1}link", f"{ATOM}link"),
+    "guid": ("guid", f"{ATOM}id"),
+    "summary": ("description", f"{RSS1}description", f"{ATOM}summary", f"{CONTENT}encoded", f"{ATOM}content"),
+    "published": ("pubDate", f"{ATOM}published", f"{DC}date", f"{ATOM}updated"),
+}
+
+
+class FeedEntry:
+    """One feed entry, with the dict-style get() that the classifier and news item builder use"""
+
+    __slots__ = ("id", "guid", "link", "title", "summary", "published", "category", "tags")
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, None)
+
+    def get(self, key, default=None):
+        # "description" and "pubDate" are the RSS names feedparser also answers to
+        key = {"description": "summary", "pubDate": "published"}.get(key, key)
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+
+class ParsedFeed:
+    """Feed title and the entries read from it"""
+
+    __slots__ = ("title", "entries")
+
+    def __init__(self, title, entries):
+        self.title = title
+        self.entries = entries
+
+
+class RecordingReader(io.RawIOBase):
+    """Wraps a stream and keeps what was read from it, so parsing can start over with another parser"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._chunks = []
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        if not data:
+            return 0
+        self._chunks.append(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def consumed_and_rest(self):
+        """Everything read so far followed by the rest of the stream"""
+        return b"".join(self._chunks) + self._stream.read()
+
+
+class _HTMLText(HTMLParser):
+    """Collects the visible text of an HTML fragment"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_HTML_TAGS:
+            self._hidden += 1
+        elif tag in BLOCK_HTML_TAGS:
+            self.parts.append(" ")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_HTML_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_HTML_TAGS:
+            self._hidden = max(0, self._hidden - 1)
+        elif tag in BLOCK_HTML_TAGS:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self.parts.append(data)
+
+
+def html_to_text(value):
+    """Plain text of an HTML fragment, with whitespace collapsed"""
+    if "<" in value or "&" in value:
+        parser = _HTMLText()
+        parser.feed(value)
+        parser.close()
+        value = "".join(parser.parts)
+    return WHITESPACE.sub(" ", value).strip()
+
+
+def _text(elem):
+    # Escaped HTML (RSS descriptions) and inline XHTML (Atom content) both end up as plain text
+    return html_to_text("".join(elem.itertext()))
+
+
+def _entry_from_element(elem):
+    entry = FeedEntry()
+    found = {}
+    tags = []
+    for child in elem:
+        tag = child.tag
+        if tag in ("category", f"{ATOM}category", f"{DC}subject"):
+            term = child.get("term") or _text(child)
+            if term:
+                tags.append({"term": term})
+            continue
+        for field, candidates in FIELD_TAGS.items():
+            if tag not in candidates:
+                continue
+            rank = candidates.index(tag)
+            if tag == f"{ATOM}link" and child.get("rel", "alternate") != "alternate":
+                # Other rels (enclosure, self...) only as a last resort
+                rank = len(candidates)
+            if field in found and found[field] <= rank:
+                break
+            value = child.get("href") if tag == f"{ATOM}link" else _text(child)
+            if value:
+                setattr(entry, field, value)
+                found[field] = rank
+            break
+
+    entry.id = entry.guid
+    if tags:
+        entry.tags = tags
+        entry.category = tags[0]["term"]
+    return entry
+
+
+def _iterparse_feed(source, max_items):
+    title = None
+    entries = []
+    # Open elements, so finished items can be detached from their parent
+    stack = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag in ITEM_TAGS:
+            entries.append(_entry_from_element(elem))
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+            if max_items is not None and len(entries) >= max_items:
+                break
+        elif title is None and stack and stack[-1].tag in FEED_TAGS and elem.tag in FIELD_TAGS["title"]:
+            title = _text(elem)
+    return ParsedFeed(title, entries)
+
+
+def _feedparser_feed(body, max_items):
+    feed = feedparser.parse(body)
+    entries = feed.entries if max_items is None else feed.entries[:max_items]
+    for entry in entries:
+        # feedparser sanitizes the HTML but keeps it; match the streaming parser's plain text
+        for field in ("title", "summary"):
+            if entry.get(field):
+                entry[field] = html_to_text(entry[field])
+    return ParsedFeed(feed.feed.get("title"), entries)
+
+
+def parse_feed(source, max_items=None, parser=FEED_PARSER):
+    """
+    Parse an RSS or Atom feed.
+
+    Args:
+        source: bytes, or a binary file-like object such as a streamed HTTP
+            response body; it is only read as far as needed
+        max_items: stop after this many entries (None for all)
+        parser: "stream" or "feedparser"
+
+    Returns:
+        ParsedFeed whose entries support entry.get(...) like feedparser's
+    """
+    if isinstance(source, (bytes, bytearray)):
+        body = bytes(source)
+        if parser == "feedparser":
+            return _feedparser_feed(body, max_items)
+        try:
+            return _iterparse_feed(io.BytesIO(body), max_items)
+        except ET.ParseError as e:
+            logging.info(f"Feed isn't well-formed XML ({e}), parsing it with feedparser")
+            return _feedparser_feed(body, max_items)
+
+    if parser == "feedparser":
+        return _feedparser_feed(source.read(), max_items)
+    # Keep what is read from the stream in case feedparser has to start over
+    reader = RecordingReader(source)
+    try:
+        return _iterparse_feed(io.BufferedReader(reader), max_items)
+    except ET.ParseError as e:
+        logging.info(f"Feed isn't well-formed XML ({e}), parsing it with feedparser")
+        return _feedparser_feed(reader.consumed_and_rest(), max_items)
@@ -0,0 +1,47 @@
+"""
+gunicorn settings for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+One worker process per core, each with a pool of threads for requests that
+wait on the network or on synthesis jobs. The app is loaded in the master
+before forking (preload_app) and the workers share job status, audio
+metadata, cache state and fetched feeds through SQLite (see shared_state.py).
+"""
+
+import os
+import sys
+import multiprocessing
+
+# Workers must publish state the others can read, and load models before the fork rather than after it
+os.environ.setdefault("SHARED_STATE_ENABLED", "true")
+os.environ.setdefault("SUMMARIZER_PRELOAD", "true")
+
+bind = os.environ.get("BIND", "0.0.0.0:5001")
+
+# Worker processes, one per core by default
+workers = int(os.environ.get("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+
+# Request threads per worker
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# Import the app (and load models) once in the master so workers share the memory
+preload_app = True
+
+# Bulk requests can wait BULK_TIMEOUT (120s) for their items
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "180"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    # Split the cores between workers so concurrent inference doesn't oversubscribe the CPU
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(max(1, multiprocessing.cpu_count() // server.cfg.workers))
+
+    # Threads don't survive fork, so every worker starts its own; of the feed pollers only the
+    # one holding the shared lease fetches feeds, and the others sync what it publishes
+    from wsgi import start_background_work
+    start_background_work()
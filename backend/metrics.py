@@ -0,0 +1,268 @@
+"""
+Counters, histograms and stage timing, exported in Prometheus text format.
+
+Hot code paths are wrapped with `timed(stage)` (a decorator and context
+manager), which records the stage's duration in a histogram and counts its
+errors. `metrics.render()` produces the body of the /metrics endpoint.
+
+A sampling profiler can also be attached to a single request: it samples
+that thread's stack at a fixed interval and keeps the collapsed stacks
+(the "folded" format flame graph tools read) for later retrieval.
+"""
+
+import os
+import sys
+import time
+import uuid
+import threading
+import functools
+from collections import Counter as _Tally, OrderedDict
+
+# Allow ?profile=1 / X-Profile: 1 to profile individual requests
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Seconds between stack samples while profiling a request
+PROFILING_INTERVAL = float(os.environ.get("PROFILING_INTERVAL", "0.005"))
+
+# Finished profiles kept for retrieval
+PROFILES_KEPT = 50
+
+# Histogram buckets in seconds; TTS calls can take several seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+METRIC_PREFIX = "breeze_"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, list(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = {key: (list(s["buckets"]), s["sum"], s["count"]) for key, s in self._series.items()}
+        for key, (buckets, total, count) in sorted(snapshot.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, observed in zip(self.buckets, buckets):
+                cumulative += observed
+                yield f"{self.name}_bucket", labels + [("le", _format_value(bound))], cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors that report gauges computed at scrape time"""
+
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self._metrics = OrderedDict()
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(self.prefix + name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self.prefix + name, help, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """
+        Register collect() -> iterable of (name, help, labels dict, value).
+        Each value is exported as a gauge whenever metrics are rendered.
+        """
+        self._collectors.append(collect)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        gauges = OrderedDict()
+        for collect in self._collectors:
+            try:
+                for name, help, labels, value in collect():
+                    if value is None:
+                        continue
+                    gauges.setdefault(self.prefix + name, (help, []))[1].append((sorted(labels.items()), value))
+            except Exception as e:
+                lines.append(f"# collector {getattr(collect, '__name__', collect)} failed: {_escape(e)}")
+        for name, (help, samples) in gauges.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry and the stage metrics every module records into
+metrics = MetricsRegistry()
+stage_duration = metrics.histogram("stage_duration_seconds", "Time spent in each processing stage", ["stage"])
+stage_errors = metrics.counter("stage_errors_total", "Processing stages that raised an error", ["stage"])
+
+
+class timed:
+    """Time a stage, as a decorator (@timed("summarize")) or a context manager (with timed("parse"):)"""
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stage_duration.observe(time.perf_counter() - self._start, stage=self.stage)
+        if exc_type is not None:
+            stage_errors.inc(stage=self.stage)
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class SamplingProfiler:
+    """Samples one thread's stack every `interval` seconds until stopped"""
+
+    def __init__(self, thread_id, interval=PROFILING_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = _Tally()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        """Collapsed stacks, one "frame;frame;frame count" line each, most sampled first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles by id"""
+
+    def __init__(self, size=PROFILES_KEPT):
+        self.size = size
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, description, profiler, elapsed):
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = {
+                "request": description,
+                "seconds": round(elapsed, 6),
+                "samples": profiler.samples,
+                "folded": profiler.folded()
+            }
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+profiles = ProfileStore()
@@ -0,0 +1,255 @@
+"""
+Merged, deduplicated index of news items from every tracked feed.
+
+The FeedStore pushes each successful parse into the index, which keeps
+items ordered by publish time (newest first) under their stable ids.
+Near-identical titles from different sources are indexed once. Items
+from feeds that aren't tracked (a client's own rss_url) have their own
+cap, so they can't push out the tracked feeds' items, and each such feed
+counts as stale once it hasn't been refreshed for a while. Pages are
+addressed with an opaque cursor naming the last item served, so fetching
+page N costs the same as page 1 and items arriving between requests
+neither repeat nor skip entries on later pages.
+"""
+
+import os
+import re
+import math
+import json
+import time
+import base64
+import bisect
+import threading
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Items kept in the index; the oldest by publish time are dropped first
+NEWS_INDEX_MAX_ITEMS = int(os.environ.get("NEWS_INDEX_MAX_ITEMS", "1000"))
+
+# Items kept from feeds that aren't tracked, on top of NEWS_INDEX_MAX_ITEMS
+NEWS_INDEX_UNTRACKED_MAX_ITEMS = int(os.environ.get("NEWS_INDEX_UNTRACKED_MAX_ITEMS", "200"))
+
+# Seconds before a feed that isn't tracked is fetched again
+NEWS_UNTRACKED_FEED_TTL = float(os.environ.get("NEWS_UNTRACKED_FEED_TTL", "900"))
+
+# Title similarity (0-1) at which two items are treated as the same story
+NEWS_DEDUPE_SIMILARITY = float(os.environ.get("NEWS_DEDUPE_SIMILARITY", "0.8"))
+
+# Words ignored when comparing titles
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or over says the to was were will with".split()
+)
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+
+
+def title_tokens(title):
+    """Normalized set of significant words in a title"""
+    words = _WORD.findall(title.lower())
+    significant = [word for word in words if word not in _STOPWORDS]
+    return frozenset(significant or words)
+
+
+def published_timestamp(value, default=None):
+    """Seconds since the epoch for an RSS (RFC 822) or ISO 8601 date string"""
+    if value:
+        for parse in (parsedate_to_datetime, datetime.fromisoformat):
+            try:
+                parsed = parse(value.strip())
+            except (TypeError, ValueError, IndexError):
+                continue
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+    return time.time() if default is None else default
+
+
+def encode_cursor(sort_key):
+    raw = json.dumps(list(sort_key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        negative_timestamp, item_id = json.loads(raw)
+        if not isinstance(item_id, str) or not math.isfinite(negative_timestamp):
+            raise ValueError("not a position in the index")
+        return (float(negative_timestamp), item_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+class NewsIndex:
+    """Thread-safe, publish-time ordered index of news items with near-duplicate suppression"""
+
+    def __init__(self, max_items=NEWS_INDEX_MAX_ITEMS, similarity=NEWS_DEDUPE_SIMILARITY,
+                 untracked_max_items=NEWS_INDEX_UNTRACKED_MAX_ITEMS, untracked_ttl=NEWS_UNTRACKED_FEED_TTL):
+        self.max_items = max_items
+        self.similarity = similarity
+        self.untracked_max_items = untracked_max_items
+        self.untracked_ttl = untracked_ttl
+        self._lock = threading.Lock()
+        self._stats = {"indexed": 0, "duplicates": 0, "evicted": 0}
+        self.clear()
+
+    def clear(self):
+        """Drop every indexed item"""
+        with self._lock:
+            self._items = {}
+            self._sources = {}
+            self._keys = {}
+            # (-published timestamp, id) for every item, newest first
+            self._order = []
+            self._tokens = {}
+            self._postings = defaultdict(set)
+            self._source_counts = Counter()
+            # Ids of the items from feeds that aren't tracked, and when each such feed was last added
+            self._untracked = set()
+            self._untracked_refreshed = {}
+
+    def _find_duplicate(self, tokens):
+        """Id of an indexed item whose title is similar enough to tokens, if any (caller holds the lock)"""
+        if not tokens:
+            return None
+        shared = Counter()
+        for token in tokens:
+            shared.update(self._postings.get(token, ()))
+        for item_id, overlap in shared.most_common():
+            union = len(tokens) + len(self._tokens[item_id]) - overlap
+            if overlap / union >= self.similarity:
+                return item_id
+            if overlap / len(tokens) < self.similarity:
+                # Candidates are ordered by overlap, so no later one can match either
+                break
+        return None
+
+    def _oldest(self, untracked):
+        """Id of the oldest item from tracked (or untracked) feeds (caller holds the lock)"""
+        for position in range(len(self._order) - 1, -1, -1):
+            item_id = self._order[position][1]
+            if (item_id in self._untracked) == untracked:
+                return item_id
+        return None
+
+    def _remove(self, item_id):
+        self._untracked.discard(item_id)
+        key = self._keys.pop(item_id)
+        del self._order[bisect.bisect_left(self._order, key)]
+        del self._items[item_id]
+        self._source_counts[self._sources.pop(item_id)] -= 1
+        for token in self._tokens.pop(item_id):
+            postings = self._postings[token]
+            postings.discard(item_id)
+            if not postings:
+                del self._postings[token]
+
+    def add(self, feed_url, items, tracked=True):
+        """Index the items parsed from feed_url; returns how many were new"""
+        added = 0
+        with self._lock:
+            if not tracked:
+                self._untracked_refreshed[feed_url] = time.time()
+            for item in items:
+                item_id = item["id"]
+                if item_id in self._items:
+                    # Refresh the content but keep the original position so cursors stay valid
+                    if self._sources[item_id] == feed_url:
+                        self._items[item_id] = dict(item)
+                    continue
+
+                tokens = title_tokens(item.get("title", ""))
+                if self._find_duplicate(tokens) is not None:
+                    self._stats["duplicates"] += 1
+                    continue
+
+                key = (-published_timestamp(item.get("publishedAt")), item_id)
+                bisect.insort(self._order, key)
+                self._items[item_id] = dict(item)
+                self._sources[item_id] = feed_url
+                self._keys[item_id] = key
+                self._tokens[item_id] = tokens
+                for token in tokens:
+                    self._postings[token].add(item_id)
+                self._source_counts[feed_url] += 1
+                if not tracked:
+                    self._untracked.add(item_id)
+                added += 1
+
+            # Each kind of feed only ever pushes out its own oldest items
+            while len(self._order) - len(self._untracked) > self.max_items:
+                self._remove(self._oldest(untracked=False))
+                self._stats["evicted"] += 1
+            while len(self._untracked) > self.untracked_max_items:
+                self._remove(self._oldest(untracked=True))
+                self._stats["evicted"] += 1
+            self._stats["indexed"] += added
+
+        if added:
+            logging.info(f"Indexed {added} new items from {feed_url}")
+        return added
+
+    def count(self, feeds=None):
+        """Items indexed from the given feeds (all feeds if None)"""
+        with self._lock:
+            if feeds is None:
+                return len(self._items)
+            return sum(self._source_counts[feed_url] for feed_url in set(feeds))
+
+    def is_stale(self, feed_url):
+        """True unless feed_url was added as an untracked feed within the untracked TTL"""
+        with self._lock:
+            refreshed = self._untracked_refreshed.get(feed_url)
+        return refreshed is None or time.time() - refreshed >= self.untracked_ttl
+
+    def page(self, limit, cursor=None, feeds=None, offset=0):
+        """
+        One page of items, newest first.
+
+        Args:
+            limit: maximum items to return
+            cursor: nextCursor from the previous page, or None for the first page
+            feeds: only return items from these feed urls (all feeds if None)
+            offset: items to skip after the cursor
+
+        Returns:
+            (items, next_cursor) where items are copies and next_cursor is
+            None when there are no more items
+
+        Raises:
+            InvalidCursor: if cursor can't be decoded
+        """
+        after = decode_cursor(cursor) if cursor else None
+        feeds = set(feeds) if feeds is not None else None
+        with self._lock:
+            start = bisect.bisect_right(self._order, after) if after is not None else 0
+            page = []
+            skipped = 0
+            for position in range(start, len(self._order)):
+                key = self._order[position]
+                item_id = key[1]
+                if feeds is not None and self._sources[item_id] not in feeds:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                page.append(key)
+                if len(page) > limit:
+                    break
+            items = [dict(self._items[key[1]]) for key in page[:limit]]
+
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit and limit > 0 else None
+        return items, next_cursor
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["items"] = len(self._items)
+            stats["untrackedItems"] = len(self._untracked)
+        return stats
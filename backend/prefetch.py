@@ -0,0 +1,157 @@
+"""
+Background pre-synthesis of the news page a client is looking at.
+
+After /api/news returns a page, the top items are queued as low-priority
+synthesis jobs in the voice the client used last, so pressing play is
+usually a cache hit. Prefetching is rate limited, backs off when the job
+queue is busy, and a client's unstarted prefetch jobs are cancelled when
+it moves on to another page.
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+# Prefetching is opt-in
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Items from the top of each page to pre-synthesize
+PREFETCH_TOP_N = int(os.environ.get("PREFETCH_TOP_N", "3"))
+
+# Prefetch jobs allowed per second across all clients, and the burst size
+PREFETCH_RATE = float(os.environ.get("PREFETCH_RATE", "1"))
+PREFETCH_BURST = int(os.environ.get("PREFETCH_BURST", "5"))
+
+# Skip prefetching while this fraction of the job queue is already in use
+PREFETCH_MAX_QUEUE_FRACTION = 0.5
+
+# Clients whose last voice and pending jobs we remember
+MAX_TRACKED_CLIENTS = 1000
+
+
+class TokenBucket:
+    """Simple token bucket rate limiter"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Take one token if available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class Prefetcher:
+    """Queues low-priority syntheses for the items a client is likely to play next"""
+
+    def __init__(self, job_queue, is_cached, priority, top_n=PREFETCH_TOP_N,
+                 rate=PREFETCH_RATE, burst=PREFETCH_BURST):
+        """
+        Args:
+            job_queue: synthesis JobQueue to submit to
+            is_cached: callable(text, voice_id) -> True if the audio already exists
+            priority: job priority used for prefetches
+            top_n: items per page to prefetch
+        """
+        self.job_queue = job_queue
+        self.is_cached = is_cached
+        self.priority = priority
+        self.top_n = top_n
+        self._bucket = TokenBucket(rate, burst)
+        self._last_voice = OrderedDict()
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "alreadyCached": 0, "rateLimited": 0, "cancelled": 0, "skippedBusy": 0}
+
+    def _remember(self, table, client, value):
+        table[client] = value
+        table.move_to_end(client)
+        while len(table) > MAX_TRACKED_CLIENTS:
+            table.popitem(last=False)
+
+    def record_voice(self, client, voice_id):
+        """Remember the voice a client last synthesized with"""
+        if not voice_id:
+            return
+        with self._lock:
+            self._remember(self._last_voice, client, voice_id)
+
+    def last_voice(self, client):
+        with self._lock:
+            return self._last_voice.get(client)
+
+    def cancel(self, client):
+        """Cancel a client's prefetch jobs that haven't started yet"""
+        with self._lock:
+            job_ids = self._pending.pop(client, [])
+        cancelled = sum(1 for job_id in job_ids if self.job_queue.cancel(job_id))
+        if cancelled:
+            with self._lock:
+                self._stats["cancelled"] += cancelled
+        return cancelled
+
+    def schedule(self, client, texts, voice_id=None):
+        """
+        Pre-synthesize the first top_n texts for a client's new page.
+
+        Any prefetches still queued for the client's previous page are
+        cancelled first. Returns the number of jobs queued.
+        """
+        self.cancel(client)
+
+        voice_id = voice_id or self.last_voice(client)
+        if not voice_id:
+            # Without a voice preference most prefetched audio would go unused
+            return 0
+
+        queue_stats = self.job_queue.stats()
+        if queue_stats["queueDepth"] >= queue_stats["maxQueue"] * PREFETCH_MAX_QUEUE_FRACTION:
+            with self._lock:
+                self._stats["skippedBusy"] += 1
+            return 0
+
+        job_ids = []
+        counts = {"queued": 0, "alreadyCached": 0, "rateLimited": 0}
+        for text in texts[:self.top_n]:
+            if self.is_cached(text, voice_id):
+                counts["alreadyCached"] += 1
+                continue
+            if not self._bucket.take():
+                counts["rateLimited"] += 1
+                break
+            try:
+                job = self.job_queue.submit({"text": text, "voice_id": voice_id}, priority=self.priority)
+            except Exception as e:
+                logging.info(f"Stopped prefetching: {e}")
+                break
+            job_ids.append(job.id)
+            counts["queued"] += 1
+
+        with self._lock:
+            if job_ids:
+                self._remember(self._pending, client, job_ids)
+            for name, value in counts.items():
+                self._stats[name] += value
+
+        if job_ids:
+            logging.info(f"Queued {len(job_ids)} prefetch syntheses with voice {voice_id}")
+        return len(job_ids)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["enabled"] = PREFETCH_ENABLED
+            stats["trackedClients"] = len(self._last_voice)
+        return stats
@@ -2,83 +2,284 @@
 """
 Script to set up voice samples from a folder containing many voice files.
 This script will copy or link voice files from a source directory to the voice_samples directory.
+
+The source tree is walked lazily and files are imported by a pool of worker
+threads. Files that are already in place and unchanged are skipped, so an
+interrupted import can simply be run again. When it finishes, a manifest of
+voice_samples/ is written for the backend to load instead of scanning.
 """
 
 import os
 import sys
+import errno
 import shutil
+import hashlib
 import argparse
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from voice_catalog import VOICE_EXTENSIONS, read_manifest, write_manifest
+
+# Ways a sample can be put in place
+IMPORT_MODES = ("copy", "symlink", "hardlink", "reflink")
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, ...) instead of copying its data
+FICLONE = 0x40049409
+
+# Errors meaning the filesystem can't link or clone here, so we copy instead
+LINK_UNSUPPORTED = (errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY)
+
+# Bytes read at a time when hashing
+HASH_CHUNK = 1024 * 1024
+
+# Print progress after this many files
+PROGRESS_EVERY = 1000
+
+# Owner recorded for a file that was in the target directory before we imported anything there
+FOREIGN = ""
+
+
+def iter_audio_files(source_dir):
+    """Yield audio files under source_dir one directory at a time, in a stable order"""
+    pending = [source_dir]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Error reading {directory}: {e}")
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in VOICE_EXTENSIONS and entry.is_file():
+                yield entry.path
+        # Depth first, keeping name order
+        pending.extend(reversed(subdirectories))
+
+
+def file_hash(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def is_unchanged(source, target, mode, checksum=False):
+    """Whether target already holds source as mode would have put it there"""
+    try:
+        if mode == "symlink":
+            return os.path.islink(target) and os.readlink(target) == source
+        if mode == "hardlink" and os.path.samefile(source, target):
+            return True
+        source_stat = os.stat(source)
+        target_stat = os.lstat(target)
+    except OSError:
+        return False
+    if os.path.islink(target) or source_stat.st_size != target_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == target_stat.st_mtime_ns:
+        return True
+    if checksum and file_hash(source) == file_hash(target):
+        # Same content with a different timestamp; align it so the next run takes the fast path
+        shutil.copystat(source, target)
+        return True
+    return False
+
+
+def reflink(source, target):
+    """Clone source to target without copying data; raises OSError where unsupported"""
+    import fcntl
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, target)
+
+
+def place_file(source, target, mode):
+    """
+    Put source at target using mode, replacing whatever is there atomically.
+    Returns the mode actually used; links fall back to a copy where the
+    filesystem doesn't support them.
+    """
+    partial = f"{target}.{threading.get_ident()}.part"
+    used = mode
+    try:
+        try:
+            if mode == "symlink":
+                os.symlink(source, partial)
+            elif mode == "hardlink":
+                os.link(source, partial)
+            elif mode == "reflink":
+                reflink(source, partial)
+            else:
+                shutil.copy2(source, partial)
+        except (OSError, ImportError) as e:
+            if mode == "copy" or (isinstance(e, OSError) and e.errno not in LINK_UNSUPPORTED):
+                raise
+            if os.path.lexists(partial):
+                os.remove(partial)
+            shutil.copy2(source, partial)
+            used = "copy"
+        os.replace(partial, target)
+    finally:
+        if os.path.lexists(partial):
+            os.remove(partial)
+    return used
+
+
+class VoiceImporter:
+    """Imports audio files into a voice samples directory with a pool of worker threads"""
+
+    def __init__(self, target_dir, mode="copy", workers=None, checksum=False, verbose=False):
+        self.target_dir = target_dir
+        self.mode = mode
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.checksum = checksum
+        self.verbose = verbose
+        self.counts = {"imported": 0, "skipped": 0, "failed": 0, "copiedInstead": 0}
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Target file name -> source claimed by this run or recorded by an earlier one
+        self._owners = {}
+        for sample in read_manifest(target_dir) or []:
+            if sample.get("source"):
+                self._owners[sample["file"]] = sample["source"]
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+            done = self.counts["imported"] + self.counts["skipped"] + self.counts["failed"]
+            progress = f"{done} files processed ({self.counts['imported']} imported, {self.counts['skipped']} unchanged)"
+        if name != "copiedInstead" and done % PROGRESS_EVERY == 0:
+            print(progress)
+
+    def target_name(self, source):
+        """Name for source in the target directory; names taken by another source get a stable suffix"""
+        name = os.path.basename(source)
+        with self._lock:
+            owner = self._owners.get(name)
+            if owner is None:
+                # A file we have no record of is only taken over if it already is this sample
+                path = os.path.join(self.target_dir, name)
+                foreign = os.path.lexists(path) and not is_unchanged(source, path, self.mode, self.checksum)
+                owner = self._owners[name] = FOREIGN if foreign else source
+        if owner == source:
+            return name
+        stem, extension = os.path.splitext(name)
+        suffix = hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+        return f"{stem}_{suffix}{extension}"
+
+    def import_file(self, source):
+        name = self.target_name(source)
+        target = os.path.join(self.target_dir, name)
+        try:
+            if is_unchanged(source, target, self.mode, self.checksum):
+                self._count("skipped")
+            else:
+                used = place_file(source, target, self.mode)
+                if used != self.mode:
+                    self._count("copiedInstead")
+                self._count("imported")
+                if self.verbose:
+                    print(f"{'Linked' if used != 'copy' else 'Copied'}: {source} -> {target}")
+            stat = os.stat(source)
+            with self._lock:
+                self._entries[name] = {"file": name, "source": source, "size": stat.st_size,
+                                       "mtime": stat.st_mtime_ns}
+        except OSError as e:
+            print(f"Error importing {source}: {e}")
+            self._count("failed")
+
+    def run(self, source_dir, max_files=None):
+        """Import every audio file under source_dir (up to max_files) and write the manifest"""
+        os.makedirs(self.target_dir, exist_ok=True)
+        source_dir = os.path.abspath(source_dir)
+        found = 0
+        # Only a few files per worker are in flight, so memory stays flat however big the tree is
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="voice-import") as executor:
+            in_flight = set()
+            for source in iter_audio_files(source_dir):
+                if max_files and found >= max_files:
+                    break
+                found += 1
+                in_flight.add(executor.submit(self.import_file, source))
+                if len(in_flight) >= self.workers * 4:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            wait(in_flight)
 
-def setup_voice_samples(source_dir, target_dir, max_files=None, symlink=False):
+        print(f"Found {found} audio files in {source_dir}")
+        self.write_manifest()
+        return found
+
+    def write_manifest(self):
+        """Index everything in the target directory, including samples that weren't imported by this run"""
+        entries = dict(self._entries)
+        with os.scandir(self.target_dir) as scan:
+            for entry in scan:
+                if entry.name in entries or os.path.splitext(entry.name)[1].lower() not in VOICE_EXTENSIONS:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # A dangling symlink whose source has gone
+                    continue
+                entries[entry.name] = {"file": entry.name, "source": self._owners.get(entry.name) or None,
+                                       "size": stat.st_size, "mtime": stat.st_mtime_ns}
+        return write_manifest(self.target_dir, entries.values())
+
+
+def setup_voice_samples(source_dir, target_dir, max_files=None, symlink=False, mode=None, workers=None,
+                        checksum=False, verbose=False):
     """
-    Copy or symlink voice files from source_dir to target_dir
-    
+    Copy or link voice files from source_dir to target_dir
+
     Args:
         source_dir: Directory containing voice files
         target_dir: Directory to copy/link files to (voice_samples)
         max_files: Maximum number of files to process (None = all)
-        symlink: If True, create symlinks instead of copying files
+        symlink: If True, create symlinks instead of copying files (same as mode="symlink")
+        mode: "copy", "symlink", "hardlink" or "reflink"
+        workers: Number of files imported at once
+        checksum: Compare file contents when sizes match but timestamps differ
+        verbose: Print a line for every file imported
     """
-    # Create target directory if it doesn't exist
-    os.makedirs(target_dir, exist_ok=True)
-    
-    # Get all audio files in the source directory
-    audio_files = []
-    for ext in ['.mp3', '.wav']:
-        audio_files.extend(list(Path(source_dir).glob(f'**/*{ext}')))
-    
-    # Limit number of files if specified
-    if max_files and len(audio_files) > max_files:
-        audio_files = audio_files[:max_files]
-    
-    print(f"Found {len(audio_files)} audio files in {source_dir}")
-    
-    # Process each file
-    for i, file_path in enumerate(audio_files):
-        # Create a simple numbered filename if needed
-        target_filename = file_path.name
-        
-        # Ensure unique filenames by adding index if needed
-        if (Path(target_dir) / target_filename).exists():
-            base_name = file_path.stem
-            extension = file_path.suffix
-            target_filename = f"{base_name}_{i}{extension}"
-        
-        target_path = Path(target_dir) / target_filename
-        
-        # Copy or symlink the file
-        if symlink:
-            # Use relative path for symlink if possible
-            try:
-                target_path.symlink_to(file_path.resolve())
-                print(f"Created symlink: {target_path} -> {file_path}")
-            except Exception as e:
-                print(f"Error creating symlink for {file_path}: {e}")
-        else:
-            try:
-                shutil.copy2(file_path, target_path)
-                print(f"Copied: {file_path} -> {target_path}")
-            except Exception as e:
-                print(f"Error copying {file_path}: {e}")
-    
-    print(f"\nDone! {len(audio_files)} voice samples are now available in {target_dir}")
+    importer = VoiceImporter(target_dir, mode=mode or ("symlink" if symlink else "copy"), workers=workers,
+                             checksum=checksum, verbose=verbose)
+    importer.run(source_dir, max_files)
+
+    counts = importer.counts
+    print(f"\nDone! {counts['imported']} imported, {counts['skipped']} already up to date, "
+          f"{counts['failed']} failed. Voice samples are in {target_dir}")
+    if counts["copiedInstead"]:
+        print(f"{counts['copiedInstead']} files were copied because {importer.mode} isn't supported there")
+    return counts
+
 
 def main():
     parser = argparse.ArgumentParser(description="Set up voice samples for the Breeze Celebrity Sounds app")
     parser.add_argument("source_dir", help="Directory containing voice files")
     parser.add_argument("--max", type=int, help="Maximum number of files to process")
+    parser.add_argument("--mode", choices=IMPORT_MODES, help="How to put files in place (default: copy)")
     parser.add_argument("--symlink", action="store_true", help="Create symlinks instead of copying files")
+    parser.add_argument("--workers", type=int, help="Files imported at once (default: 4 per CPU, up to 32)")
+    parser.add_argument("--checksum", action="store_true",
+                        help="Compare contents when size matches but modification time doesn't")
+    parser.add_argument("--verbose", action="store_true", help="Print every file imported")
     args = parser.parse_args()
-    
+
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
     # Target directory is voice_samples in the same directory as this script
     target_dir = os.path.join(script_dir, "voice_samples")
-    
+
     # Process the files
-    setup_voice_samples(args.source_dir, target_dir, args.max, args.symlink)
+    counts = setup_voice_samples(args.source_dir, target_dir, args.max, args.symlink, args.mode, args.workers,
+                                 args.checksum, args.verbose)
+    sys.exit(1 if counts["failed"] else 0)
 
 if __name__ == "__main__":
     main()
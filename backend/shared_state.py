@@ -0,0 +1,188 @@
+"""
+State shared by every worker process of one deployment.
+
+Under a multi-process server each worker has its own memory, so anything
+that must look the same whichever worker answers a request (synthesis job
+status, audio durations, when generated files were last served, the items
+of each feed) is kept in one SQLite database in WAL mode. Values are small
+JSON objects stored under a namespace and key. Connections are opened per
+thread and per process, so a database opened before the server forks is
+never used by a child. Leases (`claim`) let one process at a time own a
+job such as polling the feeds.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Publish job status, audio metadata and access times for other worker processes (wsgi.py turns this on)
+SHARED_STATE_ENABLED = os.environ.get("SHARED_STATE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Database holding state shared between worker processes
+SHARED_STATE_PATH = os.environ.get("SHARED_STATE_PATH", os.path.join(BASE_DIR, "cache", "shared_state.db"))
+
+# Seconds a connection waits for another process's write to finish
+SHARED_STATE_TIMEOUT = 5
+
+
+class SharedState:
+    """Namespaced JSON key/value store in SQLite, safe to use from several processes"""
+
+    def __init__(self, path=SHARED_STATE_PATH, timeout=SHARED_STATE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        # Connections inherited from a parent process; kept open because closing them would disturb the parent
+        self._inherited = []
+        self._failed = False
+
+    def _connection(self):
+        """This thread's connection, opened again after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if conn is not None:
+            self._inherited.append(conn)
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, expires_at REAL, PRIMARY KEY (namespace, key))"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _execute(self, sql, params=()):
+        try:
+            return self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            # Callers fall back to their in-process state; log once rather than per request
+            if not self._failed:
+                logging.error(f"Shared state at {self.path} is unavailable: {e}")
+                self._failed = True
+            return None
+
+    def get(self, namespace, key):
+        """The value stored under key, or None if it is missing or expired"""
+        rows = self._execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time())
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def items(self, namespace):
+        """Every unexpired key and value in namespace"""
+        rows = self._execute(
+            "SELECT key, value FROM entries WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, time.time())
+        )
+        return {key: json.loads(value) for key, value in rows or ()}
+
+    def put(self, namespace, key, value, expires_at=None):
+        self.put_many(namespace, {key: value}, expires_at)
+
+    def put_many(self, namespace, values, expires_at=None):
+        """Store a dict of key -> value, replacing what was there"""
+        if not values:
+            return
+        now = time.time()
+        rows = [(namespace, key, json.dumps(value), now, expires_at) for key, value in values.items()]
+        if len(rows) == 1:
+            self._execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", rows[0])
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            logging.warning(f"Shared state write failed: {e}")
+
+    def update(self, namespace, key, changes, only_if=None):
+        """
+        Merge changes into the value under key in one transaction.
+
+        Args:
+            changes: dict of fields to set
+            only_if: optional dict of fields the current value must have for
+                the update to happen
+
+        Returns:
+            The updated value, or None if the key is missing or only_if didn't match
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                if row is None:
+                    return None
+                value = json.loads(row[0])
+                if only_if and any(value.get(field) != expected for field, expected in only_if.items()):
+                    return None
+                value.update(changes)
+                conn.execute(
+                    "UPDATE entries SET value = ?, updated_at = ? WHERE namespace = ? AND key = ?",
+                    (json.dumps(value), time.time(), namespace, key)
+                )
+                return value
+        except sqlite3.Error as e:
+            logging.warning(f"Shared state update failed: {e}")
+            return None
+
+    def claim(self, namespace, key, owner, ttl):
+        """
+        Take or renew a lease on key for owner, for the next ttl seconds.
+
+        Returns:
+            True if owner holds the lease, False if another owner holds an
+            unexpired one, None if the shared state is unavailable
+        """
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                if row is not None and json.loads(row[0]) != owner and row[1] is not None and row[1] > now:
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, json.dumps(owner), now, now + ttl)
+                )
+                return True
+        except sqlite3.Error as e:
+            logging.warning(f"Shared state lease failed: {e}")
+            return None
+
+    def delete(self, namespace, key):
+        self._execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def purge_expired(self):
+        """Drop expired entries from every namespace"""
+        try:
+            return self._connection().execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+        except sqlite3.Error as e:
+            logging.warning(f"Shared state cleanup failed: {e}")
+            return 0
+
+
+# Shared state of this deployment
+shared_state = SharedState()
@@ -0,0 +1,133 @@
+"""
+Startup timing and deferred loading of heavy dependencies.
+
+Heavy libraries (feedparser, gTTS, transformers, Coqui TTS) are imported
+through `lazy_import`, which returns a stand-in that imports the real
+module on first attribute access. The server can therefore start serving
+voices and audio before any engine is loaded. An optional warm-up thread
+loads them in the background after boot, and `startup.report()` breaks
+import, initialization and warm-up time down per component.
+"""
+
+import os
+import time
+import importlib
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Load heavy engines in a background thread after boot instead of on first use
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class StartupReport:
+    """Records how long each component took to import, initialize and warm up"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_after = None
+        self._components = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, component, phase, seconds):
+        with self._lock:
+            self._components.setdefault(component, {})[phase] = round(seconds, 4)
+
+    @contextmanager
+    def measure(self, component, phase="init"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(component, phase, time.perf_counter() - start)
+
+    def mark_ready(self):
+        """Note that the app is importable and can serve requests"""
+        self.ready_after = time.perf_counter() - self.started
+
+    def report(self):
+        with self._lock:
+            components = {name: dict(phases) for name, phases in self._components.items()}
+        return {
+            "readySeconds": round(self.ready_after, 4) if self.ready_after is not None else None,
+            "components": components
+        }
+
+    def summary(self, phases=("import", "init")):
+        """Time per component spent in the given phases, slowest first, as one line"""
+        costs = [
+            (name, sum(seconds for phase, seconds in recorded.items() if phase in phases))
+            for name, recorded in self.report()["components"].items()
+        ]
+        costs = sorted((cost for cost in costs if cost[1]), key=lambda cost: cost[1], reverse=True)
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in costs)
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access"""
+
+    def __init__(self, name, report):
+        self._name = name
+        self._report = report
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is not None:
+            return self._module
+        with self._lock:
+            if self._module is None:
+                with self._report.measure(self._name, "import"):
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __repr__(self):
+        return f"<lazy module {self._name} ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+# Shared report for this process
+startup = StartupReport()
+
+# One proxy per module name, so every importer shares the same timing record
+_lazy_modules = {}
+_lazy_modules_lock = threading.Lock()
+
+
+def lazy_import(name):
+    """A module proxy for name that is imported (and timed) on first use"""
+    with _lazy_modules_lock:
+        module = _lazy_modules.get(name)
+        if module is None:
+            module = _lazy_modules[name] = LazyModule(name, startup)
+        return module
+
+
+def warm_up(tasks):
+    """
+    Run (name, callable) tasks one after another, timing each under the
+    "warmup" phase. Failures are logged and don't stop the remaining tasks.
+    """
+    for name, task in tasks:
+        try:
+            with startup.measure(name, "warmup"):
+                task()
+        except Exception as e:
+            logging.warning(f"Warm-up of {name} failed: {e}")
+    logging.info(f"Warm-up finished: {startup.summary(phases=('warmup',))}")
+
+
+def start_warmup(tasks):
+    """Run warm_up(tasks) in a daemon thread. Returns the thread, or None if warm-up is disabled."""
+    if not WARMUP_ENABLED:
+        return None
+    thread = threading.Thread(target=warm_up, args=(tasks,), name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,153 @@
+"""
+Process-wide registry for the news summarization model.
+
+The Hugging Face pipeline is expensive to build, so it is created once per
+process and shared between Flask request threads.
+"""
+
+import os
+import threading
+import time
+import logging
+
+from startup import lazy_import
+
+# transformers (and torch behind it) takes seconds to import, so it is deferred
+transformers = lazy_import("transformers")
+
+# Model used for news summaries
+SUMMARIZER_MODEL = os.environ.get("SUMMARIZER_MODEL", "Falconsai/text_summarization")
+
+# Load the model at startup instead of on the first /api/news request
+SUMMARIZER_PRELOAD = os.environ.get("SUMMARIZER_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+# Number of articles sent through the model in one forward pass
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "8"))
+
+
+def _build_pipeline(model_name):
+    """Construct a Hugging Face summarization pipeline"""
+    return transformers.pipeline("summarization", model=model_name)
+
+
+class SummarizerRegistry:
+    """Holds one loaded summarization pipeline per model name"""
+
+    def __init__(self, loader=_build_pipeline):
+        self._loader = loader
+        self._models = {}
+        self._load_times = {}
+        self._errors = {}
+        # Serializes model construction so concurrent requests don't load twice
+        self._load_lock = threading.Lock()
+        # Per-model lock around inference; fast tokenizers are not safe to share across threads
+        self._infer_locks = {}
+
+    def get(self, model_name=SUMMARIZER_MODEL):
+        """Return the pipeline for model_name, loading it on first use"""
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._load_lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(model_name)
+            if model is not None:
+                return model
+
+            logging.info(f"Loading summarization model {model_name}...")
+            start = time.perf_counter()
+            try:
+                model = self._loader(model_name)
+            except Exception as e:
+                self._errors[model_name] = str(e)
+                logging.error(f"Failed to load summarization model {model_name}: {e}")
+                raise
+            elapsed = time.perf_counter() - start
+
+            self._infer_locks[model_name] = threading.Lock()
+            self._load_times[model_name] = elapsed
+            self._errors.pop(model_name, None)
+            self._models[model_name] = model
+            logging.info(f"Summarization model {model_name} loaded in {elapsed:.2f}s")
+            return model
+
+    def summarize(self, text, model_name=SUMMARIZER_MODEL, **kwargs):
+        """Run the summarizer on text (a string or list of strings)"""
+        model = self.get(model_name)
+        with self._infer_locks[model_name]:
+            return model(text, **kwargs)
+
+    def summarize_batch(self, texts, model_name=SUMMARIZER_MODEL, batch_size=SUMMARY_BATCH_SIZE, **kwargs):
+        """
+        Summarize a list of texts in micro-batches and return summaries in input order.
+
+        Inputs are sorted by token length before batching so each batch holds
+        similarly sized texts and little compute is wasted on padding.
+        """
+        if not texts:
+            return []
+
+        model = self.get(model_name)
+        batch_size = max(1, batch_size)
+        summaries = [None] * len(texts)
+
+        with self._infer_locks[model_name]:
+            # Tokenizing also uses the shared tokenizer, so it stays under the lock
+            lengths = self._token_lengths(model, texts)
+            order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+            for start in range(0, len(order), batch_size):
+                bucket = order[start:start + batch_size]
+                results = model(
+                    [texts[i] for i in bucket],
+                    batch_size=len(bucket),
+                    truncation=True,
+                    **kwargs
+                )
+                for i, result in zip(bucket, results):
+                    # Pipelines return a list per input when given a list
+                    if isinstance(result, list):
+                        result = result[0]
+                    summaries[i] = result["summary_text"]
+
+        return summaries
+
+    @staticmethod
+    def _token_lengths(model, texts):
+        """Token count per text, falling back to word count if there is no tokenizer"""
+        tokenizer = getattr(model, "tokenizer", None)
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+                return [len(ids) for ids in encoded]
+            except Exception as e:
+                logging.warning(f"Could not tokenize texts for bucketing: {e}")
+        return [len(text.split()) for text in texts]
+
+    def preload(self, model_name=SUMMARIZER_MODEL):
+        """Load the model now so the first request finds it warm"""
+        try:
+            self.get(model_name)
+        except Exception:
+            # The error is recorded and will be retried on the next request
+            pass
+
+    def is_warm(self, model_name=SUMMARIZER_MODEL):
+        return model_name in self._models
+
+    def status(self):
+        """Describe the warm/cold state of every known model for the health endpoint"""
+        names = set(self._models) | set(self._errors) | {SUMMARIZER_MODEL}
+        return {
+            name: {
+                "state": "warm" if name in self._models else "cold",
+                "loadTimeSeconds": round(self._load_times[name], 3) if name in self._load_times else None,
+                "error": self._errors.get(name)
+            }
+            for name in sorted(names)
+        }
+
+
+# Shared registry used by the Flask app
+summarizers = SummarizerRegistry()
@@ -0,0 +1,218 @@
+"""
+Content-addressed cache for article summaries.
+
+Summaries are keyed by a hash of the article text together with the model
+name and generation parameters, so the same article summarized the same way
+is only run through the model once. A small in-memory LRU sits in front of
+a SQLite table that survives restarts. The table is in WAL mode, so the
+worker processes of a multi-process server share it; each process keeps
+its own memory tier and opens its own connection on first use.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where the on-disk tier lives
+SUMMARY_CACHE_PATH = os.environ.get("SUMMARY_CACHE_PATH", os.path.join(BASE_DIR, "cache", "summaries.db"))
+
+# Entries kept in the in-memory tier
+SUMMARY_CACHE_MEMORY_ITEMS = int(os.environ.get("SUMMARY_CACHE_MEMORY_ITEMS", "1024"))
+
+# Rows kept in the on-disk tier
+SUMMARY_CACHE_DISK_ITEMS = int(os.environ.get("SUMMARY_CACHE_DISK_ITEMS", "50000"))
+
+# Seconds before a cached summary is considered stale (0 = never)
+SUMMARY_CACHE_TTL = int(os.environ.get("SUMMARY_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def summary_key(title, original_text, model_name, params):
+    """Build the cache key for an article summarized with the given model and parameters"""
+    hasher = hashlib.sha256()
+    hasher.update(model_name.encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(title.encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(original_text.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class SummaryCache:
+    """Two-tier (memory LRU over SQLite) summary cache with size and TTL eviction"""
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, memory_items=SUMMARY_CACHE_MEMORY_ITEMS,
+                 disk_items=SUMMARY_CACHE_DISK_ITEMS, ttl=SUMMARY_CACHE_TTL):
+        self.path = path
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self.ttl = ttl
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memoryHits": 0, "diskHits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._conn = None
+        self._conn_pid = None
+        # Connections inherited from a parent process; kept open because closing them would disturb the parent
+        self._inherited = []
+
+    def _connect(self):
+        """Open the database on first use in this process (caller holds the lock)"""
+        if self._conn_pid == os.getpid():
+            return
+        if self._conn is not None:
+            self._inherited.append(self._conn)
+        self._conn = None
+        self._conn_pid = os.getpid()
+
+        path = self.path
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed_at)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # Keep working as a memory-only cache if the database can't be opened
+            logging.error(f"Could not open summary cache at {path}: {e}")
+            self._conn = None
+
+    def _expired(self, created_at, now):
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get_many(self, keys):
+        """Return a dict of key -> summary for every key that is cached and fresh"""
+        now = time.time()
+        found = {}
+        missing = []
+
+        with self._lock:
+            self._connect()
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None and not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self._stats["memoryHits"] += 1
+                else:
+                    if entry is not None:
+                        del self._memory[key]
+                    missing.append(key)
+
+            if missing and self._conn is not None:
+                try:
+                    placeholders = ",".join("?" * len(missing))
+                    rows = self._conn.execute(
+                        f"SELECT key, summary, created_at FROM summaries WHERE key IN ({placeholders})",
+                        missing
+                    ).fetchall()
+                    fresh = [(key, summary, created_at) for key, summary, created_at in rows
+                             if not self._expired(created_at, now)]
+                    for key, summary, created_at in fresh:
+                        found[key] = summary
+                        self._remember(key, summary, created_at)
+                        self._stats["diskHits"] += 1
+                    if fresh:
+                        self._conn.executemany(
+                            "UPDATE summaries SET accessed_at = ? WHERE key = ?",
+                            [(now, key) for key, _, _ in fresh]
+                        )
+                        self._conn.commit()
+                except sqlite3.Error as e:
+                    logging.warning(f"Summary cache read failed: {e}")
+
+            self._stats["misses"] += len([key for key in keys if key not in found])
+
+        return found
+
+    def put_many(self, entries):
+        """Store a dict of key -> summary in both tiers"""
+        if not entries:
+            return
+        now = time.time()
+
+        with self._lock:
+            self._connect()
+            for key, summary in entries.items():
+                self._remember(key, summary, now)
+            self._stats["writes"] += len(entries)
+
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO summaries (key, summary, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                        [(key, summary, now, now) for key, summary in entries.items()]
+                    )
+                    self._evict_disk(now)
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logging.warning(f"Summary cache write failed: {e}")
+
+    def _remember(self, key, summary, created_at):
+        """Insert into the memory tier, evicting the least recently used entries"""
+        self._memory[key] = (summary, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        """Drop expired rows and trim the table to the configured size"""
+        removed = 0
+        if self.ttl > 0:
+            removed += self._conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?", (now - self.ttl,)
+            ).rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        if count > self.disk_items:
+            removed += self._conn.execute(
+                "DELETE FROM summaries WHERE key IN "
+                "(SELECT key FROM summaries ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.disk_items,)
+            ).rowcount
+        self._stats["evictions"] += max(removed, 0)
+
+    def clear(self):
+        """Drop every cached summary from both tiers"""
+        with self._lock:
+            self._connect()
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM summaries")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logging.warning(f"Summary cache clear failed: {e}")
+
+    def stats(self):
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            self._connect()
+            stats = dict(self._stats)
+            stats["memoryItems"] = len(self._memory)
+            stats["diskItems"] = None
+            if self._conn is not None:
+                try:
+                    stats["diskItems"] = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+        lookups = stats["memoryHits"] + stats["diskHits"] + stats["misses"]
+        stats["hitRate"] = round((stats["memoryHits"] + stats["diskHits"]) / lookups, 3) if lookups else None
+        return stats
+
+
+# Shared cache used by the Flask app
+summary_cache = SummaryCache()
@@ -0,0 +1,290 @@
+"""
+Asynchronous job queue for speech synthesis.
+
+Requests are queued with a priority and handled by a fixed pool of worker
+threads, so slow TTS calls no longer hold Flask request threads. The queue
+is bounded: when it is full, submit() raises QueueFull and the API answers
+429 instead of piling up work it can't finish.
+
+Jobs run in the process that accepted them. With a SharedState, each job's
+status is also published there, so any worker process can report on,
+long-poll or cancel it.
+"""
+
+import os
+import time
+import uuid
+import heapq
+import itertools
+import threading
+import logging
+from collections import deque
+
+# Worker threads running syntheses
+SYNTHESIS_WORKERS = int(os.environ.get("SYNTHESIS_WORKERS", "4"))
+
+# Jobs allowed to wait in the queue before new submissions are rejected
+SYNTHESIS_QUEUE_SIZE = int(os.environ.get("SYNTHESIS_QUEUE_SIZE", "100"))
+
+# Seconds finished jobs are kept so clients can collect their results
+SYNTHESIS_JOB_RETENTION = int(os.environ.get("SYNTHESIS_JOB_RETENTION", "600"))
+
+# Named priorities accepted by the API; lower runs first
+PRIORITIES = {"high": 0, "normal": 5, "low": 10}
+
+# Number of recent jobs used for wait/service time percentiles
+TIMING_WINDOW = 500
+
+# Seconds between checks when long-polling a job owned by another process
+SHARED_POLL_INTERVAL = 0.25
+
+# Statuses after which a job no longer changes
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+class Job:
+    """One queued synthesis and its outcome"""
+
+    def __init__(self, params, priority):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.priority = priority
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        data = {
+            "jobId": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at
+        }
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class SharedJob:
+    """Snapshot of a job owned by another worker process, read from the shared state"""
+
+    def __init__(self, record):
+        self.id = record["jobId"]
+        self.status = record["status"]
+        self.result = record.get("result")
+        self.error = record.get("error")
+        self._record = record
+
+    def to_dict(self):
+        return dict(self._record)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+class JobQueue:
+    """Bounded priority queue of jobs served by a pool of worker threads"""
+
+    def __init__(self, handler, workers=SYNTHESIS_WORKERS, max_queue=SYNTHESIS_QUEUE_SIZE,
+                 retention=SYNTHESIS_JOB_RETENTION, shared=None):
+        """
+        Args:
+            handler: callable(**job.params) run by a worker; its return value becomes job.result
+            workers: number of worker threads
+            max_queue: jobs allowed to wait before submit() raises QueueFull
+            retention: seconds finished jobs are kept
+            shared: optional SharedState that job status is published to
+        """
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self.shared = shared
+
+        self._heap = []
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._condition = threading.Condition()
+        self._threads = []
+        self._running = 0
+        self._queued = 0
+        self._wait_times = deque(maxlen=TIMING_WINDOW)
+        self._service_times = deque(maxlen=TIMING_WINDOW)
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    def start(self):
+        with self._condition:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"synthesis-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logging.info(f"Synthesis job queue started with {self.workers} workers")
+
+    def submit(self, params, priority=PRIORITIES["normal"]):
+        """Queue a job and return it; raises QueueFull if the queue is at capacity"""
+        # Workers are started on first use so importing the app doesn't spawn threads
+        self.start()
+        job = Job(params, priority)
+        with self._condition:
+            self._expire_finished()
+            if self._queued >= self.max_queue:
+                self._counts["rejected"] += 1
+                raise QueueFull(f"Synthesis queue is full ({self.max_queue} jobs waiting)")
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (priority, next(self._sequence), job))
+            self._queued += 1
+            self._counts["submitted"] += 1
+            self._condition.notify()
+        self._publish(job)
+        return job
+
+    def _publish(self, job):
+        """Write the job's current status to the shared state"""
+        if self.shared is not None:
+            # Jobs of a worker that died disappear after the retention period too
+            self.shared.put("jobs", job.id, job.to_dict(), expires_at=time.time() + self.retention)
+
+    def _shared_job(self, job_id):
+        if self.shared is None:
+            return None
+        record = self.shared.get("jobs", job_id)
+        return SharedJob(record) if record is not None else None
+
+    def get(self, job_id):
+        """The job, or a SharedJob snapshot if another process owns it, or None"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self._shared_job(job_id)
+        if job.status == "queued" and self.shared is not None:
+            # Pick up a cancellation made through another process
+            record = self.shared.get("jobs", job_id)
+            if record is not None and record["status"] == "cancelled":
+                self.cancel(job_id)
+        return job
+
+    def wait(self, job_id, timeout):
+        """Block until the job finishes or timeout seconds pass; returns the job (or None if unknown)"""
+        job = self.get(job_id)
+        if isinstance(job, SharedJob):
+            # Owned by another process: poll its published status
+            deadline = time.monotonic() + timeout
+            while job is not None and job.status not in FINISHED_STATUSES and time.monotonic() < deadline:
+                time.sleep(min(SHARED_POLL_INTERVAL, max(0, deadline - time.monotonic())))
+                job = self._shared_job(job_id)
+        elif job is not None and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a job that hasn't started yet. Returns True if it was cancelled."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                if job.status != "queued":
+                    return False
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                self._queued -= 1
+                self._counts["cancelled"] += 1
+                # Cancelled jobs stay in the heap and are skipped by workers
+                job.done.set()
+
+        if job is not None:
+            self._publish(job)
+            return True
+        if self.shared is None:
+            return False
+        # The owning process checks for this before starting the job
+        return self.shared.update("jobs", job_id, {"status": "cancelled", "finishedAt": time.time()},
+                                  only_if={"status": "queued"}) is not None
+
+    def _claim(self, job):
+        """Mark a job running in the shared state unless another process cancelled it first"""
+        if self.shared is None:
+            return True
+        claimed = self.shared.update("jobs", job.id, {"status": "running", "startedAt": job.started_at},
+                                     only_if={"status": "queued"})
+        # A missing record (shared state unavailable or expired) doesn't stop the job
+        return claimed is not None or self.shared.get("jobs", job.id) is None
+
+    def _expire_finished(self):
+        """Forget finished jobs older than the retention period (caller holds the lock)"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                while self._heap:
+                    _, _, job = heapq.heappop(self._heap)
+                    if job.status == "queued":
+                        self._queued -= 1
+                        job.status = "running"
+                        job.started_at = time.time()
+                        self._running += 1
+                        return job
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if not self._claim(job):
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                with self._condition:
+                    self._running -= 1
+                    self._counts["cancelled"] += 1
+                job.done.set()
+                continue
+            self._wait_times.append(job.started_at - job.created_at)
+            try:
+                job.result = self.handler(**job.params)
+                job.status = "done"
+            except Exception as e:
+                logging.error(f"Synthesis job {job.id} failed: {e}")
+                job.error = str(e)
+                job.status = "failed"
+            job.finished_at = time.time()
+            self._service_times.append(job.finished_at - job.started_at)
+            with self._condition:
+                self._running -= 1
+                self._counts["completed" if job.status == "done" else "failed"] += 1
+            self._publish(job)
+            job.done.set()
+
+    def stats(self):
+        """Queue depth, counters and wait/service time percentiles over recent jobs"""
+        with self._condition:
+            stats = dict(self._counts)
+            stats.update({"queueDepth": self._queued, "running": self._running, "workers": self.workers,
+                          "maxQueue": self.max_queue})
+        wait_times = list(self._wait_times)
+        service_times = list(self._service_times)
+        stats["waitSeconds"] = {"p50": _percentile(wait_times, 0.5), "p95": _percentile(wait_times, 0.95)}
+        stats["serviceSeconds"] = {"p50": _percentile(service_times, 0.5), "p95": _percentile(service_times, 0.95)}
+        return stats
@@ -0,0 +1,97 @@
+"""Audio cache keys, in-flight coalescing and metadata"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_cache import AudioCache, audio_key
+from shared_state import SharedState
+
+PROFILE = {"lang": "en", "tld": "com", "slow": False}
+
+
+class AudioKeyTest(unittest.TestCase):
+    def test_whitespace_and_unicode_form_dont_change_the_key(self):
+        key = audio_key("Café news  today\n", "voice1", PROFILE)
+        self.assertEqual(key, audio_key(" Café news today", "voice1", PROFILE))
+        self.assertEqual(len(key), 32)
+
+    def test_text_voice_and_profile_are_part_of_the_key(self):
+        key = audio_key("News today", "voice1", PROFILE)
+        self.assertNotEqual(key, audio_key("News today.", "voice1", PROFILE))
+        self.assertNotEqual(key, audio_key("News today", "voice2", PROFILE))
+        self.assertNotEqual(key, audio_key("News today", "voice1", dict(PROFILE, tld="co.uk")))
+        self.assertEqual(key, audio_key("News today", "voice1", dict(reversed(list(PROFILE.items())))))
+
+
+class AudioCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = AudioCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_concurrent_requests_share_one_synthesis(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def create(path):
+            calls.append(path)
+            started.set()
+            release.wait(5)
+            with open(path, "wb") as f:
+                f.write(b"audio")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(self.cache.get_or_create, "k", create)
+            started.wait(5)
+            followers = [pool.submit(self.cache.get_or_create, "k", create) for _ in range(3)]
+            while self.cache.stats()["coalesced"] < 3:
+                time.sleep(0.01)
+            release.set()
+            paths = {leader.result()} | {future.result() for future in followers}
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(paths, {self.cache.path_for("k")})
+        stats = self.cache.stats()
+        self.assertEqual((stats["misses"], stats["coalesced"], stats["inFlight"]), (1, 3, 0))
+        # Later requests are plain hits
+        self.assertEqual(self.cache.get_or_create("k", create), self.cache.path_for("k"))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_failed_synthesis_caches_nothing(self):
+        def create(path):
+            with open(path, "wb") as f:
+                f.write(b"half")
+            raise RuntimeError("engine crashed")
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_create("k", create)
+        self.assertIsNone(self.cache.lookup("k"))
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(self.cache.stats()["failures"], 1)
+
+    def test_empty_output_is_a_failure(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get_or_create("k", lambda path: open(path, "wb").close())
+        self.assertIsNone(self.cache.lookup("k"))
+
+    def test_metadata_is_shared_between_processes(self):
+        shared = SharedState(os.path.join(self.directory, "shared.db"))
+        AudioCache(self.directory, shared=shared).set_metadata("k.mp3", duration=1.5)
+        other = AudioCache(self.directory, shared=shared)
+        self.assertEqual(other.get_metadata("k.mp3"), {"duration": 1.5})
+        self.assertIsNone(other.get_metadata("missing.mp3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Duration probing of MP3s joined from separately encoded parts"""
+
+import os
+import sys
+import struct
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_probe import probe_mp3_duration, join_mp3, strip_mp3_headers
+from chunked_synthesis import ChunkedSynthesizer
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz, joint stereo): 417 bytes, 1152 samples
+FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+FRAME_SECONDS = 1152 / 44100
+
+
+def id3_tag(size=64):
+    """ID3v2.3 tag with size bytes of (empty) frames"""
+    sync_safe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x03\x00\x00" + sync_safe + b"\x00" * size
+
+
+def info_frame(frames, stream_bytes):
+    """Frame carrying an Info header with frame and byte counts, as encoders write at the start"""
+    frame = bytearray(FRAME)
+    # Side information of an MPEG-1 stereo frame is 32 bytes
+    frame[36:52] = b"Info" + struct.pack(">III", 0x3, frames, stream_bytes)
+    return bytes(frame)
+
+
+def encoded_part(frames):
+    """MP3 as an encoder writes it: ID3v2 tag, Info frame, then the audio frames"""
+    return id3_tag() + info_frame(frames, (frames + 1) * len(FRAME)) + FRAME * frames
+
+
+class JoinedMp3DurationTest(unittest.TestCase):
+    def test_single_part_uses_its_info_header(self):
+        self.assertAlmostEqual(probe_mp3_duration(encoded_part(100)), 100 * FRAME_SECONDS, places=3)
+
+    def test_joined_parts_measure_their_total_length(self):
+        joined = join_mp3([encoded_part(100), encoded_part(60), encoded_part(40)])
+        self.assertAlmostEqual(probe_mp3_duration(joined), 200 * FRAME_SECONDS, places=3)
+
+    def test_join_keeps_only_the_first_tag_and_no_info_frames(self):
+        joined = join_mp3([encoded_part(10), encoded_part(10), encoded_part(10)])
+        self.assertTrue(joined.startswith(id3_tag()))
+        self.assertEqual(joined.count(b"ID3"), 1)
+        self.assertNotIn(b"Info", joined)
+        self.assertEqual(len(joined), len(id3_tag()) + 30 * len(FRAME))
+
+    def test_strip_leaves_other_data_alone(self):
+        wav = b"RIFF\x00\x00\x00\x00WAVE" + b"\xff\xfb\x90\x64" * 10
+        self.assertEqual(strip_mp3_headers(wav), wav)
+        self.assertEqual(strip_mp3_headers(FRAME * 3), FRAME * 3)
+
+    def test_concatenated_parts_ignore_the_first_info_count(self):
+        # Files cached before parts were joined without their headers
+        concatenated = b"".join([encoded_part(100), encoded_part(100), encoded_part(100)])
+        # The later parts' Info frames are walked as (silent) frames
+        self.assertAlmostEqual(probe_mp3_duration(concatenated), 302 * FRAME_SECONDS, places=3)
+
+    def test_chunked_synthesis_result_has_the_length_of_every_chunk(self):
+        synthesizer = ChunkedSynthesizer(workers=3, retries=0)
+        text = "First sentence of the story. Second sentence of the story. Third sentence of the story."
+        audio = synthesizer.synthesize(text, lambda chunk, index: encoded_part(50), max_chars=30)
+        self.assertAlmostEqual(probe_mp3_duration(audio), 150 * FRAME_SECONDS, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
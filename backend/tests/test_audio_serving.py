@@ -0,0 +1,95 @@
+"""Conditional, range and low-quality responses for generated audio"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, request
+
+from audio_serving import AudioServer, IMMUTABLE_CACHE_CONTROL, FALLBACK_CACHE_CONTROL
+
+# Content-addressed name, as audio_cache.audio_key() produces
+KEY = "0123456789abcdef0123456789abcdef"
+ORIGINAL = bytes(range(256)) * 4
+LOW = b"low" * 100
+
+
+class AudioServingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, f"{KEY}.mp3"), "wb") as f:
+            f.write(ORIGINAL)
+        self.server = AudioServer(self.directory, min_plays=1)
+        # Record transcodes instead of running ffmpeg
+        self.transcoded = []
+        self.server._transcode = lambda source, target: self.transcoded.append(target)
+
+        app = Flask(__name__)
+
+        @app.route("/audio/<path:filename>")
+        def audio(filename):
+            return self.server.response(filename, request) or ("", 404)
+
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.server._executor.shutdown(wait=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def get(self, query="", **headers):
+        return self.client.get(f"/audio/{KEY}.mp3{query}", headers=headers)
+
+    def test_full_response_is_immutable_with_content_etag(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, ORIGINAL)
+        self.assertEqual(response.headers["ETag"], f'"{KEY}"')
+        self.assertEqual(response.headers["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response.headers["Accept-Ranges"], "bytes")
+
+    def test_range_returns_partial_content(self):
+        response = self.get(Range="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, ORIGINAL[100:200])
+        self.assertEqual(response.headers["Content-Range"], f"bytes 100-199/{len(ORIGINAL)}")
+
+    def test_range_past_the_end_is_not_satisfiable(self):
+        response = self.get(Range=f"bytes={len(ORIGINAL) + 10}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.get(**{"If-None-Match": f'"{KEY}"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(self.server.stats()["notModified"], 1)
+
+    def test_low_quality_falls_back_to_the_original_briefly(self):
+        response = self.get("?quality=low")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, ORIGINAL)
+        self.assertEqual(response.headers["ETag"], f'"{KEY}.original"')
+        self.assertEqual(response.headers["Cache-Control"], FALLBACK_CACHE_CONTROL)
+        self.server._executor.shutdown(wait=True)
+        self.assertEqual(self.transcoded, [os.path.join(self.directory, f"{KEY}.low.mp3")])
+
+    def test_fallback_revalidation_picks_up_the_built_variant(self):
+        fallback_etag = self.get(**{"Save-Data": "on"}).headers["ETag"]
+        with open(os.path.join(self.directory, f"{KEY}.low.mp3"), "wb") as f:
+            f.write(LOW)
+        response = self.get(**{"Save-Data": "on", "If-None-Match": fallback_etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, LOW)
+        self.assertEqual(response.headers["ETag"], f'"{KEY}.low"')
+        self.assertEqual(response.headers["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertIn("Save-Data", response.headers["Vary"])
+
+    def test_missing_file_is_not_found(self):
+        self.assertEqual(self.client.get(f"/audio/{'f' * 32}.mp3").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Budgeted eviction of generated audio"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_store import AudioStore, STALE_PARTIAL_SECONDS
+from shared_state import SharedState
+
+
+class AudioStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, name, size=100, age=0):
+        """Audio file last modified age seconds ago"""
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+        return path
+
+    def remaining(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_byte_budget_evicts_least_recently_used_first(self):
+        store = AudioStore(self.directory, max_bytes=250, max_files=100, max_age=0, grace=0)
+        for i, name in enumerate(["a.mp3", "b.mp3", "c.mp3", "d.mp3"]):
+            self.write(name, age=100 - i)
+        # Served just now, so no longer the oldest
+        store.touch("a.mp3")
+        self.assertEqual(store.compact(), 2)
+        self.assertEqual(self.remaining(), ["a.mp3", "d.mp3"])
+        stats = store.stats()
+        self.assertEqual((stats["files"], stats["bytes"], stats["evictedBytes"]), (2, 200, 200))
+
+    def test_file_budget(self):
+        store = AudioStore(self.directory, max_bytes=10 ** 9, max_files=2, max_age=0, grace=0)
+        for i, name in enumerate(["a.wav", "b.mp3", "c.mp3"]):
+            self.write(name, age=10 - i)
+        self.write("notes.txt", age=100)
+        self.assertEqual(store.compact(), 1)
+        # Files that aren't audio aren't managed
+        self.assertEqual(self.remaining(), ["b.mp3", "c.mp3", "notes.txt"])
+
+    def test_old_files_expire_within_budget(self):
+        store = AudioStore(self.directory, max_bytes=10 ** 9, max_files=100, max_age=60, grace=0)
+        self.write("old.mp3", age=120)
+        self.write("new.mp3", age=10)
+        self.assertEqual(store.compact(), 1)
+        self.assertEqual(self.remaining(), ["new.mp3"])
+
+    def test_pinned_files_survive_until_the_grace_period_ends(self):
+        store = AudioStore(self.directory, max_bytes=100, max_files=100, max_age=0, grace=0.2)
+        self.write("handed-out.mp3", age=100)
+        self.write("newer.mp3", age=50)
+        store.record_write(os.path.join(self.directory, "handed-out.mp3"))
+        # handed-out.mp3 is now the most recent, so newer.mp3 goes first
+        self.assertEqual(store.compact(), 1)
+        self.assertEqual(self.remaining(), ["handed-out.mp3"])
+
+        self.write("another.mp3", age=0)
+        # Over budget, but the oldest file is pinned, so the newer one goes instead
+        self.assertEqual(store.compact(), 1)
+        self.assertEqual(self.remaining(), ["handed-out.mp3"])
+
+        # Once the pin runs out the oldest file goes
+        self.write("another.mp3", age=0)
+        store.touch("another.mp3")
+        time.sleep(0.25)
+        self.assertEqual(store.compact(), 1)
+        self.assertEqual(self.remaining(), ["another.mp3"])
+        self.assertEqual(store.stats()["pinned"], 0)
+
+    def test_stale_partial_files_are_removed(self):
+        store = AudioStore(self.directory, max_age=0, grace=0)
+        self.write("k.abc.part", age=STALE_PARTIAL_SECONDS + 10)
+        self.write("k.def.part", age=10)
+        store.compact()
+        self.assertEqual(self.remaining(), ["k.def.part"])
+
+    def test_pins_from_another_process_are_respected(self):
+        shared = SharedState(os.path.join(self.directory, "shared.db"))
+        writer = AudioStore(self.directory, max_bytes=100, max_files=100, max_age=0, grace=60, shared=shared)
+        compactor = AudioStore(self.directory, max_bytes=100, max_files=100, max_age=0, grace=60, shared=shared)
+        writer.record_write(self.write("pinned.mp3", age=100))
+        self.write("other.mp3", age=0)
+        self.assertEqual(compactor.compact(), 1)
+        self.assertIn("pinned.mp3", self.remaining())
+        self.assertNotIn("other.mp3", self.remaining())
+
+
+if __name__ == "__main__":
+    unittest.main()
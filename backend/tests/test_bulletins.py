@@ -0,0 +1,104 @@
+"""Bulletin keys, stitching and the bulk synthesis API"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulletins import bulletin_key, stitch_bulletin
+from synthesis_jobs import JobQueue
+
+
+class BulletinKeyTest(unittest.TestCase):
+    def test_items_order_and_gap_are_part_of_the_key(self):
+        key = bulletin_key(["a.mp3", "b.mp3"], 700)
+        self.assertEqual(key, bulletin_key(("a.mp3", "b.mp3"), 700))
+        self.assertEqual(len(key), 32)
+        self.assertNotEqual(key, bulletin_key(["b.mp3", "a.mp3"], 700))
+        self.assertNotEqual(key, bulletin_key(["a.mp3", "b.mp3"], 500))
+        self.assertNotEqual(key, bulletin_key(["a.mp3"], 700))
+
+
+@unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is needed to write MP3")
+class StitchBulletinTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_duration_includes_the_gaps(self):
+        from pydub import AudioSegment
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.directory, f"{i}.wav")
+            AudioSegment.silent(duration=1000).export(path, format="wav")
+            paths.append(path)
+        output = os.path.join(self.directory, "bulletin.mp3")
+        duration = stitch_bulletin(paths, output, gap_ms=500)
+        self.assertAlmostEqual(duration, 4.0, places=1)
+        self.assertGreater(os.path.getsize(output), 0)
+
+
+class BulkApiTest(unittest.TestCase):
+    def setUp(self):
+        import app
+        self.app = app
+        self.client = app.app.test_client()
+
+    def test_bulletin_leaves_out_items_without_audio(self):
+        queue = JobQueue(lambda text, voice_id: {"audioUrl": f"/api/audio/{text}.mp3"}, workers=2)
+        built = []
+
+        def build_bulletin(filenames, gap_ms):
+            built.append((filenames, gap_ms))
+            return {"audioUrl": "/api/audio/bulletin.mp3"}
+
+        with mock.patch.object(self.app, "synthesis_jobs", queue), \
+                mock.patch.object(self.app, "build_bulletin", build_bulletin):
+            response = self.client.post("/api/voice/bulk", json={
+                "items": [{"text": "one"}, {"text": ""}, {"title": "two", "summary": "more"}],
+                "bulletin": True, "gap_ms": 300
+            })
+
+        data = response.get_json()
+        self.assertEqual([item["status"] for item in data["items"]], ["done", "failed", "done"])
+        self.assertEqual(built, [(["one.mp3", "two. more.mp3"], 300)])
+        self.assertEqual(data["bulletin"]["includedItems"], [0, 2])
+
+    def test_full_queue_cancels_the_items_already_queued(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def handler(text, voice_id):
+            started.set()
+            release.wait(5)
+            return {"audioUrl": f"/api/audio/{text}.mp3"}
+
+        queue = JobQueue(handler, workers=1, max_queue=1)
+        # Keep the worker busy so the bulk items stay queued
+        queue.submit({"text": "busy", "voice_id": None})
+        started.wait(5)
+        try:
+            with mock.patch.object(self.app, "synthesis_jobs", queue):
+                response = self.client.post("/api/voice/bulk", json={"items": [{"text": "one"}, {"text": "two"}]})
+            self.assertEqual(response.status_code, 429)
+            stats = queue.stats()
+            self.assertEqual((stats["queueDepth"], stats["cancelled"]), (0, 1))
+        finally:
+            release.set()
+
+    def test_invalid_requests_are_400s(self):
+        for body in ({}, {"items": []}, {"items": [{"text": "a"}], "gap_ms": -1},
+                     {"items": [{"text": "a"}], "gap_ms": True}, {"items": [{"text": "a"}], "priority": "now"},
+                     {"items": [{"text": "a"}] * (self.app.BULK_MAX_ITEMS + 1)}):
+            self.assertEqual(self.client.post("/api/voice/bulk", json=body).status_code, 400, msg=body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Keyword category classification and its confidence"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categories import CategoryClassifier, classifier, DEFAULT_CATEGORY
+
+
+class CategoryClassifierTest(unittest.TestCase):
+    def test_keywords_only_match_whole_words(self):
+        # "ai" inside "said" and "tech" inside "technique" used to count
+        self.assertEqual(classifier.classify_text("The chef said her technique was simple"), (DEFAULT_CATEGORY, 0.0))
+        self.assertEqual(classifier.classify_text("New AI chip unveiled")[0], "Technology")
+
+    def test_plurals_and_case_match(self):
+        self.assertEqual(classifier.classify_text("ROBOTS and Computers everywhere"), ("Technology", 1.0))
+
+    def test_multi_word_keywords(self):
+        self.assertEqual(classifier.classify_text("Advances in artificial intelligence")[0], "Technology")
+
+    def test_confidence_is_the_winning_share_of_matches(self):
+        # Three sports keywords, one politics keyword
+        self.assertEqual(classifier.classify_text("Minister watches the football match with the team"),
+                         ("Sports", 0.75))
+
+    def test_ties_go_to_the_category_listed_first(self):
+        custom = CategoryClassifier({"First": ["alpha"], "Second": ["beta"]})
+        self.assertEqual(custom.classify_text("beta alpha"), ("First", 0.5))
+
+    def test_feed_categories_and_tags_are_trusted(self):
+        self.assertEqual(classifier.classify({"category": "Business", "title": "Football"}), ("Business", 1.0))
+        self.assertEqual(classifier.classify({"tags": [{"term": ""}, {"term": "World"}]}), ("World", 1.0))
+        self.assertEqual(classifier.classify({"title": "Election", "description": "vote count"}), ("Politics", 1.0))
+        self.assertEqual(classifier.classify_many([{"title": "nothing here"}]), [(DEFAULT_CATEGORY, 0.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
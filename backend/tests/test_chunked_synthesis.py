@@ -0,0 +1,77 @@
+"""Retries, ordering and failure of chunked synthesis"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunked_synthesis import ChunkedSynthesizer
+from text_segments import split_text
+
+TEXT = "The storm closed schools. Roads were flooded overnight. Power returned by noon. Trains run again today."
+MAX_CHARS = 30
+
+
+def chunks():
+    return split_text(TEXT, max_chars=MAX_CHARS, min_chars=MAX_CHARS // 2)
+
+
+class ChunkedSynthesizerTest(unittest.TestCase):
+    def setUp(self):
+        self.synthesizer = ChunkedSynthesizer(workers=4, retries=2, backoff=0.01)
+
+    def test_chunks_are_joined_in_reading_order(self):
+        expected = chunks()
+        self.assertGreater(len(expected), 2)
+
+        def synthesize(chunk, index):
+            # Earlier chunks finish last
+            time.sleep(0.01 * (len(expected) - index))
+            return f"[{chunk}]".encode("utf-8")
+
+        audio = self.synthesizer.synthesize(TEXT, synthesize, MAX_CHARS)
+        self.assertEqual(audio, b"".join(f"[{chunk}]".encode("utf-8") for chunk in expected))
+        stats = self.synthesizer.stats()
+        self.assertEqual((stats["texts"], stats["chunks"]), (1, len(expected)))
+
+    def test_a_failing_chunk_is_retried_on_its_own(self):
+        attempts = {}
+        lock = threading.Lock()
+
+        def synthesize(chunk, index):
+            with lock:
+                attempts[index] = attempts.get(index, 0) + 1
+                if index == 1 and attempts[index] < 3:
+                    raise ConnectionError("reset")
+            return b"x"
+
+        self.synthesizer.synthesize(TEXT, synthesize, MAX_CHARS)
+        self.assertEqual(attempts[1], 3)
+        self.assertEqual({index: count for index, count in attempts.items() if index != 1},
+                         {index: 1 for index in range(len(chunks())) if index != 1})
+        self.assertEqual(self.synthesizer.stats()["retries"], 2)
+
+    def test_chunk_that_keeps_failing_fails_the_text(self):
+        def synthesize(chunk, index):
+            if index == 2:
+                raise ConnectionError(f"chunk {index} unreachable")
+            return b"x"
+
+        with self.assertRaisesRegex(ConnectionError, "chunk 2 unreachable"):
+            self.synthesizer.synthesize(TEXT, synthesize, MAX_CHARS)
+        stats = self.synthesizer.stats()
+        self.assertEqual((stats["retries"], stats["failures"]), (2, 1))
+
+    def test_short_text_is_one_call_and_empty_text_an_error(self):
+        calls = []
+        audio = self.synthesizer.synthesize("Hello.", lambda chunk, index: calls.append(chunk) or b"hi", MAX_CHARS)
+        self.assertEqual((audio, calls), (b"hi", ["Hello."]))
+        with self.assertRaises(ValueError):
+            self.synthesizer.synthesize("   ", lambda chunk, index: b"", MAX_CHARS)
+
+
+if __name__ == "__main__":
+    unittest.main()
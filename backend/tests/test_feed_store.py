@@ -0,0 +1,245 @@
+"""FeedPoller and FeedStore against a local HTTP server serving fixture feeds"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_store import FeedStore, FeedPoller, CircuitBreaker, stable_entry_id
+from feed_stream import parse_feed
+from shared_state import SharedState
+
+LAST_MODIFIED = "Mon, 06 Jan 2025 10:00:00 GMT"
+
+
+def rss(*entries):
+    """RSS 2.0 feed with (title, guid) entries; a guid of None leaves it out"""
+    items = "".join(
+        f"<item><title>{title}</title>{f'<guid>{guid}</guid>' if guid else ''}</item>" for title, guid in entries
+    )
+    return f"<rss><channel><title>Fixture</title>{items}</channel></rss>".encode()
+
+
+class FixtureFeeds(BaseHTTPRequestHandler):
+    """Serves server.feeds[path] = (status, body, etag), honouring If-None-Match"""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        status, body, etag = self.server.feeds.get(self.path, (404, b"", None))
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_items(url, stream):
+    return [{"id": stable_entry_id(url, entry), "title": entry.get("title"), "publishedAt": entry.get("published")}
+            for entry in parse_feed(stream).entries]
+
+
+class FeedPollerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureFeeds)
+        self.server.feeds = {}
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.store = FeedStore()
+        self.published = []
+        self.store.add_listener(lambda url, items, tracked: self.published.append((url, items, tracked)))
+        self.poller = FeedPoller(self.store, parse_items, timeout=5, workers=2)
+
+    def tearDown(self):
+        self.poller.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def headers_sent(self, path):
+        return [headers for requested, headers in self.server.requests if requested == path]
+
+
+class FeedPollerTest(FeedPollerTestCase):
+    def test_conditional_get_and_not_modified(self):
+        self.server.feeds["/feed"] = (200, rss(("One", "g1"), ("Two", "g2")), '"v1"')
+        url = self.url("/feed")
+        self.store.track(url)
+
+        self.assertTrue(self.poller.poll(url))
+        state = self.store.state(url)
+        self.assertEqual(state.etag, '"v1"')
+        self.assertEqual(state.last_modified, LAST_MODIFIED)
+        self.assertEqual([item["title"] for item in self.store.items(url)], ["One", "Two"])
+
+        self.assertTrue(self.poller.poll(url))
+        second = self.headers_sent("/feed")[1]
+        self.assertEqual(second["If-None-Match"], '"v1"')
+        self.assertEqual(second["If-Modified-Since"], LAST_MODIFIED)
+        self.assertEqual(self.store.state(url).not_modified_count, 1)
+        self.assertEqual(len(self.store.items(url)), 2)
+        # A 304 has nothing new for the listeners
+        self.assertEqual(len(self.published), 1)
+
+    def test_ids_are_stable_across_polls_and_feeds(self):
+        first, second = self.url("/first"), self.url("/second")
+        self.server.feeds["/first"] = (200, rss(("Shared", "g1"), ("Untitled guid", None)), '"v1"')
+        self.server.feeds["/second"] = (200, rss(("Shared elsewhere", "g1"), ("Untitled guid", None)), None)
+        for url in (first, second):
+            self.store.track(url)
+            self.assertTrue(self.poller.poll(url))
+        before = [item["id"] for item in self.store.items(first)]
+
+        self.server.feeds["/first"] = (200, rss(("New", "g0"), ("Shared", "g1"), ("Untitled guid", None)), '"v2"')
+        self.assertTrue(self.poller.poll(first))
+        after = [item["id"] for item in self.store.items(first)]
+        self.assertEqual(after[1:], before)
+
+        other = [item["id"] for item in self.store.items(second)]
+        # The same GUID is the same story in every feed; title-only entries are scoped to their feed
+        self.assertEqual(other[0], before[0])
+        self.assertNotEqual(other[1], before[1])
+
+    def test_untracked_feed_is_published_without_being_tracked(self):
+        self.server.feeds["/client"] = (200, rss(("Client story", "c1")), '"v1"')
+        url = self.url("/client")
+
+        self.assertTrue(self.poller.poll(url))
+        self.assertTrue(self.poller.poll(url))
+        self.assertIsNone(self.store.state(url))
+        self.assertNotIn(url, self.store.urls())
+        self.assertEqual([(published_url, tracked) for published_url, _, tracked in self.published],
+                         [(url, False), (url, False)])
+        # No validators are kept, so both requests are unconditional, and no breaker is created
+        self.assertTrue(all("If-None-Match" not in headers for headers in self.headers_sent("/client")))
+        self.assertNotIn(url, self.poller.breaker_status())
+
+    def test_submit_fetches_each_feed_once_at_a_time(self):
+        self.server.feeds["/feed"] = (200, rss(("One", "g1")), None)
+        url = self.url("/feed")
+        self.store.track(url)
+        futures = self.poller.submit([url, url])
+        self.poller.wait(timeout=5)
+        self.assertEqual(set(futures.values()), {url})
+        self.assertEqual(len(self.headers_sent("/feed")), 1)
+        self.assertTrue(self.store.has_items(url))
+
+
+class CircuitBreakerTest(FeedPollerTestCase):
+    def test_breaker_trips_after_repeated_failures_and_recovers(self):
+        self.server.feeds["/flaky"] = (500, b"", None)
+        url = self.url("/flaky")
+        self.store.track(url)
+        breaker = self.poller._breakers[url] = CircuitBreaker(threshold=2, cooldown=0.2)
+
+        self.assertFalse(self.poller.poll(url))
+        self.assertEqual(breaker.state, "closed")
+        self.assertFalse(self.poller.poll(url))
+        self.assertEqual(self.poller.breaker_status()[url], {"state": "open", "failures": 2})
+
+        # While open the feed isn't requested at all
+        self.assertFalse(self.poller.poll(url))
+        self.assertEqual(len(self.headers_sent("/flaky")), 2)
+        self.assertIsNotNone(self.store.state(url).error)
+
+        time.sleep(0.25)
+        self.assertEqual(breaker.state, "half-open")
+        self.server.feeds["/flaky"] = (200, rss(("Back", "b1")), None)
+        self.assertTrue(self.poller.poll(url))
+        self.assertEqual(self.poller.breaker_status()[url], {"state": "closed", "failures": 0})
+        self.assertEqual([item["title"] for item in self.store.items(url)], ["Back"])
+
+    def test_failed_trial_reopens_the_breaker(self):
+        self.server.feeds["/down"] = (503, b"", None)
+        url = self.url("/down")
+        self.store.track(url)
+        breaker = self.poller._breakers[url] = CircuitBreaker(threshold=1, cooldown=0.1)
+
+        self.assertFalse(self.poller.poll(url))
+        time.sleep(0.15)
+        # Only one trial request goes through while half-open
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(self.poller.poll(url))
+        self.assertEqual(len(self.headers_sent("/down")), 1)
+
+
+class SharedFeedsTest(FeedPollerTestCase):
+    """Two stores and pollers sharing one SharedState, as two gunicorn workers do"""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.shared = SharedState(os.path.join(self.directory, "shared.db"))
+        self.store.shared = self.shared
+        self.poller.shared = self.shared
+        self.other_store = FeedStore(shared=self.shared)
+        self.other_published = []
+        self.other_store.add_listener(lambda url, items, tracked: self.other_published.append(items))
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_undated_entries_keep_the_date_they_were_first_seen(self):
+        self.server.feeds["/feed"] = (200, rss(("Undated", "u1")), None)
+        url = self.url("/feed")
+        self.store.track(url)
+        self.assertTrue(self.poller.poll(url))
+        first = self.store.items(url)[0]["publishedAt"]
+        self.assertTrue(first)
+
+        time.sleep(0.01)
+        self.server.feeds["/feed"] = (200, rss(("Newer undated", "u2"), ("Undated", "u1")), None)
+        self.assertTrue(self.poller.poll(url))
+        newer, same = self.store.items(url)
+        self.assertEqual(same["publishedAt"], first)
+        self.assertGreater(newer["publishedAt"], first)
+
+    def test_other_store_syncs_the_published_feed(self):
+        self.server.feeds["/feed"] = (200, rss(("Undated", "u1"), ("Other", "u2")), '"v1"')
+        url = self.url("/feed")
+        self.store.track(url)
+        self.other_store.track(url)
+        self.assertTrue(self.poller.poll(url))
+
+        self.assertEqual(self.other_store.sync(), 1)
+        self.assertEqual(self.other_store.items(url), self.store.items(url))
+        self.assertEqual(self.other_store.state(url).etag, '"v1"')
+        self.assertEqual(len(self.other_published), 1)
+        # Nothing new the second time
+        self.assertEqual(self.other_store.sync(), 0)
+        # Only one request reached the feed server
+        self.assertEqual(len(self.headers_sent("/feed")), 1)
+
+    def test_only_the_lease_holder_polls(self):
+        self.assertTrue(self.shared.claim("leases", "feed_poller", "someone-else", ttl=0.2))
+        self.assertFalse(self.poller._lead())
+        time.sleep(0.25)
+        self.assertTrue(self.poller._lead())
+        self.assertFalse(self.shared.claim("leases", "feed_poller", "someone-else", ttl=0.2))
+        # The holder renews its own lease
+        self.assertTrue(self.poller._lead())
+
+
+if __name__ == "__main__":
+    unittest.main()
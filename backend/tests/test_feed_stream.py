@@ -0,0 +1,121 @@
+"""Incremental parsing of RSS 2.0, RSS 1.0 and Atom feeds"""
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_stream import FeedEntry, parse_feed, html_to_text
+
+RSS2 = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Daily Wire</title>
+<item><title>First story</title><link>https://example.com/1</link><guid>story-1</guid>
+<description>&lt;p&gt;Markets &lt;b&gt;rallied&lt;/b&gt; today.&lt;/p&gt;&lt;script&gt;track()&lt;/script&gt;&lt;p&gt;More soon &amp;amp; later.&lt;/p&gt;</description>
+<pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate><category>Business</category></item>
+<item><title>Second story</title><link>https://example.com/2</link>
+<description><![CDATA[<div>Plain <i>CDATA</i> summary</div>]]></description></item>
+</channel></rss>"""
+
+RSS1 = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel rdf:about="https://example.com/"><title>RDF Times</title></channel>
+<item rdf:about="https://example.com/a"><title>RDF story</title><link>https://example.com/a</link>
+<description>An RDF summary</description><dc:date>2025-01-06T10:00:00Z</dc:date><dc:subject>Science</dc:subject></item>
+</rdf:RDF>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom Post</title>
+<entry><title>Atom story</title><id>urn:atom:1</id>
+<link rel="enclosure" href="https://example.com/audio.mp3"/><link href="https://example.com/atom/1"/>
+<summary type="html">&lt;p&gt;Short&lt;/p&gt;</summary>
+<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>Long content</p></div></content>
+<updated>2025-01-05T09:00:00Z</updated><published>2025-01-06T10:00:00Z</published>
+<category term="Technology"/></entry>
+</feed>"""
+
+
+def rss_with_items(count):
+    items = "".join(f"<item><title>Story {i}</title><guid>id-{i}</guid><description>Text {i}</description></item>"
+                    for i in range(count))
+    return f"<rss><channel><title>Many</title>{items}</channel></rss>".encode()
+
+
+class CountingStream(io.RawIOBase):
+    """Binary stream that records how many bytes were read from it"""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._data.read(min(len(buffer), 1024))
+        buffer[:len(data)] = data
+        self.bytes_read += len(data)
+        return len(data)
+
+
+class ParseFeedTest(unittest.TestCase):
+    def test_rss2_entries_are_plain_text(self):
+        feed = parse_feed(RSS2)
+        self.assertEqual(feed.title, "Daily Wire")
+        first, second = feed.entries
+        self.assertEqual(first.get("title"), "First story")
+        self.assertEqual(first.get("link"), "https://example.com/1")
+        self.assertEqual(first.id, "story-1")
+        self.assertEqual(first.get("description"), "Markets rallied today. More soon & later.")
+        self.assertEqual(first.get("pubDate"), "Mon, 06 Jan 2025 10:00:00 GMT")
+        self.assertEqual(first.category, "Business")
+        self.assertEqual(second.get("summary"), "Plain CDATA summary")
+        self.assertIsNone(second.id)
+
+    def test_rss1_rdf(self):
+        feed = parse_feed(RSS1)
+        self.assertEqual(feed.title, "RDF Times")
+        (entry,) = feed.entries
+        self.assertEqual(entry.get("title"), "RDF story")
+        self.assertEqual(entry.get("summary"), "An RDF summary")
+        self.assertEqual(entry.get("published"), "2025-01-06T10:00:00Z")
+        self.assertEqual(entry.tags, [{"term": "Science"}])
+
+    def test_atom_prefers_alternate_link_summary_and_published(self):
+        feed = parse_feed(ATOM)
+        self.assertEqual(feed.title, "Atom Post")
+        (entry,) = feed.entries
+        self.assertEqual(entry.get("link"), "https://example.com/atom/1")
+        self.assertEqual(entry.id, "urn:atom:1")
+        self.assertEqual(entry.get("summary"), "Short")
+        self.assertEqual(entry.get("published"), "2025-01-06T10:00:00Z")
+        self.assertEqual(entry.category, "Technology")
+
+    def test_max_items_stops_reading_the_stream(self):
+        body = rss_with_items(2000)
+        stream = CountingStream(body)
+        feed = parse_feed(stream, max_items=5)
+        self.assertEqual([entry.get("title") for entry in feed.entries], [f"Story {i}" for i in range(5)])
+        self.assertLess(stream.bytes_read, len(body) // 10)
+
+    def test_malformed_feed_falls_back_to_feedparser(self):
+        # Unescaped HTML with an unclosed <br> isn't well-formed XML
+        body = RSS2.replace(
+            b"<![CDATA[<div>Plain <i>CDATA</i> summary</div>]]>", b"Plain<br>unescaped <i>HTML</i>")
+        for source in (body, CountingStream(body)):
+            feed = parse_feed(source)
+            self.assertNotIsInstance(feed.entries[0], FeedEntry)
+            self.assertEqual(feed.title, "Daily Wire")
+            self.assertEqual([entry.get("title") for entry in feed.entries], ["First story", "Second story"])
+            self.assertEqual(feed.entries[0].get("summary"), "Markets rallied today. More soon & later.")
+            self.assertEqual(feed.entries[1].get("description"), "Plain unescaped HTML")
+
+    def test_html_to_text_leaves_plain_text_alone(self):
+        self.assertEqual(html_to_text("  Rates  rise\n again "), "Rates rise again")
+        self.assertEqual(html_to_text("a<br/>b &lt; c"), "a b < c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Stage timing, Prometheus rendering and request profiles"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsRegistry, ProfileStore, SamplingProfiler, timed, stage_duration, stage_errors
+
+
+def sample(metric, name, **labels):
+    """Value of one sample of a metric, or None"""
+    for sample_name, sample_labels, value in metric.samples():
+        if sample_name == name and all(dict(sample_labels).get(k) == v for k, v in labels.items()):
+            return value
+    return None
+
+
+class TimedTest(unittest.TestCase):
+    def test_context_manager_records_duration(self):
+        with timed("test_context"):
+            time.sleep(0.02)
+        self.assertEqual(sample(stage_duration, "breeze_stage_duration_seconds_count", stage="test_context"), 1)
+        self.assertGreaterEqual(sample(stage_duration, "breeze_stage_duration_seconds_sum", stage="test_context"), 0.02)
+        self.assertIsNone(sample(stage_errors, "breeze_stage_errors_total", stage="test_context"))
+
+    def test_decorator_counts_errors_and_reraises(self):
+        @timed("test_decorator")
+        def fail(message):
+            raise RuntimeError(message)
+
+        self.assertEqual(fail.__name__, "fail")
+        for _ in range(2):
+            with self.assertRaisesRegex(RuntimeError, "boom"):
+                fail("boom")
+        self.assertEqual(sample(stage_duration, "breeze_stage_duration_seconds_count", stage="test_decorator"), 2)
+        self.assertEqual(sample(stage_errors, "breeze_stage_errors_total", stage="test_decorator"), 2)
+
+
+class RenderTest(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry(prefix="t_")
+        histogram = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, route="/a")
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE t_latency_seconds histogram", lines)
+        self.assertIn('t_latency_seconds_bucket{route="/a",le="0.1"} 1', lines)
+        self.assertIn('t_latency_seconds_bucket{route="/a",le="1"} 2', lines)
+        self.assertIn('t_latency_seconds_bucket{route="/a",le="+Inf"} 3', lines)
+        self.assertIn('t_latency_seconds_count{route="/a"} 3', lines)
+
+    def test_registering_twice_returns_the_same_metric(self):
+        registry = MetricsRegistry(prefix="t_")
+        self.assertIs(registry.counter("hits_total", "Hits"), registry.counter("hits_total", "Hits"))
+
+    def test_collectors_become_gauges_and_failures_are_reported(self):
+        registry = MetricsRegistry(prefix="t_")
+        registry.add_collector(lambda: [("queue_depth", "Jobs waiting", {"queue": 'a"b'}, 3),
+                                        ("unknown", "Skipped", {}, None)])
+
+        def broken():
+            raise RuntimeError("down")
+
+        registry.add_collector(broken)
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE t_queue_depth gauge", lines)
+        self.assertIn('t_queue_depth{queue="a\\"b"} 3', lines)
+        self.assertFalse(any(line.startswith("t_unknown") for line in lines))
+        self.assertIn("# collector broken failed: down", lines)
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_profile_of_a_busy_thread(self):
+        done = threading.Event()
+
+        def busy_loop():
+            while not done.is_set():
+                sum(range(1000))
+
+        thread = threading.Thread(target=busy_loop)
+        thread.start()
+        profiler = SamplingProfiler(thread.ident, interval=0.001).start()
+        time.sleep(0.05)
+        profiler.stop()
+        done.set()
+        thread.join()
+
+        self.assertGreater(profiler.samples, 0)
+        self.assertIn("test_metrics.py:busy_loop", profiler.folded())
+
+        store = ProfileStore(size=1)
+        first = store.add("GET /a", profiler, 0.05)
+        second = store.add("GET /b", profiler, 0.05)
+        self.assertIsNone(store.get(first))
+        self.assertEqual(store.get(second)["request"], "GET /b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Ordering, deduplication, eviction and cursors of the merged news index"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_index import NewsIndex, InvalidCursor, decode_cursor, encode_cursor
+
+TRACKED = "https://tracked.example.com/rss"
+UNTRACKED = "https://client.example.com/rss"
+
+
+def news_items(prefix, count, day=1):
+    """count items with distinct titles, published an hour apart starting on the given day"""
+    return [
+        {"id": f"{prefix}-{i}", "title": f"{prefix} story number {i} unique{prefix}{i}",
+         "publishedAt": f"2025-01-{day:02d}T{i:02d}:00:00+00:00"}
+        for i in range(count)
+    ]
+
+
+def ids(items):
+    return [item["id"] for item in items]
+
+
+class PaginationTest(unittest.TestCase):
+    def test_pages_are_newest_first_and_cover_every_item(self):
+        index = NewsIndex()
+        index.add(TRACKED, news_items("a", 7))
+        first, cursor = index.page(3)
+        second, cursor = index.page(3, cursor=cursor)
+        third, cursor = index.page(3, cursor=cursor)
+        self.assertEqual(ids(first + second + third), [f"a-{i}" for i in range(6, -1, -1)])
+        self.assertIsNone(cursor)
+
+    def test_cursor_survives_newer_items_arriving_between_pages(self):
+        index = NewsIndex()
+        index.add(TRACKED, news_items("a", 6))
+        first, cursor = index.page(3)
+        # Newer stories land before the second page is fetched
+        index.add(TRACKED, news_items("b", 4, day=2))
+        second, cursor = index.page(3, cursor=cursor)
+        self.assertEqual(ids(first), ["a-5", "a-4", "a-3"])
+        self.assertEqual(ids(second), ["a-2", "a-1", "a-0"])
+        self.assertIsNone(cursor)
+        # A fresh first page shows the new stories
+        self.assertEqual(ids(index.page(2)[0]), ["b-3", "b-2"])
+
+    def test_cursor_survives_the_item_it_names_being_evicted(self):
+        index = NewsIndex(max_items=4)
+        index.add(TRACKED, news_items("a", 4))
+        _, cursor = index.page(3)
+        index.add(TRACKED, news_items("b", 3, day=2))
+        # Only a-3 is left of the old items, and the cursor pointed past it
+        self.assertEqual(index.page(3, cursor=cursor), ([], None))
+
+    def test_invalid_or_tampered_cursor_is_rejected(self):
+        index = NewsIndex()
+        index.add(TRACKED, news_items("a", 3))
+        _, cursor = index.page(1)
+        self.assertEqual(decode_cursor(cursor)[1], "a-2")
+        for bad in ("not a cursor!", cursor[:-3], encode_cursor(["a-2"]), encode_cursor(["soon", "a-2"]),
+                    encode_cursor([float("nan"), "a-2"]), encode_cursor([-1.0, 7])):
+            with self.assertRaises(InvalidCursor, msg=bad):
+                index.page(1, cursor=bad)
+
+    def test_feeds_filter_and_offset(self):
+        index = NewsIndex()
+        index.add(TRACKED, news_items("a", 3))
+        index.add(UNTRACKED, news_items("b", 3, day=2), tracked=False)
+        self.assertEqual(ids(index.page(10, feeds=[TRACKED])[0]), ["a-2", "a-1", "a-0"])
+        self.assertEqual(ids(index.page(2, offset=2)[0]), ["b-0", "a-2"])
+
+
+class DedupeAndEvictionTest(unittest.TestCase):
+    def test_near_duplicate_titles_from_other_feeds_are_collapsed(self):
+        index = NewsIndex(similarity=0.8)
+        index.add(TRACKED, [{"id": "x", "title": "Storm closes schools across the north east",
+                             "publishedAt": "2025-01-02T10:00:00+00:00"}])
+        added = index.add(UNTRACKED, [
+            # Same significant words; stopwords and case don't count
+            {"id": "y", "title": "STORM closes the schools across north east", "publishedAt": "2025-01-02T11:00:00+00:00"},
+            # 5 of 7 words shared: Jaccard 5/8 is below the threshold
+            {"id": "z", "title": "Storm closes schools across the north coast roads",
+             "publishedAt": "2025-01-02T12:00:00+00:00"},
+        ], tracked=False)
+        self.assertEqual(added, 1)
+        self.assertEqual(ids(index.page(10)[0]), ["z", "x"])
+        self.assertEqual(index.stats()["duplicates"], 1)
+
+    def test_readding_an_item_refreshes_it_in_place(self):
+        index = NewsIndex()
+        index.add(TRACKED, news_items("a", 2))
+        changed = dict(news_items("a", 2)[1], summary="Updated", publishedAt="2030-01-01T00:00:00+00:00")
+        self.assertEqual(index.add(TRACKED, [changed]), 0)
+        items, _ = index.page(10)
+        self.assertEqual(ids(items), ["a-1", "a-0"])
+        self.assertEqual(items[0]["summary"], "Updated")
+
+    def test_oldest_items_are_evicted_past_the_cap(self):
+        index = NewsIndex(max_items=5)
+        index.add(TRACKED, news_items("a", 4))
+        index.add(TRACKED, news_items("b", 3, day=2))
+        self.assertEqual(index.count(), 5)
+        self.assertEqual(ids(index.page(10)[0]), ["b-2", "b-1", "b-0", "a-3", "a-2"])
+        self.assertEqual(index.stats()["evicted"], 2)
+        # An evicted item that comes back is still the oldest, so it goes straight out again
+        index.add(TRACKED, news_items("a", 1))
+        self.assertEqual(ids(index.page(10)[0]), ["b-2", "b-1", "b-0", "a-3", "a-2"])
+
+
+class UntrackedFeedTest(unittest.TestCase):
+    def test_untracked_items_only_push_out_each_other(self):
+        index = NewsIndex(max_items=5, untracked_max_items=3)
+        index.add(TRACKED, news_items("tracked", 5, day=1))
+        # Newer than every tracked item, and more of them than the untracked cap
+        index.add(UNTRACKED, news_items("client", 10, day=2), tracked=False)
+        self.assertEqual(index.count([TRACKED]), 5)
+        self.assertEqual(index.count([UNTRACKED]), 3)
+        items, _ = index.page(10, feeds=[UNTRACKED])
+        self.assertEqual([item["id"] for item in items], ["client-9", "client-8", "client-7"])
+        self.assertEqual(index.stats()["untrackedItems"], 3)
+
+    def test_untracked_feed_goes_stale_after_its_ttl(self):
+        index = NewsIndex(untracked_ttl=0.05)
+        self.assertTrue(index.is_stale(UNTRACKED))
+        index.add(UNTRACKED, news_items("client", 2), tracked=False)
+        self.assertFalse(index.is_stale(UNTRACKED))
+        time.sleep(0.06)
+        self.assertTrue(index.is_stale(UNTRACKED))
+        # A refresh with nothing new still counts
+        index.add(UNTRACKED, news_items("client", 2), tracked=False)
+        self.assertFalse(index.is_stale(UNTRACKED))
+
+
+class NewsApiCursorTest(unittest.TestCase):
+    def setUp(self):
+        import app
+        self.app = app
+        # Enough items from the default feed that nothing is fetched
+        app.news_index.add(app.DEFAULT_FEEDS[0], news_items("a", 20))
+        self.client = app.app.test_client()
+
+    def tearDown(self):
+        self.app.news_index.clear()
+
+    def test_bad_cursor_is_a_400(self):
+        for bad in ("garbage!", encode_cursor(["soon", "a-2"])):
+            response = self.client.get("/api/news", query_string={"cursor": bad, "max_items": 5})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Invalid cursor", response.get_json()["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
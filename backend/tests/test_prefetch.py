@@ -0,0 +1,97 @@
+"""Prefetch rate limiting, back-off and cancellation"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prefetch import Prefetcher, TokenBucket
+from synthesis_jobs import QueueFull
+
+
+class FakeJob:
+    def __init__(self, job_id):
+        self.id = job_id
+
+
+class FakeJobQueue:
+    """Records submissions; jobs stay queued until cancelled"""
+
+    def __init__(self, max_queue=100, depth=0):
+        self.max_queue = max_queue
+        self.depth = depth
+        self.submitted = []
+        self.cancelled = []
+
+    def submit(self, params, priority):
+        if self.depth >= self.max_queue:
+            raise QueueFull("full")
+        self.depth += 1
+        self.submitted.append((params["text"], params["voice_id"], priority))
+        return FakeJob(f"job-{len(self.submitted)}")
+
+    def cancel(self, job_id):
+        self.cancelled.append(job_id)
+        self.depth -= 1
+        return True
+
+    def stats(self):
+        return {"queueDepth": self.depth, "maxQueue": self.max_queue}
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_refill_at_the_rate(self):
+        bucket = TokenBucket(rate=20, burst=2)
+        self.assertEqual([bucket.take() for _ in range(3)], [True, True, False])
+        time.sleep(0.06)
+        self.assertTrue(bucket.take())
+        self.assertFalse(bucket.take())
+
+    def test_tokens_never_build_up_past_the_burst(self):
+        bucket = TokenBucket(rate=100, burst=2)
+        # Long enough for five tokens at this rate
+        time.sleep(0.05)
+        self.assertEqual([bucket.take() for _ in range(3)], [True, True, False])
+
+
+class PrefetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.queue = FakeJobQueue()
+        self.cached = set()
+        self.prefetcher = Prefetcher(self.queue, lambda text, voice: text in self.cached, priority=10,
+                                     top_n=3, rate=0, burst=10)
+
+    def test_top_items_are_queued_in_the_last_voice_used(self):
+        self.prefetcher.record_voice("client", "voice1")
+        self.cached.add("b")
+        self.assertEqual(self.prefetcher.schedule("client", ["a", "b", "c", "d"]), 2)
+        self.assertEqual(self.queue.submitted, [("a", "voice1", 10), ("c", "voice1", 10)])
+        self.assertEqual(self.prefetcher.stats()["alreadyCached"], 1)
+
+    def test_nothing_is_queued_without_a_voice(self):
+        self.assertEqual(self.prefetcher.schedule("client", ["a"]), 0)
+        self.assertEqual(self.queue.submitted, [])
+
+    def test_rate_limit_stops_the_page(self):
+        prefetcher = Prefetcher(self.queue, lambda text, voice: False, priority=10, top_n=3, rate=0, burst=1)
+        self.assertEqual(prefetcher.schedule("client", ["a", "b", "c"], voice_id="voice1"), 1)
+        self.assertEqual(prefetcher.schedule("other", ["d"], voice_id="voice1"), 0)
+        self.assertEqual(prefetcher.stats()["rateLimited"], 2)
+
+    def test_busy_queue_is_left_alone(self):
+        self.queue.depth = 50
+        self.assertEqual(self.prefetcher.schedule("client", ["a"], voice_id="voice1"), 0)
+        self.assertEqual(self.prefetcher.stats()["skippedBusy"], 1)
+
+    def test_moving_to_another_page_cancels_unstarted_prefetches(self):
+        self.prefetcher.schedule("client", ["a", "b"], voice_id="voice1")
+        self.prefetcher.schedule("client", ["c"], voice_id="voice1")
+        self.assertEqual(self.queue.cancelled, ["job-1", "job-2"])
+        self.assertEqual(self.prefetcher.cancel("client"), 1)
+        self.assertEqual(self.prefetcher.stats()["cancelled"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Resumable import of voice samples, name collisions and link fallbacks"""
+
+import io
+import os
+import sys
+import errno
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from setup_voices import VoiceImporter, place_file, setup_voice_samples
+from voice_catalog import MANIFEST_NAME, read_manifest
+
+
+class SetupVoicesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, "source")
+        self.target = os.path.join(self.directory, "voice_samples")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def add(self, relative, content=b"audio"):
+        path = os.path.join(self.source, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def run_import(self, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return setup_voice_samples(self.source, self.target, workers=2, **kwargs)
+
+    def test_second_run_skips_unchanged_files(self):
+        self.add("a/one.mp3")
+        self.add("b/two.wav")
+        self.add("b/notes.txt")
+        self.assertEqual(self.run_import()["imported"], 2)
+        self.assertEqual(sorted(os.listdir(self.target)), sorted([MANIFEST_NAME, "one.mp3", "two.wav"]))
+
+        counts = self.run_import()
+        self.assertEqual((counts["imported"], counts["skipped"]), (0, 2))
+
+        # A changed source is imported again
+        self.add("a/one.mp3", b"new audio")
+        counts = self.run_import()
+        self.assertEqual((counts["imported"], counts["skipped"]), (1, 1))
+        with open(os.path.join(self.target, "one.mp3"), "rb") as f:
+            self.assertEqual(f.read(), b"new audio")
+
+    def test_symlinked_samples_are_skipped_on_resume(self):
+        self.add("one.mp3")
+        self.run_import(mode="symlink")
+        self.assertTrue(os.path.islink(os.path.join(self.target, "one.mp3")))
+        self.assertEqual(self.run_import(mode="symlink")["skipped"], 1)
+
+    def test_same_name_from_another_source_gets_a_stable_suffix(self):
+        first = self.add("a/voice.mp3", b"first")
+        self.add("b/voice.mp3", b"second")
+        self.run_import()
+        names = sorted(name for name in os.listdir(self.target) if name.endswith(".mp3"))
+        self.assertEqual(len(names), 2)
+        self.assertIn("voice.mp3", names)
+
+        # The manifest records who owns each name, so a rerun keeps them apart
+        sources = {sample["file"]: sample["source"] for sample in read_manifest(self.target)}
+        self.assertEqual(sources["voice.mp3"], first)
+        counts = self.run_import()
+        self.assertEqual((counts["imported"], counts["skipped"]), (0, 2))
+        self.assertEqual(sorted(name for name in os.listdir(self.target) if name.endswith(".mp3")), names)
+
+    def test_files_already_in_the_target_are_not_overwritten(self):
+        os.makedirs(self.target)
+        with open(os.path.join(self.target, "voice.mp3"), "wb") as f:
+            f.write(b"recorded by hand")
+        self.add("voice.mp3", b"imported")
+        self.run_import()
+        with open(os.path.join(self.target, "voice.mp3"), "rb") as f:
+            self.assertEqual(f.read(), b"recorded by hand")
+        self.assertEqual(len([name for name in os.listdir(self.target) if name.endswith(".mp3")]), 2)
+
+    def test_links_fall_back_to_a_copy_where_unsupported(self):
+        self.add("one.mp3")
+        with mock.patch("os.link", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            counts = self.run_import(mode="hardlink")
+        self.assertEqual((counts["imported"], counts["copiedInstead"], counts["failed"]), (1, 1, 0))
+        target = os.path.join(self.target, "one.mp3")
+        self.assertFalse(os.path.samefile(os.path.join(self.source, "one.mp3"), target))
+        self.assertEqual([name for name in os.listdir(self.target) if name.endswith(".part")], [])
+
+    def test_other_link_errors_are_raised(self):
+        source = self.add("one.mp3")
+        os.makedirs(self.target)
+        target = os.path.join(self.target, "one.mp3")
+        with mock.patch("os.link", side_effect=OSError(errno.EACCES, "Permission denied")):
+            with self.assertRaises(OSError):
+                place_file(source, target, "hardlink")
+        self.assertEqual(os.listdir(self.target), [])
+
+    def test_max_files_limits_the_import(self):
+        for i in range(5):
+            self.add(f"voice_{i}.mp3")
+        with redirect_stdout(io.StringIO()):
+            found = VoiceImporter(self.target, workers=2).run(self.source, max_files=3)
+        self.assertEqual(found, 3)
+        self.assertEqual(len(read_manifest(self.target)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
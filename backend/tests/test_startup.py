@@ -0,0 +1,85 @@
+"""Deferred imports and startup timing"""
+
+import os
+import sys
+import shutil
+import tempfile
+import importlib
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from startup import LazyModule, StartupReport, lazy_import, warm_up, startup
+
+
+class LazyModuleTest(unittest.TestCase):
+    def setUp(self):
+        # A throwaway module, so the test knows it hasn't been imported yet
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, "lazy_target.py"), "w") as f:
+            f.write("VALUE = 42\n")
+        sys.path.insert(0, self.directory)
+        self.report = StartupReport()
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        sys.modules.pop("lazy_target", None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_module_is_imported_on_first_attribute_access(self):
+        module = LazyModule("lazy_target", self.report)
+        self.assertFalse(module.loaded)
+        self.assertNotIn("lazy_target", sys.modules)
+        self.assertIn("not loaded", repr(module))
+
+        self.assertEqual(module.VALUE, 42)
+        self.assertTrue(module.loaded)
+        self.assertIs(module.load(), sys.modules["lazy_target"])
+        self.assertIn("import", self.report.report()["components"]["lazy_target"])
+
+    def test_failed_import_raises_on_use_and_can_be_retried(self):
+        module = LazyModule("lazy_missing", self.report)
+        with self.assertRaises(ImportError):
+            module.anything
+        self.assertFalse(module.loaded)
+
+        with open(os.path.join(self.directory, "lazy_missing.py"), "w") as f:
+            f.write("VALUE = 7\n")
+        importlib.invalidate_caches()
+        try:
+            self.assertEqual(module.VALUE, 7)
+        finally:
+            sys.modules.pop("lazy_missing", None)
+
+    def test_lazy_import_shares_one_proxy_per_name(self):
+        self.assertIs(lazy_import("lazy_target"), lazy_import("lazy_target"))
+
+
+class StartupReportTest(unittest.TestCase):
+    def test_summary_lists_the_slowest_components_first(self):
+        report = StartupReport()
+        report.record("flask", "import", 0.2)
+        report.record("models", "import", 1.0)
+        report.record("models", "init", 0.5)
+        report.record("idle", "import", 0)
+        report.record("engine", "warmup", 3.0)
+        self.assertEqual(report.summary(), "models 1.50s, flask 0.20s")
+        self.assertIsNone(report.report()["readySeconds"])
+        report.mark_ready()
+        self.assertIsNotNone(report.report()["readySeconds"])
+
+    def test_warm_up_failures_dont_stop_later_tasks(self):
+        ran = []
+
+        def failing():
+            raise RuntimeError("no model")
+
+        warm_up([("test_failing", failing), ("test_working", lambda: ran.append(True))])
+        self.assertEqual(ran, [True])
+        components = startup.report()["components"]
+        self.assertIn("warmup", components["test_failing"])
+        self.assertIn("warmup", components["test_working"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Summary cache keys and the memory/SQLite tiers"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summary_cache import SummaryCache, summary_key
+
+PARAMS = {"max_length": 60, "min_length": 15, "do_sample": False}
+
+
+class SummaryKeyTest(unittest.TestCase):
+    def test_key_changes_with_model_and_parameters(self):
+        key = summary_key("Title", "Text", "model-a", PARAMS)
+        self.assertEqual(key, summary_key("Title", "Text", "model-a", dict(reversed(list(PARAMS.items())))))
+        self.assertNotEqual(key, summary_key("Title", "Text", "model-b", PARAMS))
+        self.assertNotEqual(key, summary_key("Title", "Text", "model-a", dict(PARAMS, max_length=80)))
+        self.assertNotEqual(key, summary_key("Title", "Text.", "model-a", PARAMS))
+        self.assertNotEqual(key, summary_key("Title.", "Text", "model-a", PARAMS))
+
+    def test_fields_cannot_run_into_each_other(self):
+        self.assertNotEqual(summary_key("ab", "c", "m", PARAMS), summary_key("a", "bc", "m", PARAMS))
+
+
+class SummaryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "summaries.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_summary_from_another_model_is_a_miss(self):
+        cache = SummaryCache(self.path)
+        old = summary_key("Title", "Text", "model-a", PARAMS)
+        cache.put_many({old: "Old summary"})
+        new = summary_key("Title", "Text", "model-b", PARAMS)
+        self.assertEqual(cache.get_many([old, new]), {old: "Old summary"})
+        stats = cache.stats()
+        self.assertEqual((stats["memoryHits"], stats["misses"]), (1, 1))
+
+    def test_disk_tier_survives_a_restart(self):
+        key = summary_key("Title", "Text", "model-a", PARAMS)
+        SummaryCache(self.path).put_many({key: "Kept"})
+        restarted = SummaryCache(self.path)
+        self.assertEqual(restarted.get_many([key]), {key: "Kept"})
+        self.assertEqual(restarted.stats()["diskHits"], 1)
+        # Now in memory as well
+        restarted.get_many([key])
+        self.assertEqual(restarted.stats()["memoryHits"], 1)
+
+    def test_expired_summaries_are_misses(self):
+        cache = SummaryCache(self.path, ttl=1)
+        cache.put_many({"k": "Stale soon"})
+        time.sleep(1.1)
+        self.assertEqual(cache.get_many(["k"]), {})
+        self.assertEqual(SummaryCache(self.path, ttl=1).get_many(["k"]), {})
+
+    def test_memory_and_disk_tiers_are_bounded(self):
+        cache = SummaryCache(self.path, memory_items=2, disk_items=3)
+        for i in range(5):
+            cache.put_many({f"k{i}": f"s{i}"})
+        stats = cache.stats()
+        self.assertEqual((stats["memoryItems"], stats["diskItems"]), (2, 3))
+        self.assertEqual(SummaryCache(self.path).get_many([f"k{i}" for i in range(5)]),
+                         {"k2": "s2", "k3": "s3", "k4": "s4"})
+
+    def test_clear_empties_both_tiers(self):
+        cache = SummaryCache(self.path)
+        cache.put_many({"k": "s"})
+        cache.clear()
+        self.assertEqual(cache.get_many(["k"]), {})
+        self.assertEqual(cache.stats()["diskItems"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
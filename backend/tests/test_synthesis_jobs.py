@@ -0,0 +1,100 @@
+"""Priority order, bounded queue and cancellation of synthesis jobs"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthesis_jobs import JobQueue, QueueFull, PRIORITIES
+
+
+class BlockingHandler:
+    """Handler that records the order jobs run in and holds the first one until released"""
+
+    def __init__(self):
+        self.order = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, name):
+        self.order.append(name)
+        self.started.set()
+        self.release.wait(5)
+        return {"name": name}
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.handler = BlockingHandler()
+        self.queue = JobQueue(self.handler, workers=1, max_queue=3, retention=60)
+        # Occupy the only worker so later jobs wait in the queue
+        self.first = self.queue.submit({"name": "first"})
+        self.handler.started.wait(5)
+
+    def tearDown(self):
+        self.handler.release.set()
+
+    def test_higher_priority_runs_first_and_ties_keep_submission_order(self):
+        jobs = [
+            self.queue.submit({"name": "low"}, priority=PRIORITIES["low"]),
+            self.queue.submit({"name": "normal"}),
+            self.queue.submit({"name": "high"}, priority=PRIORITIES["high"]),
+        ]
+        self.handler.release.set()
+        for job in jobs:
+            self.assertEqual(self.queue.wait(job.id, 5).status, "done")
+        self.assertEqual(self.handler.order, ["first", "high", "normal", "low"])
+        self.assertEqual(jobs[0].result, {"name": "low"})
+
+    def test_full_queue_rejects_new_jobs(self):
+        for i in range(3):
+            self.queue.submit({"name": f"waiting-{i}"})
+        with self.assertRaises(QueueFull):
+            self.queue.submit({"name": "one too many"})
+        stats = self.queue.stats()
+        self.assertEqual((stats["queueDepth"], stats["running"], stats["rejected"]), (3, 1, 1))
+
+    def test_cancelled_job_frees_its_place_and_never_runs(self):
+        jobs = [self.queue.submit({"name": f"waiting-{i}"}) for i in range(3)]
+        self.assertTrue(self.queue.cancel(jobs[0].id))
+        # Already finished, so a second cancel has no effect
+        self.assertFalse(self.queue.cancel(jobs[0].id))
+        self.queue.submit({"name": "fits now"})
+        self.handler.release.set()
+        self.queue.wait(jobs[2].id, 5)
+        self.assertEqual(self.queue.get(jobs[0].id).status, "cancelled")
+        self.assertNotIn("waiting-0", self.handler.order)
+
+    def test_handler_errors_fail_the_job(self):
+        queue = JobQueue(lambda: 1 / 0, workers=1)
+        job = queue.wait(queue.submit({}).id, 5)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("division by zero", job.error)
+        self.assertEqual(queue.stats()["failed"], 1)
+
+
+class JobsApiTest(unittest.TestCase):
+    def setUp(self):
+        import app
+        self.app = app
+        self.client = app.app.test_client()
+
+    def test_full_queue_is_a_429(self):
+        handler = BlockingHandler()
+        queue = JobQueue(handler, workers=1, max_queue=0)
+        with mock.patch.object(self.app, "synthesis_jobs", queue):
+            response = self.client.post("/api/voice/jobs", json={"text": "Hello"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "5")
+        self.assertIn("queue is full", response.get_json()["error"])
+
+    def test_unknown_priority_is_a_400(self):
+        response = self.client.post("/api/voice/jobs", json={"text": "Hello", "priority": "urgent"})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Choice of TTS backend per voice"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tts_backends import TTSBackend, TTSBackendRegistry, parse_voice_backends
+
+
+class FakeBackend(TTSBackend):
+    def __init__(self, name, fail_warm=False):
+        self.name = name
+        self.fail_warm = fail_warm
+        self.warmed = False
+
+    def warm(self):
+        if self.fail_warm:
+            raise RuntimeError("model missing")
+        self.warmed = True
+
+    def synthesize(self, text, profile, speaker_wav=None):
+        return f"{self.name}:{text}".encode("utf-8")
+
+
+class ParseVoiceBackendsTest(unittest.TestCase):
+    def test_pairs_are_parsed_and_malformed_ones_skipped(self):
+        self.assertEqual(parse_voice_backends(" voice1 = local,voice2=gtts,broken,=local,voice3=, "),
+                         {"voice1": "local", "voice2": "gtts"})
+        self.assertEqual(parse_voice_backends(""), {})
+
+
+class RegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = TTSBackendRegistry(default="remote", voice_backends={"voice1": "local"})
+        self.remote = self.registry.register(FakeBackend("remote"))
+        self.local = self.registry.register(FakeBackend("local"))
+
+    def test_voices_without_an_override_use_the_default(self):
+        self.assertIs(self.registry.for_voice("voice1"), self.local)
+        self.assertIs(self.registry.for_voice("voice2"), self.remote)
+        self.assertIs(self.registry.for_voice(None), self.remote)
+
+    def test_unknown_backend_names_the_available_ones(self):
+        registry = TTSBackendRegistry(default="remote", voice_backends={"voice1": "missing"})
+        registry.register(FakeBackend("remote"))
+        with self.assertRaisesRegex(ValueError, "Unknown TTS backend: missing.*remote"):
+            registry.for_voice("voice1")
+        self.assertEqual(registry.for_voice("voice2").name, "remote")
+
+    def test_preload_warms_configured_backends_and_survives_failures(self):
+        registry = TTSBackendRegistry(default="remote", voice_backends={})
+        remote = registry.register(FakeBackend("remote", fail_warm=True))
+        unused = registry.register(FakeBackend("local"))
+        registry.preload()
+        self.assertFalse(remote.warmed)
+        self.assertFalse(unused.warmed)
+
+        self.registry.preload()
+        self.assertTrue(self.remote.warmed and self.local.warmed)
+
+    def test_status(self):
+        status = self.registry.status()
+        self.assertEqual((status["default"], status["voiceOverrides"]), ("remote", 1))
+        self.assertEqual(set(status["backends"]), {"remote", "local"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Voice catalog: directory scan, setup_voices manifest and ETag"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voice_catalog import VoiceCatalog, MANIFEST_NAME, read_manifest, write_manifest
+
+
+class VoiceCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def add(self, *names):
+        for name in names:
+            with open(os.path.join(self.directory, name), "wb") as f:
+                f.write(b"\0")
+
+    def age_directory(self, seconds):
+        """Backdate the directory so the manifest written after it counts as current"""
+        past = time.time() - seconds
+        os.utime(self.directory, (past, past))
+
+    def test_scan_lists_mp3_then_wav_and_skips_other_files(self):
+        self.add("b_voice.wav", "common_voice_en_2.mp3", "a_voice.mp3", "notes.txt")
+        voices = VoiceCatalog(self.directory).voices()
+        self.assertEqual([voice["file"] for voice in voices], ["a_voice.mp3", "common_voice_en_2.mp3", "b_voice.wav"])
+        self.assertEqual([voice["name"] for voice in voices], ["A Voice", "Voice 2", "B Voice"])
+        self.assertEqual(voices[0]["file_path"], os.path.join(self.directory, "a_voice.mp3"))
+
+    def test_current_manifest_is_read_instead_of_scanning(self):
+        self.add("one.mp3", "two.mp3")
+        self.age_directory(10)
+        # The manifest only lists one sample, so its use is visible
+        write_manifest(self.directory, [{"file": "two.mp3", "size": 1}])
+        self.assertEqual([sample["file"] for sample in read_manifest(self.directory)], ["two.mp3"])
+        self.assertEqual([voice["id"] for voice in VoiceCatalog(self.directory).voices()], ["two"])
+
+    def test_manifest_older_than_the_directory_is_ignored(self):
+        self.add("one.mp3")
+        self.age_directory(10)
+        write_manifest(self.directory, [{"file": "one.mp3"}])
+        manifest = os.path.join(self.directory, MANIFEST_NAME)
+        past = time.time() - 5
+        os.utime(manifest, (past, past))
+        # A sample added after the manifest was written
+        self.add("two.mp3")
+        self.assertIsNone(read_manifest(self.directory))
+        self.assertEqual([voice["id"] for voice in VoiceCatalog(self.directory).voices()], ["one", "two"])
+
+    def test_unknown_manifest_version_is_ignored(self):
+        self.add("one.mp3")
+        self.age_directory(10)
+        with open(os.path.join(self.directory, MANIFEST_NAME), "w") as f:
+            f.write('{"version": 99, "samples": []}')
+        self.assertIsNone(read_manifest(self.directory))
+
+    def test_etag_follows_the_payload(self):
+        self.add("one.mp3")
+        self.age_directory(10)
+        catalog = VoiceCatalog(self.directory)
+        payload, etag = catalog.payload()
+        self.assertIn(b'"id": "one"', payload)
+        # Unchanged directory: the same body and ETag, without rescanning
+        self.assertIs(catalog.payload()[0], payload)
+        self.assertEqual(VoiceCatalog(self.directory).payload()[1], etag)
+
+        self.add("two.mp3")
+        new_payload, new_etag = catalog.payload()
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(catalog.get("two")["file"], "two.mp3")
+        self.assertIsNone(catalog.get("three"))
+
+    def test_missing_directory_has_no_voices(self):
+        catalog = VoiceCatalog(os.path.join(self.directory, "missing"))
+        self.assertEqual(catalog.voices(), [])
+        self.assertEqual(catalog.payload()[0], b"[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
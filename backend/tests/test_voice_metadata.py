@@ -0,0 +1,108 @@
+"""Voice sample levels, the metadata index and incremental preprocessing"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voice_metadata import (measure_levels, sample_language, read_metadata_index, write_metadata_index,
+                            metadata_path, preprocess_voices, VOICE_METADATA_NAME)
+from voice_catalog import VoiceCatalog
+
+RATE = 8000
+
+
+def tone(seconds, amplitude):
+    """Sine wave at the given peak amplitude"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    return amplitude * np.sin(2 * np.pi * 440 * t)
+
+
+class MeasureLevelsTest(unittest.TestCase):
+    def test_loudness_ignores_silent_frames(self):
+        # One second of silence, then one second of a half-scale tone
+        samples = np.concatenate([np.zeros(RATE), tone(1, 0.5)])
+        levels = measure_levels(samples, RATE)
+        # A sine's RMS is 3 dB below its peak: 20 * log10(0.5 / sqrt(2))
+        self.assertAlmostEqual(levels["loudness"], -9.0, delta=0.1)
+        self.assertAlmostEqual(levels["rms"], -12.0, delta=0.1)
+        self.assertAlmostEqual(levels["peak"], -6.0, delta=0.1)
+        self.assertAlmostEqual(levels["speechRatio"], 0.5, places=2)
+        self.assertAlmostEqual(levels["speechStart"], 1.0, places=2)
+
+    def test_silence_and_empty_input_hit_the_floor(self):
+        for samples in (np.zeros(RATE), np.zeros(0)):
+            levels = measure_levels(samples, RATE)
+            self.assertEqual((levels["rms"], levels["peak"], levels["speechRatio"]), (-120.0, -120.0, 0.0))
+
+
+class MetadataIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.samples = os.path.join(self.directory, "voice_samples")
+        self.previews = os.path.join(self.directory, "voice_previews")
+        os.makedirs(self.samples)
+        os.makedirs(self.previews)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def add_sample(self, voice_id, preview=True):
+        """Sample with an up-to-date index entry, so preprocessing has nothing to decode"""
+        path = os.path.join(self.samples, f"{voice_id}.mp3")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 10)
+        if preview:
+            with open(os.path.join(self.previews, f"{voice_id}.mp3"), "wb") as f:
+                f.write(b"\0")
+        stat = os.stat(path)
+        return {"file": f"{voice_id}.mp3", "size": stat.st_size, "mtime": stat.st_mtime_ns,
+                "duration": 4.2, "loudness": -20.0, "preview": f"{voice_id}.mp3"}
+
+    def test_sample_language_from_common_voice_names(self):
+        self.assertEqual(sample_language("common_voice_en_123"), "en")
+        self.assertEqual(sample_language("common_voice_pt-BR_9"), "pt-BR")
+        self.assertIsNone(sample_language("morgan"))
+
+    def test_index_round_trip_and_unusable_indexes(self):
+        path = metadata_path(self.previews)
+        self.assertEqual(os.path.basename(path), VOICE_METADATA_NAME)
+        self.assertEqual(read_metadata_index(path), {})
+        write_metadata_index(path, {"a": {"duration": 1.0}})
+        self.assertEqual(read_metadata_index(path), {"a": {"duration": 1.0}})
+        self.assertEqual(os.listdir(self.previews), [VOICE_METADATA_NAME])
+
+        for content in ("not json", '{"version": 99, "voices": {"a": {}}}'):
+            with open(path, "w") as f:
+                f.write(content)
+            self.assertEqual(read_metadata_index(path), {})
+
+    def test_unchanged_samples_are_skipped_and_removed_ones_dropped(self):
+        kept = self.add_sample("kept")
+        gone = self.add_sample("gone")
+        os.remove(os.path.join(self.samples, "gone.mp3"))
+        write_metadata_index(metadata_path(self.previews), {"kept": kept, "gone": gone})
+
+        self.assertEqual(preprocess_voices(self.samples, self.previews, workers=1), (0, 1, 0))
+        self.assertEqual(read_metadata_index(metadata_path(self.previews)), {"kept": kept})
+        self.assertFalse(os.path.exists(os.path.join(self.previews, "gone.mp3")))
+
+    def test_catalog_merges_metadata_and_preview_urls(self):
+        write_metadata_index(metadata_path(self.previews), {"morgan": self.add_sample("morgan")})
+        self.add_sample("plain", preview=False)
+        catalog = VoiceCatalog(self.samples, metadata_path(self.previews))
+        voices = {voice["id"]: voice for voice in catalog.voices()}
+        self.assertEqual(voices["morgan"]["metadata"]["duration"], 4.2)
+        self.assertEqual(voices["morgan"]["previewUrl"], "/api/voices/morgan/preview")
+        self.assertEqual(catalog.preview("morgan"), "morgan.mp3")
+        self.assertNotIn("metadata", voices["plain"])
+        self.assertIsNone(catalog.preview("plain"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Splitting text into speakable segments.
+
+Used to synthesize long text piece by piece: segments end at sentence
+boundaries where possible, then at clause punctuation, and only as a last
+resort at a space.
+"""
+
+import re
+
+# Sentence ends: terminal punctuation (optionally followed by a closing quote/bracket) and whitespace
+_SENTENCE_END = re.compile(r'([.!?…。！？]+["\'”’)\]]*)\s+')
+
+# Clause boundaries used to break sentences that are too long
+_CLAUSE_END = re.compile(r'(?<=[,;:—–])\s+')
+
+
+def split_sentences(text):
+    """Split text into sentences, dropping empty pieces"""
+    # re.split with a capture group alternates text and the captured sentence ending
+    pieces = _SENTENCE_END.split(text)
+    sentences = [
+        (pieces[i] + (pieces[i + 1] if i + 1 < len(pieces) else "")).strip()
+        for i in range(0, len(pieces), 2)
+    ]
+    return [sentence for sentence in sentences if sentence]
+
+
+def _split_long(piece, max_chars):
+    """Break a piece longer than max_chars at clause boundaries, then at spaces"""
+    if len(piece) <= max_chars:
+        return [piece]
+
+    parts = []
+    current = ""
+    for clause in _CLAUSE_END.split(piece):
+        candidate = f"{current} {clause}".strip()
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        if len(clause) <= max_chars:
+            current = clause
+            continue
+        # A single clause is still too long: fall back to word boundaries
+        current = ""
+        for word in clause.split():
+            candidate = f"{current} {word}".strip()
+            if len(candidate) <= max_chars or not current:
+                current = candidate
+            else:
+                parts.append(current)
+                current = word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_text(text, max_chars=200, min_chars=0):
+    """
+    Split text into segments of at most max_chars characters.
+
+    Args:
+        text: text to split
+        max_chars: hard limit per segment (a single word longer than this
+            is kept whole)
+        min_chars: consecutive short sentences are merged until a segment
+            reaches this length, to avoid many tiny synthesis calls
+
+    Returns:
+        List of segments in reading order
+    """
+    segments = []
+    for sentence in split_sentences(text):
+        for piece in _split_long(sentence, max_chars):
+            if segments and len(segments[-1]) < min_chars and len(segments[-1]) + 1 + len(piece) <= max_chars:
+                segments[-1] = f"{segments[-1]} {piece}"
+            else:
+                segments.append(piece)
+    return segments
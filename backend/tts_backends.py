@@ -0,0 +1,210 @@
+"""
+Text-to-speech engines behind a common interface.
+
+Every backend turns text into MP3 bytes for a voice profile
+({"lang", "tld", "slow"}) and a speaker sample. A registry picks the
+backend for each voice: `TTS_BACKEND` is the default and
+`TTS_VOICE_BACKENDS` overrides it per voice id. The "local" backend runs
+a Coqui TTS model on the CPU, loaded once per process, so synthesis works
+without network access.
+"""
+
+import io
+import os
+import threading
+import time
+import logging
+
+from startup import lazy_import
+
+# Imported on first synthesis (or during warm-up) rather than at startup
+gtts = lazy_import("gtts")
+coqui_api = lazy_import("TTS.api")
+
+# Backend used for voices without an override
+TTS_BACKEND = os.environ.get("TTS_BACKEND", "gtts")
+
+# Per-voice overrides, e.g. "common_voice_en_40865211=local,common_voice_en_40865212=gtts"
+TTS_VOICE_BACKENDS = os.environ.get("TTS_VOICE_BACKENDS", "")
+
+# Coqui model used by the local backend
+TTS_LOCAL_MODEL = os.environ.get("TTS_LOCAL_MODEL", "tts_models/en/ljspeech/vits")
+
+# Bitrate of MP3s encoded from local synthesis
+TTS_LOCAL_BITRATE = os.environ.get("TTS_LOCAL_BITRATE", "64k")
+
+
+def parse_voice_backends(value):
+    """Parse "voice=backend,voice=backend" into a dict"""
+    overrides = {}
+    for pair in value.split(","):
+        if "=" not in pair:
+            continue
+        voice_id, backend = (part.strip() for part in pair.split("=", 1))
+        if voice_id and backend:
+            overrides[voice_id] = backend
+    return overrides
+
+
+class TTSBackend:
+    """Interface implemented by every speech engine"""
+
+    name = None
+
+    # Longest text handed to synthesize() in one call; longer text is chunked by the caller
+    max_chars = 200
+
+    def synthesize(self, text, profile, speaker_wav=None):
+        """Return MP3 bytes of text spoken with the voice profile; raise on failure"""
+        raise NotImplementedError
+
+    def warm(self):
+        """Load anything expensive ahead of the first request"""
+
+    def cache_settings(self):
+        """Settings besides the voice profile that change the audio produced, for cache keys"""
+        return {}
+
+    def status(self):
+        return {}
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate's TTS service; one network round-trip per synthesis"""
+
+    name = "gtts"
+    max_chars = 300
+
+    def warm(self):
+        gtts.load()
+
+    def synthesize(self, text, profile, speaker_wav=None):
+        buffer = io.BytesIO()
+        gtts.gTTS(text=text, lang=profile["lang"], tld=profile["tld"], slow=profile["slow"]).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class CoquiBackend(TTSBackend):
+    """Coqui TTS model running locally on the CPU, loaded on first use and shared by all threads"""
+
+    name = "local"
+    max_chars = 250
+
+    def __init__(self, model_name=TTS_LOCAL_MODEL, bitrate=TTS_LOCAL_BITRATE):
+        self.model_name = model_name
+        self.bitrate = bitrate
+        self._model = None
+        self._load_time = None
+        self._error = None
+        # Serializes model construction so concurrent requests don't load twice
+        self._load_lock = threading.Lock()
+        # The model isn't safe to run from several threads at once
+        self._infer_lock = threading.Lock()
+
+    def _load(self):
+        if self._model is not None:
+            return self._model
+
+        with self._load_lock:
+            if self._model is not None:
+                return self._model
+
+            logging.info(f"Loading local TTS model {self.model_name}...")
+            start = time.perf_counter()
+            try:
+                model = coqui_api.TTS(self.model_name, progress_bar=False)
+                if hasattr(model, "to"):
+                    model = model.to("cpu")
+            except Exception as e:
+                self._error = str(e)
+                logging.error(f"Failed to load local TTS model {self.model_name}: {e}")
+                raise
+            self._load_time = time.perf_counter() - start
+            self._error = None
+            self._model = model
+            logging.info(f"Local TTS model {self.model_name} loaded in {self._load_time:.2f}s")
+            return model
+
+    def warm(self):
+        self._load()
+
+    def cache_settings(self):
+        return {"model": self.model_name, "bitrate": self.bitrate}
+
+    def synthesize(self, text, profile, speaker_wav=None):
+        import numpy as np
+        from pydub import AudioSegment
+
+        model = self._load()
+        kwargs = {}
+        if getattr(model, "is_multi_lingual", False):
+            kwargs["language"] = profile["lang"]
+        if getattr(model, "is_multi_speaker", False) and speaker_wav:
+            # Voice-cloning models speak in the voice of the sample
+            kwargs["speaker_wav"] = speaker_wav
+
+        with self._infer_lock:
+            samples = model.tts(text=text, **kwargs)
+        sample_rate = model.synthesizer.output_sample_rate
+
+        pcm = (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767).astype(np.int16)
+        audio = AudioSegment(pcm.tobytes(), frame_rate=sample_rate, sample_width=2, channels=1)
+
+        buffer = io.BytesIO()
+        audio.export(buffer, format="mp3", bitrate=self.bitrate)
+        return buffer.getvalue()
+
+    def status(self):
+        return {
+            "model": self.model_name,
+            "state": "warm" if self._model is not None else "cold",
+            "loadSeconds": round(self._load_time, 3) if self._load_time is not None else None,
+            "error": self._error
+        }
+
+
+class TTSBackendRegistry:
+    """Named TTS backends and the choice of backend for each voice"""
+
+    def __init__(self, default=TTS_BACKEND, voice_backends=None):
+        self.default = default
+        self.voice_backends = parse_voice_backends(TTS_VOICE_BACKENDS) if voice_backends is None else dict(voice_backends)
+        self._backends = {}
+
+    def register(self, backend):
+        self._backends[backend.name] = backend
+        return backend
+
+    def get(self, name):
+        backend = self._backends.get(name)
+        if backend is None:
+            raise ValueError(f"Unknown TTS backend: {name} (available: {', '.join(self._backends)})")
+        return backend
+
+    def name_for_voice(self, voice_id):
+        return self.voice_backends.get(voice_id, self.default)
+
+    def for_voice(self, voice_id):
+        """Backend that synthesizes voice_id"""
+        return self.get(self.name_for_voice(voice_id))
+
+    def preload(self):
+        """Warm every backend that some voice is configured to use"""
+        for name in {self.default, *self.voice_backends.values()}:
+            try:
+                self.get(name).warm()
+            except Exception as e:
+                logging.error(f"Could not warm TTS backend {name}: {e}")
+
+    def status(self):
+        return {
+            "default": self.default,
+            "voiceOverrides": len(self.voice_backends),
+            "backends": {name: backend.status() for name, backend in self._backends.items()}
+        }
+
+
+# Shared registry with the built-in backends
+tts_backends = TTSBackendRegistry()
+tts_backends.register(GTTSBackend())
+tts_backends.register(CoquiBackend())
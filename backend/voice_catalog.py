@@ -0,0 +1,198 @@
+"""
+In-memory catalog of the voice samples in voice_samples/.
+
+The directory is only rescanned when its modification time changes, which
+happens whenever a sample is added, removed or renamed. Lookups by id are
+a dict access, and the /api/voices JSON body and its ETag are built once
+per rescan.
+
+setup_voices.py writes a manifest of the samples it imported. While the
+manifest is at least as new as the directory it is read instead of
+scanning, which matters once the directory holds many thousands of clips.
+Metadata extracted offline by voice_metadata.py (duration, levels,
+language, preview clip) is merged into each voice when its index exists.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import logging
+
+from voice_metadata import read_metadata_index
+
+VOICE_EXTENSIONS = (".mp3", ".wav")
+
+# Fields of the offline metadata returned by /api/voices
+VOICE_METADATA_FIELDS = ("duration", "sampleRate", "channels", "language", "loudness", "rms", "peak", "speechRatio")
+
+# Index of the samples written by setup_voices.py
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def voice_files(directory):
+    """Audio files in directory: MP3 samples first, then WAV, each in a stable order"""
+    files = {ext: [] for ext in VOICE_EXTENSIONS}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext in files and entry.is_file():
+                files[ext].append(entry.path)
+    return [path for ext in VOICE_EXTENSIONS for path in sorted(files[ext])]
+
+
+def voice_order(filename):
+    """Sort key that orders file names the way voice_files() lists them"""
+    return VOICE_EXTENSIONS.index(os.path.splitext(filename)[1].lower()), filename
+
+
+def write_manifest(directory, entries):
+    """
+    Atomically write the manifest for directory.
+
+    Args:
+        entries: one dict per sample with at least "file" (the file name);
+            other fields (size, mtime, source) are kept for the importer
+    """
+    entries = sorted(entries, key=lambda entry: voice_order(entry["file"]))
+    path = os.path.join(directory, MANIFEST_NAME)
+    partial = f"{path}.{os.getpid()}.part"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "samples": entries}, f)
+    os.replace(partial, path)
+    # The rename bumps the directory's mtime; stamp the manifest after it so it counts as current
+    os.utime(path)
+    return path
+
+
+def read_manifest(directory):
+    """
+    Sample entries from the manifest, or None if there is none or it is
+    older than the directory (a sample was added or removed since)
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        if os.stat(path).st_mtime_ns < os.stat(directory).st_mtime_ns:
+            return None
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest.get("samples", [])
+
+
+def build_voice_list(directory):
+    """Build the voice profiles served by /api/voices from the manifest, or by scanning directory"""
+    samples = read_manifest(directory)
+    if samples is not None:
+        all_files = [os.path.join(directory, sample["file"]) for sample in samples]
+    else:
+        all_files = voice_files(directory)
+
+    voices = []
+    for i, file_path in enumerate(all_files):
+        voice_id = os.path.splitext(os.path.basename(file_path))[0]
+        if "common_voice" in voice_id:
+            # For common voice samples, use a simpler name
+            name = f"Voice {i+1}"
+        else:
+            # Try to make a readable name from the filename
+            name = voice_id.replace("_", " ").title()
+
+        voices.append({
+            "id": voice_id,
+            "name": name,
+            "file_path": file_path,  # Store the full path
+            "file": os.path.basename(file_path)  # Store just the filename for API responses
+        })
+    return voices
+
+
+class VoiceCatalog:
+    """Cached voice list with an id index, rebuilt when the samples directory or metadata index changes"""
+
+    def __init__(self, directory, metadata_path=None):
+        self.directory = directory
+        self.metadata_path = metadata_path
+        self._mtime = None
+        self._voices = []
+        self._by_id = {}
+        self._previews = {}
+        self._payload = b"[]"
+        self._etag = None
+        self._lock = threading.Lock()
+
+    def _current_mtime(self):
+        """Modification times of the directory and the metadata index; None for either that is missing"""
+        mtimes = []
+        for path in (self.directory, self.metadata_path):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns if path else None)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _refresh(self):
+        """Rebuild the catalog if the directory changed since the last scan"""
+        mtime = self._current_mtime()
+        if mtime == self._mtime and self._etag is not None:
+            return
+
+        with self._lock:
+            if mtime == self._mtime and self._etag is not None:
+                return
+
+            voices = build_voice_list(self.directory) if mtime[0] is not None else []
+            previews = {}
+            if mtime[1] is not None:
+                metadata = read_metadata_index(self.metadata_path)
+                for voice in voices:
+                    meta = metadata.get(voice["id"])
+                    if meta is None:
+                        continue
+                    voice["metadata"] = {field: meta.get(field) for field in VOICE_METADATA_FIELDS}
+                    if meta.get("preview"):
+                        previews[voice["id"]] = meta["preview"]
+                        voice["previewUrl"] = f"/api/voices/{voice['id']}/preview"
+            payload = json.dumps(voices).encode("utf-8")
+
+            self._voices = voices
+            self._by_id = {voice["id"]: voice for voice in voices}
+            self._previews = previews
+            self._payload = payload
+            self._etag = hashlib.sha1(payload).hexdigest()
+            self._mtime = mtime
+
+            if voices:
+                logging.info(f"Voice catalog loaded {len(voices)} voices from {self.directory}")
+            else:
+                logging.warning(f"No voice samples found in {self.directory}")
+
+    def voices(self):
+        """All voices, in catalog order"""
+        self._refresh()
+        return list(self._voices)
+
+    def get(self, voice_id):
+        """The voice with voice_id, or None"""
+        self._refresh()
+        return self._by_id.get(voice_id)
+
+    def preview(self, voice_id):
+        """File name of the voice's preview clip in the preview directory, or None"""
+        self._refresh()
+        return self._previews.get(voice_id)
+
+    def payload(self):
+        """Pre-serialized JSON body for /api/voices and its (unquoted) ETag"""
+        self._refresh()
+        return self._payload, self._etag
+
+    def invalidate(self):
+        """Force a rescan on the next access"""
+        with self._lock:
+            self._mtime = None
+            self._etag = None
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Offline preprocessing of the voice samples.
+
+Decodes every sample in voice_samples/ once and records what the backend
+would otherwise have to decode it for: duration, sample rate, channels,
+RMS and peak level, gated loudness and how much of the clip is speech.
+Levels are computed with vectorized NumPy over fixed-length frames. Each
+voice also gets a short, loudness-normalized, low-bitrate mono preview
+clip. The results go to an index that VoiceCatalog merges into /api/voices,
+so serving the voice list never touches the audio.
+
+    python voice_metadata.py [--force] [--workers N]
+
+Samples whose size and modification time haven't changed since the last
+run are skipped.
+"""
+
+import os
+import re
+import json
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where preview clips and the metadata index are written
+VOICE_PREVIEW_DIR = os.environ.get("VOICE_PREVIEW_DIR", os.path.join(BASE_DIR, "voice_previews"))
+
+# Index of per-voice metadata, read by the backend
+VOICE_METADATA_NAME = "index.json"
+VOICE_METADATA_VERSION = 1
+
+# Length, loudness (dBFS over speech) and encoding of preview clips
+VOICE_PREVIEW_SECONDS = float(os.environ.get("VOICE_PREVIEW_SECONDS", "8"))
+VOICE_PREVIEW_LOUDNESS = float(os.environ.get("VOICE_PREVIEW_LOUDNESS", "-20"))
+VOICE_PREVIEW_BITRATE = os.environ.get("VOICE_PREVIEW_BITRATE", "48k")
+VOICE_PREVIEW_SAMPLE_RATE = 22050
+
+# Frames used for level measurement, and the level below which a frame counts as silence
+FRAME_MS = 50
+SILENCE_DB = -50.0
+
+# Previews are never boosted past this peak level
+PREVIEW_PEAK_DB = -1.0
+
+# Level reported for digital silence
+FLOOR_DB = -120.0
+
+# Common Voice clips are named common_voice_<locale>_<id>
+COMMON_VOICE_NAME = re.compile(r"^common_voice_([a-z]{2,3}(?:-[A-Za-z]{2,4})?)_\d+$")
+
+
+def metadata_path(preview_dir=VOICE_PREVIEW_DIR):
+    return os.path.join(preview_dir, VOICE_METADATA_NAME)
+
+
+def read_metadata_index(path):
+    """voice id -> metadata from the index at path, or {} if there isn't a usable one"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != VOICE_METADATA_VERSION:
+        return {}
+    return index.get("voices", {})
+
+
+def write_metadata_index(path, voices):
+    partial = f"{path}.{os.getpid()}.part"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump({"version": VOICE_METADATA_VERSION, "voices": voices}, f, sort_keys=True)
+    os.replace(partial, path)
+
+
+def sample_language(voice_id):
+    """Locale encoded in a Common Voice clip name, or None"""
+    match = COMMON_VOICE_NAME.match(voice_id)
+    return match.group(1) if match else None
+
+
+def _db(values):
+    import numpy as np
+    return np.maximum(20 * np.log10(np.maximum(values, 1e-12)), FLOOR_DB)
+
+
+def measure_levels(samples, sample_rate, frame_ms=FRAME_MS, silence_db=SILENCE_DB):
+    """
+    Level statistics of mono float samples in [-1, 1].
+
+    The signal is cut into frame_ms frames and each frame's RMS is computed
+    in one vectorized pass. Loudness is the RMS over the frames louder than
+    silence_db, so pauses don't drag it down.
+    """
+    import numpy as np
+
+    samples = np.asarray(samples, dtype=np.float32)
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    count = max(1, len(samples) // frame)
+    framed = np.zeros(count * frame, dtype=np.float32)
+    usable = min(len(samples), count * frame)
+    framed[:usable] = samples[:usable]
+
+    power = np.square(framed.reshape(count, frame), dtype=np.float64).mean(axis=1)
+    frame_db = _db(np.sqrt(power))
+    active = frame_db > silence_db
+    gated = power[active].mean() if active.any() else power.mean()
+
+    return {
+        "rms": round(float(_db(np.sqrt(power.mean()))), 1),
+        "loudness": round(float(_db(np.sqrt(gated))), 1),
+        "peak": round(float(_db(np.abs(samples).max() if len(samples) else 0.0)), 1),
+        "speechRatio": round(float(active.mean()), 3),
+        # Seconds of leading silence, used to start previews on speech
+        "speechStart": round(float(np.argmax(active) * frame / sample_rate) if active.any() else 0.0, 2)
+    }
+
+
+def segment_samples(segment):
+    """Mono float32 samples in [-1, 1] from a pydub AudioSegment"""
+    import numpy as np
+
+    samples = np.asarray(segment.get_array_of_samples(), dtype=np.float32)
+    if segment.channels > 1:
+        samples = samples.reshape(-1, segment.channels).mean(axis=1)
+    return samples / float(1 << (8 * segment.sample_width - 1))
+
+
+def analyze_voice(voice_id, path, preview_path, preview_seconds=VOICE_PREVIEW_SECONDS,
+                  target_loudness=VOICE_PREVIEW_LOUDNESS, bitrate=VOICE_PREVIEW_BITRATE):
+    """
+    Metadata for one sample, writing its preview clip to preview_path.
+    Runs in a worker process.
+    """
+    from pydub import AudioSegment
+
+    stat = os.stat(path)
+    segment = AudioSegment.from_file(path)
+    levels = measure_levels(segment_samples(segment), segment.frame_rate)
+
+    meta = {
+        "file": os.path.basename(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "duration": round(len(segment) / 1000, 3),
+        "sampleRate": segment.frame_rate,
+        "channels": segment.channels,
+        "language": sample_language(voice_id),
+        **levels
+    }
+
+    # Start just before the first speech and bring the speech up (or down) to the target level
+    start_ms = max(0, int(levels["speechStart"] * 1000) - 100)
+    preview = segment[start_ms:start_ms + int(preview_seconds * 1000)].set_channels(1)
+    preview_peak = float(_db(max(preview.max, 1) / preview.max_possible_amplitude))
+    gain = min(target_loudness - levels["loudness"], PREVIEW_PEAK_DB - preview_peak)
+    preview = preview.apply_gain(gain).set_frame_rate(VOICE_PREVIEW_SAMPLE_RATE).fade_in(20).fade_out(200)
+
+    partial = f"{preview_path}.{os.getpid()}.part"
+    preview.export(partial, format="mp3", bitrate=bitrate)
+    os.replace(partial, preview_path)
+
+    meta["preview"] = os.path.basename(preview_path)
+    meta["previewDuration"] = round(len(preview) / 1000, 3)
+    meta["previewGain"] = round(gain, 1)
+    return meta
+
+
+def preprocess_voices(samples_dir, preview_dir=VOICE_PREVIEW_DIR, workers=None, force=False):
+    """
+    Analyze every voice sample in samples_dir whose file changed since the
+    last run, write previews and the index to preview_dir.
+
+    Returns:
+        (analyzed, skipped, failed) counts
+    """
+    from voice_catalog import build_voice_list
+
+    os.makedirs(preview_dir, exist_ok=True)
+    index_path = metadata_path(preview_dir)
+    previous = read_metadata_index(index_path)
+    voices = build_voice_list(samples_dir)
+
+    index = {}
+    pending = []
+    for voice in voices:
+        meta = previous.get(voice["id"])
+        try:
+            stat = os.stat(voice["file_path"])
+        except OSError:
+            continue
+        unchanged = (meta is not None and meta.get("size") == stat.st_size and meta.get("mtime") == stat.st_mtime_ns
+                     and meta.get("preview") and os.path.exists(os.path.join(preview_dir, meta["preview"])))
+        if unchanged and not force:
+            index[voice["id"]] = meta
+        else:
+            pending.append(voice)
+
+    failed = 0
+    # Decoding and level measurement are CPU bound, so samples are spread over processes
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(analyze_voice, voice["id"], voice["file_path"],
+                            os.path.join(preview_dir, f"{voice['id']}.mp3")): voice
+            for voice in pending
+        }
+        for future in as_completed(futures):
+            voice = futures[future]
+            try:
+                index[voice["id"]] = future.result()
+            except Exception as e:
+                failed += 1
+                logging.error(f"Could not analyze voice sample {voice['file']}: {e}")
+
+    # Drop previews of samples that are gone
+    for voice_id, meta in previous.items():
+        if voice_id not in index and meta.get("preview"):
+            try:
+                os.remove(os.path.join(preview_dir, meta["preview"]))
+            except FileNotFoundError:
+                pass
+
+    write_metadata_index(index_path, index)
+    return len(pending) - failed, len(voices) - len(pending), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract voice sample metadata and build preview clips")
+    parser.add_argument("--samples", default=os.path.join(BASE_DIR, "voice_samples"), help="Voice samples directory")
+    parser.add_argument("--previews", default=VOICE_PREVIEW_DIR, help="Where previews and the index are written")
+    parser.add_argument("--workers", type=int, help="Processes analyzing samples (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="Reanalyze samples that haven't changed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    analyzed, skipped, failed = preprocess_voices(args.samples, args.previews, args.workers, args.force)
+    print(f"{analyzed} samples analyzed, {skipped} unchanged, {failed} failed. Index: {metadata_path(args.previews)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+With gunicorn.conf.py this module is imported once, in the master process,
+before the workers are forked. Heavy libraries and preloaded models are
+loaded here so every worker shares their memory copy-on-write; each worker
+then starts its own background threads from the post_fork hook.
+"""
+
+from app import app as application, preload_engines, start_background_work
+
+preload_engines()
@@ -32,71 +32,20 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({
   const [audioUrl, setAudioUrl] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [isLoading, setIsLoading] = useState(false);
   const audioRef = React.useRef<HTMLAudioElement>(null);
 
-  // Fetch audio URL when article or voice changes
+  // Stream the summary when article or voice changes; the backend sends each sentence as soon
+  // as it is synthesized, so playback starts without waiting for the whole summary
   useEffect(() => {
     if (!article || !voice) return;
     
-    const synthesizeAudio = async () => {
-      setIsLoading(true);
-      setError('');
-      setAudioUrl('');
-      
-      try {
-        console.log(`Synthesizing article with voice ID: ${voice}`);
-        console.log(`Article summary: ${article.summary.substring(0, 100)}...`);
-        
-        // Make a direct fetch call to the backend API for synthesis
-        const response = await fetch('http://localhost:5001/api/voice/synthesize', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({
-            text: article.summary,
-            voice_id: voice,
-            max_length: 500
-          })
-        });
-        
-        if (!response.ok) {
-          throw new Error(`Synthesis request failed: ${response.statusText}`);
-        }
-        
-        const result = await response.json();
-        console.log('Synthesis result from API:', result);
-        
-        if (result && result.audioUrl) {
-          // Make sure the URL is absolute by prepending the base URL if it's a relative path
-          const baseUrl = 'http://localhost:5001';
-          const audioUrl = result.audioUrl.startsWith('/') 
-            ? `${baseUrl}${result.audioUrl}` 
-            : result.audioUrl;
-          
-          console.log('Setting audio URL:', audioUrl);
-          setAudioUrl(audioUrl);
-          
-          // Pre-load the audio to make sure it's ready to play
-          const audioElement = new Audio(audioUrl);
-          audioElement.addEventListener('canplaythrough', () => {
-            console.log('Audio is ready to play through');
-          });
-          audioElement.addEventListener('error', (e) => {
-            console.error('Audio preload error:', e);
-          });
-        } else {
-          throw new Error('No audio URL returned from synthesis');
-        }
-      } catch (error) {
-        console.error('Error synthesizing article:', error);
-        setError('Failed to synthesize audio. Please try again.');
-        onPlayPause(false);
-      } finally {
-        setIsLoading(false);
-      }
-    };
-    
-    synthesizeAudio();
+    setError('');
+    // Shows the spinner until the first sentence arrives
+    setLoading(true);
+    // The stream's length isn't known until it ends; estimate it from the text meanwhile
+    setDuration(Math.max(1, Math.ceil(article.summary.length / 15)));
+    console.log(`Streaming article with voice ID: ${voice}`);
+    setAudioUrl(VoiceSynthesisService.getStreamUrl(article.summary, voice));
   }, [article, voice]);
 
   // Handle play/pause
@@ -149,7 +98,8 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({
       if (!audioRef.current) return;
       
       const current = audioRef.current.currentTime;
-      const total = audioRef.current.duration || duration;
+      // Streamed audio reports an infinite duration until it has been received in full
+      const total = Number.isFinite(audioRef.current.duration) ? audioRef.current.duration : duration;
       
       setCurrentTime(current);
       setProgress((current / total) * 100);
@@ -219,15 +169,25 @@ const AudioPlayer: React.FC<AudioPlayerProps> = ({
             onError={(e) => {
               console.error('Audio element error:', e);
               setError('Error loading audio file. Please try again.');
+              setLoading(false);
+              onPlayPause(false);
             }}
             onLoadedMetadata={(e) => {
               console.log('Audio metadata loaded', e);
-              // Set the duration from the audio element
-              if (audioRef.current) {
-                setDuration(audioRef.current.duration || 0);
+              // Set the duration from the audio element once it is known
+              if (audioRef.current && Number.isFinite(audioRef.current.duration)) {
+                setDuration(Math.round(audioRef.current.duration));
+              }
+            }}
+            onDurationChange={() => {
+              if (audioRef.current && Number.isFinite(audioRef.current.duration)) {
+                setDuration(Math.round(audioRef.current.duration));
               }
             }}
-            onCanPlay={() => console.log('Audio can play now')}
+            onCanPlay={() => {
+              console.log('Audio can play now');
+              setLoading(false);
+            }}
             onEnded={() => {
               console.log('Audio playback ended');
               onPlayPause(false);
@@ -25,6 +25,7 @@ const Dashboard = () => {
 
   // State for pagination and infinite scrolling
   const [offset, setOffset] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [hasMore, setHasMore] = useState(true);
   const [loadingMore, setLoadingMore] = useState(false);
   const newsContainerRef = useRef<HTMLDivElement>(null);
@@ -39,6 +40,7 @@ const Dashboard = () => {
       setFilteredNews(response.items); // Initialize filtered news with all news
       setHasMore(response.pagination.hasMore);
       setOffset(response.pagination.offset + response.pagination.limit);
+      setNextCursor(response.pagination.nextCursor ?? null);
     } catch (error) {
       console.error('Error fetching initial news:', error);
       setError('Failed to fetch news. Please try again.');
@@ -53,7 +55,10 @@ const Dashboard = () => {
     
     try {
       setLoadingMore(true);
-      const response = await NewsService.fetchLatestNews(10, offset);
+      // Continue from the cursor when the backend provides one; offsets can skip or repeat items as feeds update
+      const response = nextCursor
+        ? await NewsService.fetchLatestNews(10, 0, undefined, nextCursor)
+        : await NewsService.fetchLatestNews(10, offset);
       
       if (response.items.length > 0) {
         // Append new items to existing news
@@ -87,6 +92,7 @@ const Dashboard = () => {
         
         // Update pagination state
         setOffset(response.pagination.offset + response.pagination.limit);
+        setNextCursor(response.pagination.nextCursor ?? null);
         setHasMore(response.pagination.hasMore);
       } else {
         setHasMore(false);
@@ -109,7 +115,7 @@ const Dashboard = () => {
     if (scrollPosition > threshold && hasMore && !loadingMore && !loading) {
       fetchMoreNews();
     }
-  }, [hasMore, loadingMore, loading, offset]);
+  }, [hasMore, loadingMore, loading, offset, nextCursor]);
   
   // Add scroll event listener
   useEffect(() => {
@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Card } from "@/components/ui/card";
 import { VoiceSynthesisService, VoiceProfile } from '../services/voiceService';
 
@@ -9,6 +9,7 @@ interface Voice {
   avatar: string;
   description: string;
   accent: string;
+  previewUrl?: string;
 }
 
 interface VoiceCarouselProps {
@@ -25,7 +26,8 @@ const convertToVoice = (profile: VoiceProfile, index: number): Voice => ({
   name: profile.name,
   avatar: voiceAvatars[index % voiceAvatars.length],
   description: profile.description || `Voice sample ${index + 1}`,
-  accent: profile.accent || 'Generic Voice'
+  accent: profile.accent || 'Generic Voice',
+  previewUrl: profile.previewUrl
 });
 
 
@@ -33,6 +35,29 @@ const VoiceCarousel: React.FC<VoiceCarouselProps> = ({ selectedVoice, onVoiceSel
   const [hoveredVoice, setHoveredVoice] = useState<string | null>(null);
   const [voices, setVoices] = useState<Voice[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
+  const [previewing, setPreviewing] = useState<string | null>(null);
+  const previewAudio = useRef<HTMLAudioElement | null>(null);
+
+  // Play a voice's preview clip, stopping any preview already playing
+  const togglePreview = (event: React.MouseEvent, voice: Voice) => {
+    event.stopPropagation();
+    previewAudio.current?.pause();
+    if (previewing === voice.id || !voice.previewUrl) {
+      setPreviewing(null);
+      return;
+    }
+    const audio = new Audio(voice.previewUrl);
+    audio.onended = () => setPreviewing(null);
+    audio.play().catch(error => {
+      console.error('Error playing voice preview:', error);
+      setPreviewing(null);
+    });
+    previewAudio.current = audio;
+    setPreviewing(voice.id);
+  };
+
+  // Stop the preview when the carousel goes away
+  useEffect(() => () => previewAudio.current?.pause(), []);
 
   // Fetch voices from backend when component mounts
   useEffect(() => {
@@ -116,6 +141,15 @@ const VoiceCarousel: React.FC<VoiceCarouselProps> = ({ selectedVoice, onVoiceSel
               </h4>
               <p className="text-sm text-gray-400 mb-2">{voice.description}</p>
               <p className="text-xs text-gray-500">{voice.accent}</p>
+              {voice.previewUrl && (
+                <button
+                  type="button"
+                  className="relative z-10 mt-3 text-xs text-electric-blue hover:underline"
+                  onClick={(event) => togglePreview(event, voice)}
+                >
+                  {previewing === voice.id ? '■ Stop preview' : '▶ Preview'}
+                </button>
+              )}
             </div>
 
             {/* Hover Effect Overlay */}
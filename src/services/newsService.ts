@@ -8,6 +8,7 @@ export interface NewsArticle {
   summary: string;
   originalText: string;
   category: string;
+  categoryConfidence?: number;
   source: string;
   publishedAt: string;
   readTime: string;
@@ -20,6 +21,7 @@ export interface PaginationData {
   offset: number;
   limit: number;
   hasMore: boolean;
+  nextCursor?: string | null;
 }
 
 export interface NewsResponse {
@@ -106,12 +108,14 @@ export class NewsService {
   private static baseUrl = 'http://localhost:5001/api';
   
   // Fetch headlines from RSS feeds using our Python backend
-  static async fetchLatestNews(maxItems: number = 10, offset: number = 0, rssUrl: string = 'http://feeds.bbci.co.uk/news/rss.xml'): Promise<NewsResponse> {
+  // Pass the nextCursor of the previous page to continue where it ended
+  static async fetchLatestNews(maxItems: number = 10, offset: number = 0, rssUrl: string = 'http://feeds.bbci.co.uk/news/rss.xml', cursor?: string | null): Promise<NewsResponse> {
     console.log(`📡 Fetching news with offset ${offset}, limit ${maxItems}...`);
     
     try {
       // Try to fetch with pagination
-      const response = await fetch(`${this.baseUrl}/news?max_items=${maxItems}&offset=${offset}&rss_url=${encodeURIComponent(rssUrl)}`);
+      const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${this.baseUrl}/news?max_items=${maxItems}&offset=${offset}&rss_url=${encodeURIComponent(rssUrl)}${cursorParam}`);
       
       if (response.ok) {
         const data = await response.json();
@@ -133,7 +137,7 @@ export class NewsService {
     } catch (error) {
       console.error('Error fetching news:', error);
       // Only use mock data as absolute last resort
-      if (offset === 0) {
+      if (offset === 0 && !cursor) {
         alert('Could not fetch latest news. Using sample news instead. Please check your internet connection and try again.');
         return {
           items: mockNews.slice(0, maxItems),
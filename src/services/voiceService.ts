@@ -13,6 +13,17 @@ export interface VoiceProfile {
   sampleRate?: number;
   style?: string;
   energy?: number;
+  duration?: number;
+  loudness?: number;
+  previewUrl?: string;
+}
+
+// Metadata the backend extracts from each voice sample ahead of time
+interface VoiceMetadata {
+  duration?: number;
+  sampleRate?: number;
+  language?: string | null;
+  loudness?: number;
 }
 
 export class VoiceSynthesisService {
@@ -97,15 +108,21 @@ export class VoiceSynthesisService {
       const voiceData = await response.json();
       
       // Convert to VoiceProfile format
-      this.voiceProfiles = voiceData.map(voice => ({
+      this.voiceProfiles = voiceData.map((voice: { id: string; name: string; file: string; metadata?: VoiceMetadata; previewUrl?: string }) => ({
         id: voice.id,
         name: voice.name,
-        description: `Voice sample ${voice.id}`,
+        description: voice.metadata?.duration
+          ? `${voice.metadata.duration.toFixed(1)}s voice sample`
+          : `Voice sample ${voice.id}`,
         speakerWav: voice.file,
-        language: 'en',
+        language: voice.metadata?.language || 'en',
         accent: 'Unknown',
         gender: 'unknown',
-        sampleRate: 22050
+        sampleRate: voice.metadata?.sampleRate || 22050,
+        duration: voice.metadata?.duration,
+        loudness: voice.metadata?.loudness,
+        // Short normalized clip served by the backend, when it has been generated
+        previewUrl: voice.previewUrl ? `${this.baseUrl.replace(/\/api$/, '')}${voice.previewUrl}` : undefined
       }));
       
       return this.voiceProfiles;
@@ -241,6 +258,15 @@ export class VoiceSynthesisService {
     return results;
   }
 
+  // URL that streams synthesized speech while it is generated; usable directly as an <audio> src
+  static getStreamUrl(text: string, voiceId?: string): string {
+    const params = new URLSearchParams({ text });
+    if (voiceId) {
+      params.set('voice_id', voiceId);
+    }
+    return `${this.baseUrl}/voice/stream?${params.toString()}`;
+  }
+
   // Real-time streaming synthesis
   static async streamSynthesis(
     text: string,
@@ -248,24 +274,24 @@ export class VoiceSynthesisService {
     onChunk: (audioChunk: ArrayBuffer) => void
   ): Promise<void> {
     
-    const voice = this.voiceProfiles.find(v => v.id === voiceId);
-    if (!voice) {
-      throw new Error(`Voice profile ${voiceId} not found`);
-    }
+    console.log(`🌊 Streaming synthesis with voice ${voiceId}...`);
 
-    console.log(`🌊 Streaming synthesis with ${voice.name}'s voice...`);
+    const response = await fetch(`${this.baseUrl}/voice/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ text, voice_id: voiceId })
+    });
 
-    // Simulate streaming audio chunks
-    const words = text.split(' ');
-    for (let i = 0; i < words.length; i += 5) {
-      const chunk = words.slice(i, i + 5).join(' ');
-      
-      // Simulate processing delay
-      await new Promise(resolve => setTimeout(resolve, 500));
-      
-      // Create mock audio chunk (in real implementation, this would be actual audio data)
-      const mockAudioChunk = new ArrayBuffer(1024);
-      onChunk(mockAudioChunk);
+    if (!response.ok || !response.body) {
+      throw new Error(`Streaming synthesis failed: ${response.statusText}`);
+    }
+
+    // Hand MP3 data to the caller as each sentence arrives
+    const reader = response.body.getReader();
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      onChunk(value.buffer.slice(value.byteOffset, value.byteOffset + value.byteLength));
     }
   }
 